@@ -0,0 +1,165 @@
+"""
+Hotkey dispatch benchmark (headless, tanpa keyboard hook asli).
+
+Pushes synthetic key events through HotkeyDispatcher.on_event with a
+growing number of registered binds (and multi-stroke sequences) and
+reports the cost per event, so dispatch stays flat no matter how many
+macros are loaded.
+
+Usage (dari root repo):
+    python -m benchmarks.bench_dispatcher
+    python -m benchmarks.bench_dispatcher --output dispatch.json
+"""
+import argparse
+import itertools
+import json
+import string
+import sys
+import time
+from collections import namedtuple
+
+from core.hotkey_dispatcher import HotkeyDispatcher
+
+BIND_COUNTS = [10, 100, 1_000, 10_000]
+SEQUENCE_COUNTS = [100, 1_000, 10_000, 50_000]
+MODIFIERS = ["", "ctrl+", "alt+", "ctrl+shift+"]
+
+# Bentuk minimal keyboard.KeyboardEvent yang dibaca dispatcher.
+FakeEvent = namedtuple("FakeEvent", ["event_type", "name", "scan_code", "is_keypad"])
+
+
+def _hotkey_names(count):
+    """`count` distinct hotkey strings (f-keys, huruf, angka x modifier)."""
+    keys = [f"f{n}" for n in range(1, 25)] + [chr(c) for c in range(ord("a"), ord("z") + 1)]
+    keys += [f"num {n}" for n in range(10)] + [f"k{n}" for n in range(count)]
+    names = []
+    for key in keys:
+        for modifier in MODIFIERS:
+            names.append(modifier + key)
+            if len(names) == count:
+                return names
+    return names
+
+
+def _event_stream(hits_per_miss=1):
+    """Typical typing: mostly unbound letters, with a bound hotkey now and then."""
+    events = []
+    for index, char in enumerate("the quick brown fox jumps over the lazy dog"):
+        if char == " ":
+            char = "space"
+        events.append(FakeEvent("down", char, 100 + index, False))
+        events.append(FakeEvent("up", char, 100 + index, False))
+    for _ in range(hits_per_miss):
+        events.append(FakeEvent("down", "f1", 59, False))
+        events.append(FakeEvent("up", "f1", 59, False))
+    return events
+
+
+def _sequence_names(count):
+    """`count` distinct sequences 'leader, a, b, c' (3 stroke dulu, lalu 4)."""
+    letters = string.ascii_lowercase
+    combos = itertools.chain(itertools.product(letters, repeat=3), itertools.product(letters, repeat=4))
+    return ["leader, " + ", ".join(combo) for combo in itertools.islice(combos, count)]
+
+
+def _sequence_stream(names):
+    """Leader + strokes for a few defined sequences, plus one unmatched prefix."""
+    leader = [FakeEvent("down", "ctrl", 29, False), FakeEvent("down", ";", 39, False),
+              FakeEvent("up", ";", 39, False), FakeEvent("up", "ctrl", 29, False)]
+    events = []
+    for name in (names[0], names[len(names) // 2], names[-1], "leader, zz"):
+        events.extend(leader)
+        for stroke in name.split(", ")[1:]:
+            scan_code = 200 + ord(stroke[0])
+            events.append(FakeEvent("down", stroke, scan_code, False))
+            events.append(FakeEvent("up", stroke, scan_code, False))
+    return events
+
+
+def run_case(bind_count, rounds):
+    dispatcher = HotkeyDispatcher(scan_code_resolver=None)
+    fired = [0]
+
+    def action():
+        fired[0] += 1
+
+    for hotkey in _hotkey_names(bind_count):
+        dispatcher.add(hotkey, action)
+    events = _event_stream()
+    on_event = dispatcher.on_event
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            on_event(event)
+    elapsed = time.perf_counter() - start
+    # Action jalan di thread dispatcher; tunggu selesai sebelum membaca `fired`.
+    dispatcher.flush_actions()
+    total = rounds * len(events)
+    return {
+        "binds": bind_count,
+        "events": total,
+        "fired": fired[0],
+        "ns_per_event": round(elapsed / total * 1e9, 1),
+    }
+
+
+def run_sequence_case(sequence_count, rounds):
+    dispatcher = HotkeyDispatcher(scan_code_resolver=None, replay=None)
+    fired = [0]
+
+    def action():
+        fired[0] += 1
+
+    names = _sequence_names(sequence_count)
+    start = time.perf_counter()
+    for name in names:
+        dispatcher.add(name, action)
+    build = time.perf_counter() - start
+    events = _sequence_stream(names)
+    on_event = dispatcher.on_event
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            on_event(event)
+    elapsed = time.perf_counter() - start
+    # Action jalan di thread dispatcher; tunggu selesai sebelum membaca `fired`.
+    dispatcher.flush_actions()
+    total = rounds * len(events)
+    return {
+        "sequences": sequence_count,
+        "events": total,
+        "fired": fired[0],
+        "build_ms": round(build * 1000, 2),
+        "ns_per_event": round(elapsed / total * 1e9, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hotkey dispatch.")
+    parser.add_argument("--rounds", type=int, default=2_000)
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in BIND_COUNTS:
+        result = run_case(count, args.rounds)
+        results.append(result)
+        print(f"binds={result['binds']:<6} {result['ns_per_event']:>10} ns/event")
+
+    sequences = []
+    for count in SEQUENCE_COUNTS:
+        result = run_sequence_case(count, args.rounds)
+        sequences.append(result)
+        print(f"sequences={result['sequences']:<6} {result['ns_per_event']:>10} ns/event"
+              f"  (build {result['build_ms']} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "sequences": sequences}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
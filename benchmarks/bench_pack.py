@@ -0,0 +1,93 @@
+"""
+Macro pack benchmark (headless, tulis ke folder temp).
+
+Builds a read-only pack of the given size, then measures mount time
+(mount_packs: open + mmap + header, seperti saat startup), building the
+hotkey index on first access, and per-macro body lookups.
+
+Usage (dari root repo):
+    python -m benchmarks.bench_pack
+    python -m benchmarks.bench_pack --megabytes 50 --output pack.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from config import PACK_SUFFIX
+from utils.macro_pack import build_pack, mount_packs
+
+BODY_LENGTH = 2_000
+
+
+def _make_binds(megabytes, length=BODY_LENGTH):
+    base = "The quick brown fox jumps over the lazy dog. "
+    text = (base * (length // len(base) + 1))[:length]
+    count = max(1, megabytes * 1024 * 1024 // length)
+    return {f"k{n}": {"label": f"Phrase {n}", "text": f"{n} {text}", "trigger": f";p{n}"} for n in range(count)}
+
+
+def run(megabytes, lookups):
+    folder = tempfile.mkdtemp(prefix="bench-pack-")
+    try:
+        path = os.path.join(folder, "phrases" + PACK_SUFFIX)
+        binds = _make_binds(megabytes)
+        build_pack(path, binds, "Phrases")
+
+        start = time.perf_counter()
+        packs = mount_packs(folder)
+        mount_seconds = time.perf_counter() - start
+        assert len(packs) == 1
+        pack = packs[0]
+
+        start = time.perf_counter()
+        index = pack.binds
+        index_seconds = time.perf_counter() - start
+        assert len(index) == len(binds)
+
+        keys = random.Random(0).sample(list(binds), min(lookups, len(binds)))
+        samples = []
+        for key in keys:
+            start = time.perf_counter()
+            body = pack.get_macro(pack.name, key)
+            samples.append(time.perf_counter() - start)
+            assert body == binds[key]
+        pack.close()
+
+        return {
+            "macros": len(binds),
+            "pack_bytes": os.path.getsize(path),
+            "mount_ms": round(mount_seconds * 1000, 3),
+            "index_ms": round(index_seconds * 1000, 3),
+            "lookup_p50_ms": round(statistics.median(samples) * 1000, 4),
+            "lookup_max_ms": round(max(samples) * 1000, 4),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark read-only macro packs.")
+    parser.add_argument("--megabytes", type=int, default=50, help="approximate pack size")
+    parser.add_argument("--lookups", type=int, default=1000, help="body lookups measured")
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    result = run(args.megabytes, args.lookups)
+    print(f"macros={result['macros']}  pack {result['pack_bytes']} bytes  mount {result['mount_ms']} ms"
+          f"  index {result['index_ms']} ms  lookup p50 {result['lookup_p50_ms']} ms"
+          f" (max {result['lookup_max_ms']} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Macro storage benchmark (headless, tulis ke folder temp).
+
+Measures what one Ctrl+S costs for growing libraries: a full keybinds.json
+rewrite, a journal append and a single-row SQLite upsert, plus the time to
+load the library back from each (SQLite: full load and index-only lazy load).
+
+Usage (dari root repo):
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --output storage.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from config import DEFAULT_PROFILE
+from utils.file_manager import build_document, write_document, load_binds
+from utils.journal import BindsJournal, journal_path, put_record
+from utils.sqlite_store import SqliteStore
+
+MACRO_COUNTS = [100, 1_000, 5_000]
+TEXT_LENGTH = 500
+
+
+def _make_binds(count, length=TEXT_LENGTH):
+    base = "The quick brown fox jumps over the lazy dog. "
+    text = (base * (length // len(base) + 1))[:length]
+    return {f"k{n}": {"label": f"Macro {n}", "text": f"{n} {text}"} for n in range(count)}
+
+
+def _ms(samples):
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def run_case(count, saves):
+    folder = tempfile.mkdtemp(prefix="bench-storage-")
+    try:
+        path = os.path.join(folder, "keybinds.json")
+        binds = _make_binds(count)
+        write_document(path, build_document(binds, False))
+
+        full = []
+        for n in range(saves):
+            binds[f"k{n}"] = {"label": f"Macro {n}", "text": f"edit {n}"}
+            start = time.perf_counter()
+            write_document(path, build_document(binds, False))
+            full.append(time.perf_counter() - start)
+
+        journal = BindsJournal(journal_path(path))
+        appended = []
+        for n in range(saves):
+            binds[f"k{n}"] = {"label": f"Macro {n}", "text": f"journal {n}"}
+            start = time.perf_counter()
+            journal.append([put_record(DEFAULT_PROFILE, f"k{n}", binds[f"k{n}"])])
+            appended.append(time.perf_counter() - start)
+        journal.close()
+
+        start = time.perf_counter()
+        loaded, _, _, _ = load_binds(path)
+        load_seconds = time.perf_counter() - start
+        assert loaded == binds
+
+        store = SqliteStore(os.path.join(folder, "keybinds.db"))
+        store.write(build_document(binds, False))
+        upserts = []
+        for n in range(saves):
+            binds[f"k{n}"] = {"label": f"Macro {n}", "text": f"sqlite {n}"}
+            start = time.perf_counter()
+            store.write(None, [put_record(DEFAULT_PROFILE, f"k{n}", binds[f"k{n}"])])
+            upserts.append(time.perf_counter() - start)
+        store.close()
+
+        # Buka ulang (termasuk connect) supaya full load dan index load sebanding.
+        store = SqliteStore(os.path.join(folder, "keybinds.db"))
+        start = time.perf_counter()
+        loaded, _, _, _ = store.load()
+        sqlite_load_seconds = time.perf_counter() - start
+        store.close()
+        assert loaded == binds
+
+        store = SqliteStore(os.path.join(folder, "keybinds.db"), lazy=True)
+        start = time.perf_counter()
+        index, _, _, _ = store.load()
+        index_seconds = time.perf_counter() - start
+        store.close()
+        assert list(index) == list(binds)
+
+        return {
+            "macros": count,
+            "snapshot_bytes": os.path.getsize(path),
+            "full_rewrite": _ms(full),
+            "journal_append": _ms(appended),
+            "sqlite_upsert": _ms(upserts),
+            "load_ms": round(load_seconds * 1000, 3),
+            "sqlite_load_ms": round(sqlite_load_seconds * 1000, 3),
+            "sqlite_index_ms": round(index_seconds * 1000, 3),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark macro storage.")
+    parser.add_argument("--saves", type=int, default=20, help="saves measured per case")
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in MACRO_COUNTS:
+        result = run_case(count, args.saves)
+        results.append(result)
+        print(f"macros={count:<6} full rewrite p50 {result['full_rewrite']['p50_ms']:>9} ms"
+              f"  journal append p50 {result['journal_append']['p50_ms']:>7} ms"
+              f"  sqlite upsert p50 {result['sqlite_upsert']['p50_ms']:>7} ms"
+              f"  load {result['load_ms']:>8} / {result['sqlite_load_ms']:>8}"
+              f" / index {result['sqlite_index_ms']:>8} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Typing engine benchmark (headless, tanpa keyboard asli).
+
+Runs TypingManager against a RecordingBackend across a matrix of text
+lengths, delays and delivery modes, and reports chars/sec, per-emission
+jitter, scheduler overshoot and worker start-up cost as JSON.
+
+Usage (dari root repo):
+    python -m benchmarks.bench_typing --output bench.json
+    python -m benchmarks.bench_typing --quick --baseline bench.json
+
+CI membandingkan dengan benchmarks/baseline_quick.json (hanya case dengan
+delay > 0, yang throughput-nya ditentukan scheduler, bukan kecepatan mesin):
+    python -m benchmarks.bench_typing --quick --baseline benchmarks/baseline_quick.json --metrics chars_per_sec --threshold 0.4
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from config import DELIVERY_TYPE, DELIVERY_PASTE
+from core.clipboard import MemoryClipboard
+from core.hotkey_dispatcher import HotkeyDispatcher
+from core.latency import (
+    LatencyRecorder,
+    LatencyHistogram,
+    METRIC_EMISSION_LATENESS,
+    METRIC_HOOK_TO_START,
+    METRIC_HOOK_TO_FIRST,
+)
+from core.output_backend import RecordingBackend
+from core.typing_manager import TypingManager
+from core.typing_profile import TypingProfile
+
+LENGTHS = [10, 100, 1_000, 10_000, 100_000]
+DELAYS = [0.0, 0.001, 0.005, 0.01, 0.03, 0.05]
+QUICK_LENGTHS = [10, 1_000, 10_000]
+QUICK_DELAYS = [0.0, 0.005]
+
+# Mode yang dibandingkan: per karakter, burst 20 karakter, paste.
+MODES = {
+    "type": {"chunk_size": 1, "delivery": DELIVERY_TYPE},
+    "burst20": {"chunk_size": 20, "delivery": DELIVERY_TYPE},
+    "paste": {"chunk_size": 1, "delivery": DELIVERY_PASTE},
+}
+
+# Metric yang dicek saat membandingkan dengan baseline: (nama, lebih besar = lebih baik)
+REGRESSION_METRICS = [
+    ("chars_per_sec", True),
+    ("jitter_p99_ms", False),
+    ("overshoot_p99_ms", False),
+]
+# Selisih absolut minimum (ms) sebelum jitter/overshoot dianggap regresi (noise OS).
+ABSOLUTE_FLOOR_MS = 0.5
+
+
+# Key event minimal untuk HotkeyDispatcher.on_event.
+_FakeKey = namedtuple("_FakeKey", ["event_type", "name", "scan_code", "is_keypad"])
+
+
+def _make_text(length):
+    base = "The quick brown fox jumps over the lazy dog. "
+    return (base * (length // len(base) + 1))[:length]
+
+
+def _wait_idle(manager, timeout):
+    deadline = time.perf_counter() + timeout
+    while manager.is_busy:
+        if time.perf_counter() > deadline:
+            manager.abort()
+            return False
+        time.sleep(0.0005)
+    return True
+
+
+def run_case(length, delay, mode, max_seconds):
+    """Run one benchmark case and return its result dict."""
+    # Batasi panjang text supaya satu case tidak jalan lebih lama dari max_seconds.
+    settings = MODES[mode]
+    measured = length
+    if delay > 0 and settings["delivery"] == DELIVERY_TYPE:
+        emissions_budget = max(int(max_seconds / delay), 10)
+        measured = min(length, emissions_budget * settings["chunk_size"])
+    text = _make_text(measured)
+
+    backend = RecordingBackend()
+    metrics = LatencyRecorder()
+    profile = TypingProfile(
+        per_char_delay=delay,
+        chunk_delay=delay,
+        initial_delay=0.0,
+        auto_enter=False,
+        chunk_size=settings["chunk_size"],
+        delivery=settings["delivery"],
+    )
+    manager = TypingManager(backend=backend, clipboard=MemoryClipboard(""), profile=profile, metrics=metrics)
+    try:
+        start = time.perf_counter()
+        manager.send_text(text)
+        completed = _wait_idle(manager, max_seconds * 5 + 5)
+        elapsed = time.perf_counter() - start
+    finally:
+        manager.stop(1)
+
+    stamps = [e.timestamp for e in backend.events if e.kind == "write"]
+    intervals = [b - a for a, b in zip(stamps, stamps[1:])]
+    jitter = LatencyHistogram()
+    for interval in intervals:
+        jitter.record(abs(interval - delay))
+
+    summary = metrics.summary()["global"]
+    overshoot = summary.get(METRIC_EMISSION_LATENESS, {})
+    return {
+        "case": f"{mode}/len={length}/delay={delay}",
+        "mode": mode,
+        "length": length,
+        "chars_measured": measured,
+        "delay": delay,
+        "completed": completed,
+        "elapsed_s": round(elapsed, 6),
+        "chars_per_sec": round(measured / elapsed, 1) if elapsed > 0 else 0.0,
+        "emissions": len(stamps),
+        "interval_mean_ms": round(statistics.fmean(intervals) * 1000, 4) if intervals else 0.0,
+        "jitter_p50_ms": round(jitter.percentile(50) * 1000, 4),
+        "jitter_p99_ms": round(jitter.percentile(99) * 1000, 4),
+        "jitter_max_ms": round(jitter.max * 1000, 4),
+        "overshoot_p99_ms": overshoot.get("p99_ms", 0.0),
+        "overshoot_max_ms": overshoot.get("max_ms", 0.0),
+        "job_start_ms": summary.get(METRIC_HOOK_TO_START, {}).get("p50_ms", 0.0),
+    }
+
+
+def measure_startup(samples=200):
+    """
+    Compare handing a job to the persistent worker against starting a new
+    thread per hotkey (cara lama).
+    """
+    metrics = LatencyRecorder()
+    profile = TypingProfile(initial_delay=0.0, per_char_delay=0.0)
+    manager = TypingManager(backend=RecordingBackend(), profile=profile, metrics=metrics)
+    try:
+        for _ in range(samples):
+            manager.send_text("x")
+            _wait_idle(manager, 5)
+    finally:
+        manager.stop(1)
+    worker = metrics.summary()["global"][METRIC_HOOK_TO_START]
+
+    spawn = LatencyHistogram()
+    for _ in range(samples):
+        started = threading.Event()
+        t0 = time.perf_counter()
+        thread = threading.Thread(target=started.set, daemon=True)
+        thread.start()
+        started.wait()
+        spawn.record(time.perf_counter() - t0)
+        thread.join()
+
+    return {"persistent_worker": worker, "thread_per_job": spawn.summary()}
+
+
+def measure_first_char(samples=30, hold=0.01):
+    """
+    Hook → first character: fixed initial delay vs waiting for the hotkey's
+    modifiers to be released (modifier gate dari HotkeyDispatcher).
+    """
+    ctrl_down = _FakeKey("down", "ctrl", 29, False)
+    ctrl_up = _FakeKey("up", "ctrl", 29, False)
+    results = {}
+    for case in ("fixed_delay", "gate_released", "gate_held"):
+        metrics = LatencyRecorder()
+        gate = HotkeyDispatcher(scan_code_resolver=None, replay=None) if case != "fixed_delay" else None
+        manager = TypingManager(backend=RecordingBackend(), profile=TypingProfile(per_char_delay=0.0),
+                                metrics=metrics, modifier_gate=gate)
+        try:
+            for _ in range(samples):
+                if case == "gate_held":
+                    # User masih menahan ctrl selama `hold` detik setelah hotkey.
+                    gate.on_event(ctrl_down)
+                    threading.Timer(hold, gate.on_event, args=(ctrl_up,)).start()
+                manager.send_text("x")
+                _wait_idle(manager, 5)
+        finally:
+            manager.stop(1)
+        results[case] = metrics.summary()["global"][METRIC_HOOK_TO_FIRST]
+    return results
+
+
+def compare(results, baseline, threshold, metrics=None):
+    """
+    Return a list of regressions of `results` against `baseline`.
+    `metrics` = nama metric yang dicek (default semua REGRESSION_METRICS).
+    """
+    previous = {r["case"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results["results"]:
+        old = previous.get(result["case"])
+        if not old:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS:
+            if metrics is not None and metric not in metrics:
+                continue
+            new_value, old_value = result.get(metric, 0.0), old.get(metric, 0.0)
+            if higher_is_better:
+                regressed = old_value > 0 and new_value < old_value * (1 - threshold)
+            else:
+                regressed = (new_value > old_value * (1 + threshold)
+                             and new_value - old_value > ABSOLUTE_FLOOR_MS)
+            if regressed:
+                regressions.append({
+                    "case": result["case"],
+                    "metric": metric,
+                    "baseline": old_value,
+                    "current": new_value,
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the typing engine.")
+    parser.add_argument("--quick", action="store_true", help="small matrix (untuk CI)")
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative change that counts as a regression (default 0.2)")
+    parser.add_argument("--metrics", nargs="+", choices=[name for name, _ in REGRESSION_METRICS],
+                        help="metrics compared against the baseline (default: all)")
+    parser.add_argument("--max-seconds", type=float, default=2.0,
+                        help="time budget per case; long texts are truncated (default 2)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args(argv)
+
+    lengths = QUICK_LENGTHS if args.quick else LENGTHS
+    delays = QUICK_DELAYS if args.quick else DELAYS
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": args.quick,
+        },
+        "results": [],
+    }
+    for mode in args.modes:
+        for length in lengths:
+            for delay in delays:
+                result = run_case(length, delay, mode, args.max_seconds)
+                results["results"].append(result)
+                print(f"{result['case']:<36} {result['chars_per_sec']:>12} chars/s"
+                      f"  jitter p99 {result['jitter_p99_ms']:>8} ms"
+                      f"  overshoot p99 {result['overshoot_p99_ms']:>8} ms")
+    results["startup"] = measure_startup()
+    print(f"job start p50: worker {results['startup']['persistent_worker']['p50_ms']} ms, "
+          f"thread per job {results['startup']['thread_per_job']['p50_ms']} ms")
+    results["first_char"] = measure_first_char()
+    print("first char p50: " + ", ".join(
+        f"{case} {summary['p50_ms']} ms" for case, summary in results["first_char"].items()))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.threshold, args.metrics)
+        for r in results["regressions"]:
+            print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline']} -> {r['current']}")
+        if results["regressions"]:
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,6 +36,9 @@ AVAILABLE_HOTKEYS = [
     "ctrl+y", "ctrl+z",
     "shift+a", "shift+b", "shift+c", "shift+d", "shift+e", "shift+f", "shift+g",
     "alt+a", "alt+b", "alt+c", "alt+d", "alt+e", "alt+f", "alt+g",
+    # Leader sequences (leader lalu key; bisa juga diketik manual, misal "leader, m, 1")
+    "leader, 1", "leader, 2", "leader, 3", "leader, 4", "leader, 5",
+    "leader, 6", "leader, 7", "leader, 8", "leader, 9", "leader, 0",
 ]
 
 # Color scheme (glassmorphism style)
@@ -62,6 +65,105 @@ TYPING_DELAY_INITIAL = 0.05
 TYPING_DELAY_PER_CHAR = 0.03
 TYPING_DELAY_BEFORE_ENTER = 0.05
 
+# Sebelum mengetik, tunggu modifier hotkey (ctrl/shift/alt/win) dilepas secara fisik,
+# maksimal selama timeout ini. TYPING_DELAY_INITIAL hanya dipakai kalau status
+# modifier tidak diketahui (tanpa keyboard hook).
+MODIFIER_RELEASE_TIMEOUT = 0.5
+RELEASE_STUCK_MODIFIERS = False  # True = kirim key-up untuk modifier yang masih ditekan setelah timeout
+
+# Scheduler: sisa waktu terakhir sebelum deadline yang di-spin-wait (0 = matikan)
+SCHEDULER_SPIN_THRESHOLD = 0.001
+
+# Burst typing: jumlah karakter per keyboard.write (1 = per karakter)
+TYPING_CHUNK_SIZE = 1
+TYPING_DELAY_PER_CHUNK = 0.03
+
+# Delivery mode per macro: ketik, paste lewat clipboard, atau otomatis
+DELIVERY_TYPE = "type"
+DELIVERY_PASTE = "paste"
+DELIVERY_AUTO = "auto"
+DELIVERY_MODES = [DELIVERY_TYPE, DELIVERY_PASTE, DELIVERY_AUTO]
+PASTE_MIN_LENGTH = 200  # mode "auto" paste kalau text >= panjang ini
+PASTE_HOTKEY = "ctrl+v"
+CLIPBOARD_RESTORE_DELAY = 0.15
+
+# Hotkey ditekan saat macro lain masih diketik:
+# drop = abaikan, queue = antre (FIFO), latest = satu slot antrean yang selalu
+# diganti job terbaru, preempt = hentikan yang sedang jalan lalu ketik yang baru
+# (job yang sudah antre tetap diketik sesudahnya, urutan FIFO)
+BUSY_POLICY_DROP = "drop"
+BUSY_POLICY_QUEUE = "queue"
+BUSY_POLICY_LATEST = "latest"
+BUSY_POLICY_PREEMPT = "preempt"
+BUSY_POLICIES = [BUSY_POLICY_QUEUE, BUSY_POLICY_DROP, BUSY_POLICY_LATEST, BUSY_POLICY_PREEMPT]
+TYPING_BUSY_POLICY = BUSY_POLICY_QUEUE
+TYPING_QUEUE_SIZE = 8
+
+# Hotkey global untuk membatalkan macro yang sedang diketik (+ kosongkan antrean)
+ABORT_HOTKEY = "pause"
+
+# Profile macro: "Default" disimpan di "binds" (format lama), profile lain di "profiles".
+# Layer = profile tambahan yang ditumpuk di bawah profile aktif (urutan = prioritas).
+DEFAULT_PROFILE = "Default"
+PROFILE_SWITCH_HOTKEY = "ctrl+alt+p"  # pindah ke profile berikutnya
+
+# Kapan hotkey macro dipicu: saat key ditekan (lebih cepat) atau saat dilepas.
+# Auto-repeat OS tidak pernah memicu ulang; tekan ulang hotkey yang sama dalam
+# HOTKEY_DEBOUNCE detik dianggap bounce dan diabaikan.
+FIRE_ON_RELEASE = "release"
+FIRE_ON_PRESS = "press"
+FIRE_MODES = [FIRE_ON_RELEASE, FIRE_ON_PRESS]
+HOTKEY_DEBOUNCE = 0.05
+
+# Hotkey multi-stroke: stroke dipisah ", " (misal "ctrl+;, m, 1"); token
+# "leader" diganti LEADER_HOTKEY. Prefix yang tidak selesai dalam
+# SEQUENCE_TIMEOUT detik dikirim ulang ke aplikasi.
+LEADER_HOTKEY = "ctrl+;"
+SEQUENCE_TIMEOUT = 1.0
+
+# Macro multi-step ("steps" di keybinds.json): batas setelah repeat di-unroll
+MACRO_MAX_ACTIONS = 10_000
+MACRO_MAX_REPEAT = 1_000
+MACRO_MAX_WAIT = 60_000  # milidetik per step wait
+
+# Template variable di text macro ({date}, {time}, {clipboard}, {counter}, {random:a|b})
+TEMPLATE_DATE_FORMAT = "%d/%m/%Y"
+TEMPLATE_TIME_FORMAT = "%H:%M"
+TEMPLATE_CACHE_SIZE = 256
+COUNTER_FLUSH_INTERVAL = 5.0  # detik; counter disimpan ke file per batch, bukan tiap hotkey
+
+# keybinds.json ditulis di background: perubahan dalam SAVE_DEBOUNCE detik digabung,
+# tapi paling lambat SAVE_MAX_DELAY detik setelah perubahan pertama.
+SAVE_DEBOUNCE = 0.5
+SAVE_MAX_DELAY = 3.0
+
+# Format penyimpanan: "json" = tulis ulang keybinds.json utuh, "journal" = tiap
+# perubahan macro di-append ke keybinds.json.journal lalu di-compact sesekali,
+# "sqlite" = keybinds.db (WAL, satu transaksi per macro; keybinds.json dimigrasi sekali).
+STORAGE_JSON = "json"
+STORAGE_JOURNAL = "journal"
+STORAGE_SQLITE = "sqlite"
+STORAGE_MODE = STORAGE_JSON
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024   # compact kalau journal sebesar ini
+JOURNAL_COMPACT_RATIO = 0.5               # ...atau >= 50% ukuran snapshot
+JOURNAL_COMPACT_MIN_BYTES = 64 * 1024     # (rasio baru dihitung di atas ukuran ini)
+
+# Store sqlite: saat startup hanya index macro (hotkey, label, ukuran, hash) yang
+# dibaca; isi macro diambil saat pertama dipakai dan disimpan di LRU ini.
+LAZY_MACRO_BODIES = True
+MACRO_BODY_CACHE_SIZE = 128
+
+# Macro pack read-only (*.kbpack, dibuat dengan `python -m utils.macro_pack build`):
+# semua pack di folder "packs" sebelah keybinds.json di-mount sebagai layer.
+PACK_DIR_NAME = "packs"
+PACK_SUFFIX = ".kbpack"
+
+# Keystroke output backend: "keyboard", "recording" atau "null"
+OUTPUT_BACKEND = "keyboard"
+
+# Jumlah keystroke plan (text macro yang sudah di-compile) yang disimpan di memory
+KEYSTROKE_PLAN_CACHE_SIZE = 256
+
 
 def get_config_path():
     """Return a stable path for keybinds.json.
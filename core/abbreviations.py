@@ -0,0 +1,165 @@
+"""
+Typed-trigger text expansion (misal ketik ";gg" → text macro).
+All triggers are compiled into one Aho–Corasick automaton, so each typed
+character costs a couple of dict lookups no matter how many triggers exist.
+"""
+import threading
+from collections import deque
+
+from core.hotkey_dispatcher import MOD_CTRL, MOD_ALT, MOD_WINDOWS
+
+# Nama key (dari hook) yang dianggap karakter selain karakter tunggal.
+KEY_CHARS = {"space": " "}
+# Key yang menghapus satu karakter dari buffer.
+BACKSPACE_KEYS = {"backspace"}
+# Modifier yang membuat key bukan ketikan biasa (shortcut).
+SHORTCUT_MASK = MOD_CTRL | MOD_ALT | MOD_WINDOWS
+
+
+class TriggerAutomaton:
+    """
+    Immutable Aho–Corasick automaton over a set of trigger strings.
+
+    State = index node. `step(state, char)` mengikuti goto/fail link dan
+    `output[state]` berisi trigger terpanjang yang selesai di state itu.
+    """
+
+    def __init__(self, triggers):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        self.max_length = 0
+        for trigger in triggers:
+            self._insert(trigger)
+        self._link()
+
+    def _insert(self, trigger):
+        state = 0
+        for char in trigger:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.goto[state][char] = next_state
+            state = next_state
+        self.output[state] = trigger
+        self.max_length = max(self.max_length, len(trigger))
+
+    def _link(self):
+        """Compute fail links breadth-first (dan warisi output dari fail state)."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[self.fail[next_state]]
+                queue.append(next_state)
+
+    def step(self, state, char):
+        goto = self.goto
+        while True:
+            next_state = goto[state].get(char)
+            if next_state is not None:
+                return next_state
+            if state == 0:
+                return 0
+            state = self.fail[state]
+
+    def __len__(self):
+        return len(self.goto)
+
+
+class AbbreviationExpander:
+    """
+    Streams key events from the HotkeyDispatcher through a TriggerAutomaton.
+
+    - `sync(triggers)` menerima {trigger: target}; automaton hanya dibangun
+      ulang (lalu di-swap utuh) kalau kumpulan trigger berubah, edit text /
+      label macro cukup mengganti target.
+    - `on_match(target, trigger)` dipanggil di thread hook, jadi harus langsung
+      return (aplikasi meneruskannya ke HotkeyDispatcher.defer). Karakter terakhir
+      trigger di-suppress, jadi yang perlu dihapus hanya len(trigger) - 1.
+    - Trigger case-insensitive; shortcut (ctrl/alt/win), key non-karakter
+      dan `should_ignore()` (misal saat macro sedang diketik) mereset buffer.
+    """
+
+    def __init__(self, on_match, should_ignore=None):
+        self.on_match = on_match
+        self.should_ignore = should_ignore
+        self._targets = {}
+        self._automaton = TriggerAutomaton(())
+        self._lock = threading.Lock()
+        # State automaton + riwayat state untuk backspace (maks panjang trigger)
+        self._state = 0
+        self._history = deque()
+
+    def sync(self, triggers):
+        """Replace the trigger → target map. Returns True kalau automaton dibangun ulang."""
+        normalized = {}
+        for trigger, target in triggers.items():
+            trigger = (trigger or "").lower()
+            if trigger and trigger not in normalized:
+                normalized[trigger] = target
+        with self._lock:
+            rebuild = normalized.keys() != self._targets.keys()
+            if rebuild:
+                automaton = TriggerAutomaton(normalized)
+            self._targets = normalized
+            if rebuild:
+                self._automaton = automaton
+                self._reset()
+        return rebuild
+
+    @property
+    def triggers(self):
+        return list(self._targets)
+
+    def _reset(self):
+        self._state = 0
+        self._history.clear()
+
+    def on_key(self, event, mask):
+        """Key-down listener for the dispatcher. Returns True to pass the key through."""
+        automaton = self._automaton
+        if len(automaton) == 1:
+            return True
+        name = event.name or ""
+        if mask & SHORTCUT_MASK or (self.should_ignore is not None and self.should_ignore()):
+            self._reset()
+            return True
+        if name in BACKSPACE_KEYS:
+            if self._history:
+                self._state = self._history.pop()
+            return True
+        char = KEY_CHARS.get(name, name)
+        if len(char) != 1:
+            self._reset()
+            return True
+
+        history = self._history
+        history.append(self._state)
+        if len(history) > automaton.max_length:
+            history.popleft()
+        self._state = automaton.step(self._state, char.lower())
+        trigger = automaton.output[self._state]
+        if trigger is None:
+            return True
+        target = self._targets.get(trigger)
+        self._reset()
+        if target is None:
+            return True
+        try:
+            self.on_match(target, trigger)
+        except Exception as e:
+            try:
+                print(f"[Keybind] Trigger '{trigger}' error: {e}")
+            except Exception:
+                pass
+        return False
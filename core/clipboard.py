@@ -0,0 +1,174 @@
+"""
+Clipboard providers for the paste delivery mode.
+The TypingManager only talks to a provider, so the real Windows clipboard
+can be swapped for an in-process stand-in.
+"""
+import sys
+import threading
+import time
+
+
+class ClipboardProvider:
+    """Interface for reading and writing clipboard text."""
+
+    name = "base"
+
+    def get_text(self):
+        """Return the current clipboard text, or None if there is none."""
+        raise NotImplementedError
+
+    def set_text(self, text):
+        """Replace the clipboard contents with `text`."""
+        raise NotImplementedError
+
+    def is_empty(self):
+        """True kalau clipboard kosong sama sekali (bukan cuma tanpa text)."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Empty the clipboard."""
+        raise NotImplementedError
+
+
+class MemoryClipboard(ClipboardProvider):
+    """In-process clipboard, handy for tests and benchmarks."""
+
+    name = "memory"
+
+    def __init__(self, text=None):
+        self._text = text
+        self._lock = threading.Lock()
+        # Riwayat semua set_text, supaya bisa dicek urutannya.
+        self.history = []
+
+    def get_text(self):
+        with self._lock:
+            return self._text
+
+    def set_text(self, text):
+        with self._lock:
+            self._text = text
+            self.history.append(text)
+
+    def is_empty(self):
+        with self._lock:
+            return self._text is None
+
+    def clear(self):
+        with self._lock:
+            self._text = None
+            self.history.append(None)
+
+
+class Win32Clipboard(ClipboardProvider):
+    """
+    Clipboard Windows lewat ctypes (CF_UNICODETEXT).
+
+    Hanya text yang di-backup; kalau clipboard berisi non-text (gambar, file)
+    TypingManager mengetik macro-nya, bukan paste, supaya isinya tidak hilang.
+    """
+
+    name = "win32"
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    OPEN_RETRIES = 10
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+
+        # Set signature supaya handle 64-bit tidak terpotong.
+        self._user32.OpenClipboard.argtypes = [wintypes.HWND]
+        self._user32.OpenClipboard.restype = wintypes.BOOL
+        self._user32.CloseClipboard.restype = wintypes.BOOL
+        self._user32.EmptyClipboard.restype = wintypes.BOOL
+        self._user32.CountClipboardFormats.restype = ctypes.c_int
+        self._user32.GetClipboardData.argtypes = [wintypes.UINT]
+        self._user32.GetClipboardData.restype = wintypes.HANDLE
+        self._user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._user32.SetClipboardData.restype = wintypes.HANDLE
+        self._kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        self._kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalLock.restype = wintypes.LPVOID
+        self._kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalFree.restype = wintypes.HGLOBAL
+
+    def _open(self):
+        # Clipboard bisa sedang dipegang aplikasi lain, coba beberapa kali.
+        for _ in range(self.OPEN_RETRIES):
+            if self._user32.OpenClipboard(None):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def get_text(self):
+        if not self._open():
+            return None
+        try:
+            handle = self._user32.GetClipboardData(self.CF_UNICODETEXT)
+            if not handle:
+                return None
+            ptr = self._kernel32.GlobalLock(handle)
+            if not ptr:
+                return None
+            try:
+                return self._ctypes.wstring_at(ptr)
+            finally:
+                self._kernel32.GlobalUnlock(handle)
+        finally:
+            self._user32.CloseClipboard()
+
+    def is_empty(self):
+        return self._user32.CountClipboardFormats() == 0
+
+    def clear(self):
+        if not self._open():
+            raise OSError("Clipboard is busy")
+        try:
+            self._user32.EmptyClipboard()
+        finally:
+            self._user32.CloseClipboard()
+
+    def set_text(self, text):
+        ctypes = self._ctypes
+        buffer = ctypes.create_unicode_buffer(text)
+        size = ctypes.sizeof(buffer)
+
+        handle = self._kernel32.GlobalAlloc(self.GMEM_MOVEABLE, size)
+        if not handle:
+            raise OSError("GlobalAlloc failed")
+        ptr = self._kernel32.GlobalLock(handle)
+        if not ptr:
+            self._kernel32.GlobalFree(handle)
+            raise OSError("GlobalLock failed")
+        ctypes.memmove(ptr, buffer, size)
+        self._kernel32.GlobalUnlock(handle)
+
+        if not self._open():
+            self._kernel32.GlobalFree(handle)
+            raise OSError("Clipboard is busy")
+        try:
+            self._user32.EmptyClipboard()
+            # Setelah SetClipboardData sukses, memory jadi milik sistem.
+            if not self._user32.SetClipboardData(self.CF_UNICODETEXT, handle):
+                self._kernel32.GlobalFree(handle)
+                raise OSError("SetClipboardData failed")
+        finally:
+            self._user32.CloseClipboard()
+
+
+def create_clipboard():
+    """Return the best clipboard provider for this platform, or None."""
+    if sys.platform == "win32":
+        try:
+            return Win32Clipboard()
+        except Exception:
+            return None
+    return None
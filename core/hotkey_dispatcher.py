@@ -0,0 +1,738 @@
+"""
+Single low-level keyboard hook that dispatches every macro hotkey.
+Instead of one keyboard.add_hotkey per macro (yang dievaluasi semua di
+setiap key event), each event is normalized once and looked up in a
+precomputed (modifier-mask, key) → binding table. Multi-stroke sequences
+("ctrl+;, m, 1", "leader, m, 1") are matched by walking a prefix trie.
+"""
+import queue
+import re
+import threading
+import time
+from collections import namedtuple
+
+from config import LEADER_HOTKEY, SEQUENCE_TIMEOUT, FIRE_ON_RELEASE, FIRE_ON_PRESS, HOTKEY_DEBOUNCE
+from core.latency import COUNTER_FIRED, COUNTER_REPEATS, COUNTER_BOUNCES
+
+# Try to import keyboard (hook global butuh device input asli)
+try:
+    import keyboard
+    KEYBOARD_AVAILABLE = True
+except ImportError:
+    KEYBOARD_AVAILABLE = False
+    keyboard = None
+
+
+# Bitmask modifier
+MOD_CTRL = 1
+MOD_SHIFT = 2
+MOD_ALT = 4
+MOD_WINDOWS = 8
+
+MODIFIER_BITS = {
+    "ctrl": MOD_CTRL,
+    "control": MOD_CTRL,
+    "shift": MOD_SHIFT,
+    "alt": MOD_ALT,
+    "alt gr": MOD_ALT,
+    "windows": MOD_WINDOWS,
+    "win": MOD_WINDOWS,
+    "command": MOD_WINDOWS,
+}
+
+MODIFIER_NAMES = [(MOD_CTRL, "ctrl"), (MOD_SHIFT, "shift"), (MOD_ALT, "alt"), (MOD_WINDOWS, "windows")]
+
+# Nama key yang hanya muncul kalau shift ditekan (layout US), misal ':' dari shift+;.
+# Hanya untuk nama ini lookup boleh mencoba lagi tanpa bit shift; shift+F1 tidak
+# boleh memicu "F1". Layout lain ditangkap entry scan code.
+SHIFTED_CHARACTERS = frozenset('~!@#$%^&*()_+{}|:"<>?')
+
+# Pemisah antar stroke di sequence: koma + spasi, jadi "ctrl+," tetap satu key.
+SEQUENCE_SEPARATOR = re.compile(r",\s+")
+LEADER_TOKEN = "leader"
+
+# Satu hotkey yang terdaftar: `action()` dipanggil di thread action dispatcher
+# (bukan di hook) saat key ditekan (fire_on="press") atau dilepas (fire_on="release", default).
+# while_paused=True: tetap aktif saat dispatcher di-pause (misal abort hotkey).
+HotkeyBinding = namedtuple(
+    "HotkeyBinding",
+    ["hotkey", "action", "suppress", "while_paused", "fire_on"],
+    defaults=(FIRE_ON_RELEASE,),
+)
+
+
+def modifier_bit(name):
+    """Bit for a modifier key name ('left ctrl', 'right shift', ...), or 0."""
+    if not name:
+        return 0
+    name = name.lower()
+    for side in ("left ", "right "):
+        if name.startswith(side):
+            name = name[len(side):]
+            break
+    return MODIFIER_BITS.get(name, 0)
+
+
+def canonical_key_name(name, is_keypad=False):
+    """Normalize a key name the same way for hotkey strings and hook events."""
+    name = (name or "").strip().lower()
+    if name.startswith("numpad "):
+        name = "num " + name[7:].strip()
+    if is_keypad and not name.startswith("num "):
+        name = "num " + name
+    return name
+
+
+def split_hotkey(hotkey):
+    """
+    Split 'ctrl+shift+a' into ['ctrl', 'shift', 'a'].
+
+    '+' hanya dianggap pemisah kalau bukan karakter terakhir,
+    jadi 'numpad +' dan 'ctrl++' tetap benar.
+    """
+    parts = []
+    token = ""
+    for index, char in enumerate(hotkey):
+        if char == "+" and token.strip() and index != len(hotkey) - 1:
+            parts.append(token.strip())
+            token = ""
+        else:
+            token += char
+    if token.strip():
+        parts.append(token.strip())
+    return parts
+
+
+def parse_hotkey(hotkey):
+    """
+    Parse a hotkey string into (modifier_mask, key_name).
+    Raises ValueError kalau formatnya tidak valid.
+    """
+    parts = split_hotkey(hotkey or "")
+    if not parts:
+        raise ValueError(f"Hotkey kosong: {hotkey!r}")
+    mask = 0
+    for part in parts[:-1]:
+        bit = modifier_bit(part)
+        if not bit:
+            raise ValueError(f"Modifier tidak dikenal '{part}' di hotkey {hotkey!r}")
+        mask |= bit
+    key = canonical_key_name(parts[-1])
+    if modifier_bit(key):
+        raise ValueError(f"Hotkey {hotkey!r} hanya berisi modifier")
+    return mask, key
+
+
+def split_sequence(hotkey):
+    """Split 'ctrl+;, m, 1' into ['ctrl+;', 'm', '1']."""
+    return [part for part in SEQUENCE_SEPARATOR.split((hotkey or "").strip()) if part]
+
+
+def is_sequence(hotkey):
+    return len(split_sequence(hotkey)) > 1
+
+
+def parse_sequence(hotkey, leader=LEADER_HOTKEY):
+    """
+    Parse a multi-stroke hotkey into a tuple of (modifier_mask, key) strokes.
+    Token 'leader' diganti dengan stroke dari `leader`.
+    """
+    strokes = []
+    for part in split_sequence(hotkey):
+        if part.lower() == LEADER_TOKEN:
+            if not leader:
+                raise ValueError(f"Leader key tidak valid untuk hotkey {hotkey!r}")
+            strokes.extend(parse_sequence(leader, leader=None) if is_sequence(leader) else [parse_hotkey(leader)])
+        else:
+            strokes.append(parse_hotkey(part))
+    if len(strokes) < 2:
+        raise ValueError(f"Sequence {hotkey!r} butuh minimal 2 stroke")
+    return tuple(strokes)
+
+
+def keyboard_scan_codes(key_name):
+    """Default resolver: scan codes for a key name via the `keyboard` module."""
+    if not KEYBOARD_AVAILABLE:
+        return ()
+    try:
+        return tuple(keyboard.key_to_scan_codes(key_name, error_if_missing=False))
+    except Exception:
+        return ()
+
+
+def keyboard_replay(strokes, held_mask):
+    """Default replay: kirim ulang stroke (scan_code, mask) yang ditahan sequence."""
+    if not KEYBOARD_AVAILABLE:
+        return
+    for scan_code, mask in strokes:
+        # Modifier yang sudah dilepas user ditekan sebentar supaya chord-nya sama.
+        extra = [name for bit, name in MODIFIER_NAMES if mask & bit and not held_mask & bit]
+        for name in extra:
+            keyboard.press(name)
+        keyboard.press(scan_code)
+        keyboard.release(scan_code)
+        for name in reversed(extra):
+            keyboard.release(name)
+
+
+class SequenceNode:
+    """One trie node: child per stroke, binding kalau sequence selesai di sini."""
+
+    __slots__ = ("children", "binding")
+
+    def __init__(self):
+        self.children = {}
+        self.binding = None
+
+    def step(self, mask, key):
+        """Child for a stroke (dengan fallback tanpa shift, seperti HotkeyTable.find)."""
+        child = self.children.get((mask, key))
+        if child is None and mask & MOD_SHIFT and key in SHIFTED_CHARACTERS:
+            child = self.children.get((mask & ~MOD_SHIFT, key))
+        return child
+
+
+class HotkeyTable:
+    """
+    Precomputed (modifier_mask, key) → binding table.
+
+    Entry tambahan (modifier_mask, scan_code, is_keypad) menangkap kasus
+    seperti shift+; yang namanya jadi ':'; flag keypad mencegah numpad 1
+    ikut match tombol End. Hotkey multi-stroke masuk ke trie `sequences`.
+    Satu table per profile/layer, lihat HotkeyDispatcher.set_layers.
+    """
+
+    def __init__(self, scan_code_resolver=keyboard_scan_codes, leader=LEADER_HOTKEY):
+        self.scan_code_resolver = scan_code_resolver
+        self.leader = leader
+        self._table = {}
+        self._entries = {}
+        self.sequences = SequenceNode()
+        self._lock = threading.Lock()
+
+    def add(self, hotkey, action, suppress=True, while_paused=False, fire_on=FIRE_ON_RELEASE):
+        """Register `action` for `hotkey`. Raises ValueError for invalid hotkeys."""
+        binding = HotkeyBinding(hotkey, action, suppress, while_paused, fire_on)
+        table_keys = self._table_keys(hotkey)
+        with self._lock:
+            self._add_locked(binding, table_keys)
+        return binding
+
+    def remove(self, hotkey):
+        """Unregister `hotkey`. Returns False kalau tidak terdaftar."""
+        with self._lock:
+            return self._remove_locked(hotkey)
+
+    def apply(self, remove=(), add=()):
+        """
+        Remove and add many bindings in one batch (satu kali ambil lock).
+
+        `add` berisi HotkeyBinding. Returns {hotkey: ValueError} untuk
+        hotkey yang tidak valid; sisanya tetap diterapkan.
+        """
+        failed = {}
+        prepared = []
+        for binding in add:
+            try:
+                prepared.append((binding, self._table_keys(binding.hotkey)))
+            except ValueError as e:
+                failed[binding.hotkey] = e
+        with self._lock:
+            for hotkey in remove:
+                self._remove_locked(hotkey)
+            for binding, table_keys in prepared:
+                self._add_locked(binding, table_keys)
+        return failed
+
+    def _table_keys(self, hotkey):
+        """Table keys for a single chord, atau ("sequence", strokes) untuk multi-stroke."""
+        if is_sequence(hotkey):
+            return ("sequence", parse_sequence(hotkey, self.leader))
+        mask, key = parse_hotkey(hotkey)
+        table_keys = [(mask, key)]
+        if self.scan_code_resolver is not None:
+            is_keypad = key.startswith("num ")
+            for scan_code in self.scan_code_resolver(key):
+                table_keys.append((mask, scan_code, is_keypad))
+        return table_keys
+
+    def _add_locked(self, binding, table_keys):
+        self._remove_locked(binding.hotkey)
+        if table_keys and table_keys[0] == "sequence":
+            node = self.sequences
+            for stroke in table_keys[1]:
+                child = node.children.get(stroke)
+                if child is None:
+                    child = node.children[stroke] = SequenceNode()
+                node = child
+            node.binding = binding
+        else:
+            for table_key in table_keys:
+                self._table[table_key] = binding
+        self._entries[binding.hotkey] = table_keys
+
+    def _remove_locked(self, hotkey):
+        table_keys = self._entries.pop(hotkey, None)
+        if table_keys is None:
+            return False
+        if table_keys and table_keys[0] == "sequence":
+            self._remove_sequence(self.sequences, table_keys[1], hotkey)
+            return True
+        for table_key in table_keys:
+            binding = self._table.get(table_key)
+            if binding is not None and binding.hotkey == hotkey:
+                del self._table[table_key]
+        return True
+
+    def _remove_sequence(self, node, strokes, hotkey):
+        """Remove the binding at the end of `strokes` and prune empty nodes."""
+        if not strokes:
+            if node.binding is not None and node.binding.hotkey == hotkey:
+                node.binding = None
+            return
+        child = node.children.get(strokes[0])
+        if child is None:
+            return
+        self._remove_sequence(child, strokes[1:], hotkey)
+        if child.binding is None and not child.children:
+            del node.children[strokes[0]]
+
+    def clear(self):
+        with self._lock:
+            self._table.clear()
+            self._entries.clear()
+            self.sequences = SequenceNode()
+
+    def hotkeys(self):
+        """Registered hotkey strings."""
+        with self._lock:
+            return list(self._entries)
+
+    def find(self, mask, key, scan_code=None, is_keypad=False):
+        """Lookup with an already canonical key name."""
+        table = self._table
+        binding = table.get((mask, key))
+        if binding is None and mask & MOD_SHIFT and key in SHIFTED_CHARACTERS:
+            # Nama key sudah ter-shift (misal ':' untuk shift+;), coba tanpa shift.
+            binding = table.get((mask & ~MOD_SHIFT, key))
+        if binding is None and scan_code is not None:
+            binding = table.get((mask, scan_code, bool(is_keypad)))
+        return binding
+
+    def __contains__(self, hotkey):
+        return hotkey in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HotkeyDispatcher:
+    """
+    One keyboard hook, one dict lookup per key event (per layer aktif).
+
+    - add/remove/apply bekerja di table dasar (abort hotkey, switch profile,
+      atau semua macro kalau tidak pakai layer).
+    - `set_layers(tables)` mengganti tumpukan table profile dalam satu
+      assignment; table dasar dicek dulu, lalu layer sesuai urutan prioritas.
+    - Hotkey dipicu saat key dilepas (seperti trigger_on_release=True) atau
+      langsung saat ditekan (fire_on="press"); key down, auto-repeat & key up
+      di-suppress kalau binding suppress=True. Auto-repeat tidak pernah
+      memicu ulang, dan pemicuan ulang dalam `debounce` detik dibuang.
+      Jumlahnya dicatat di `metrics` (LatencyRecorder, opsional).
+    - Hook callback hanya lookup table + keputusan suppress; `action()`
+      dijalankan berurutan di satu thread "HotkeyActions", jadi macro yang
+      lambat tidak pernah menahan input keyboard seluruh sistem.
+    - `paused` adalah gate di jalur dispatch: hook dan tabel tetap terpasang,
+      hanya binding while_paused yang dipicu. Pause/resume jadi O(1).
+    - Sequence multi-stroke dicocokkan lewat trie per table: O(1) per stroke.
+      Stroke yang cocok ditahan; sequence dipicu saat stroke terakhir ditekan.
+      Prefix yang gagal / timeout dikirim ulang lewat `replay`.
+    - `scan_code_resolver` / `replay` bisa diganti (misal None) untuk benchmark headless.
+    """
+
+    def __init__(self, scan_code_resolver=keyboard_scan_codes, replay=keyboard_replay,
+                 sequence_timeout=SEQUENCE_TIMEOUT, leader=LEADER_HOTKEY,
+                 debounce=HOTKEY_DEBOUNCE, metrics=None):
+        self.scan_code_resolver = scan_code_resolver
+        self.debounce = debounce
+        self.metrics = metrics
+        # Waktu terakhir tiap hotkey dipicu (untuk debounce): hotkey → monotonic
+        self._last_fired = {}
+        self.replay = replay
+        self.sequence_timeout = sequence_timeout
+        self.leader = leader
+        self.base = HotkeyTable(scan_code_resolver, leader)
+        # Dibaca di thread hook tanpa lock; diganti utuh, tidak pernah di-mutate.
+        self._tables = (self.base,)
+        # Modifier yang sedang ditekan: scan_code → bit
+        self._held_modifiers = {}
+        self._modifier_mask = 0
+        # Dibangunkan setiap kali semua modifier dilepas (lihat wait_modifiers_released)
+        self._modifier_cond = threading.Condition()
+        # Key yang sudah match saat down dan menunggu up: scan_code/name → binding
+        self._armed = {}
+        self._hook = None
+        self.hook_error = None
+        # Dibaca di thread hook tanpa lock; assignment bool atomic di CPython.
+        self.paused = False
+
+        # Sequence yang sedang berjalan: node per table (urut prioritas) + stroke yang ditahan
+        self._sequence_cond = threading.Condition()
+        self._sequence_nodes = []
+        self._sequence_buffer = []
+        self._sequence_deadline = 0.0
+        self._timeout_thread = None
+        # Key yang down-nya dimakan sequence: up & auto-repeat-nya ikut di-suppress
+        self._swallowed = set()
+        # Event hasil replay yang harus dilewatkan: scan_code → sisa event
+        self._injected = {}
+        # Action yang dipicu hook, dijalankan FIFO di thread sendiri (lihat _action_loop)
+        self._actions = queue.SimpleQueue()
+        # perf_counter saat hook menyerahkan action yang sedang jalan (dibaca action itu
+        # sebagai waktu hotkey, jadi antrean ikut terukur di metric hook_to_*)
+        self.action_time = None
+        self._action_thread = None
+        self._action_lock = threading.Lock()
+        # listener(event, modifier_mask) untuk key down yang bukan hotkey/sequence
+        # (misal AbbreviationExpander). Return False = suppress key itu.
+        self.key_listener = None
+
+    # ----------------------
+    # Registration
+    # ----------------------
+    def add(self, hotkey, action, suppress=True, while_paused=False, fire_on=FIRE_ON_RELEASE):
+        """Register `action` for `hotkey` in the base table."""
+        return self.base.add(hotkey, action, suppress, while_paused, fire_on)
+
+    def remove(self, hotkey):
+        return self.base.remove(hotkey)
+
+    def apply(self, remove=(), add=()):
+        return self.base.apply(remove, add)
+
+    def clear(self):
+        self.base.clear()
+        self._armed.clear()
+        with self._sequence_cond:
+            self._reset_sequence()
+
+    def hotkeys(self):
+        """Hotkey strings registered in the base table."""
+        return self.base.hotkeys()
+
+    def new_table(self):
+        """Empty HotkeyTable using this dispatcher's scan code resolver and leader."""
+        return HotkeyTable(self.scan_code_resolver, self.leader)
+
+    @property
+    def layers(self):
+        return self._tables[1:]
+
+    def set_layers(self, tables):
+        """Atomically replace the active layer stack (prioritas tertinggi dulu)."""
+        self._tables = (self.base,) + tuple(tables)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def __contains__(self, hotkey):
+        return hotkey in self.base
+
+    def __len__(self):
+        return len(self.base)
+
+    # ----------------------
+    # Hook
+    # ----------------------
+    @property
+    def active(self):
+        return self._hook is not None
+
+    def start(self):
+        """Install the global keyboard hook. Returns False (dan isi hook_error) kalau gagal."""
+        if self._hook is not None:
+            return True
+        if not KEYBOARD_AVAILABLE:
+            self.hook_error = RuntimeError("The 'keyboard' module is not installed.")
+            return False
+        try:
+            self._hook = keyboard.hook(self.on_event, suppress=True)
+        except Exception as e:
+            # Platform tanpa dukungan suppress: tetap jalan, hanya tidak bisa memblok key.
+            try:
+                self._hook = keyboard.hook(self.on_event)
+            except Exception:
+                self.hook_error = e
+                return False
+        self.hook_error = None
+        return True
+
+    def stop(self):
+        if self._hook is None:
+            return
+        try:
+            keyboard.unhook(self._hook)
+        except Exception:
+            pass
+        self._hook = None
+
+    def on_event(self, event):
+        """
+        Hook callback. Returns True to let the event through, False to suppress it.
+        """
+        scan_code = event.scan_code
+        name = event.name
+        is_down = event.event_type == "down"
+
+        if self._injected and scan_code in self._injected:
+            with self._sequence_cond:
+                remaining = self._injected.get(scan_code, 0) - 1
+                if remaining > 0:
+                    self._injected[scan_code] = remaining
+                else:
+                    self._injected.pop(scan_code, None)
+            return True
+
+        bit = modifier_bit(name)
+        if bit:
+            if is_down:
+                self._held_modifiers[scan_code] = bit
+            else:
+                self._held_modifiers.pop(scan_code, None)
+            mask = 0
+            for held in self._held_modifiers.values():
+                mask |= held
+            self._modifier_mask = mask
+            if not mask:
+                with self._modifier_cond:
+                    self._modifier_cond.notify_all()
+            return True
+
+        arm_key = scan_code if scan_code else name
+        if not is_down:
+            if arm_key in self._swallowed:
+                self._swallowed.discard(arm_key)
+                return False
+            binding = self._armed.pop(arm_key, None)
+            if binding is None:
+                return True
+            if binding.fire_on == FIRE_ON_PRESS or (self.paused and not binding.while_paused):
+                # Sudah dipicu saat ditekan, atau di-pause antara down dan up.
+                return not binding.suppress
+            self._fire(binding)
+            return not binding.suppress
+
+        if arm_key in self._swallowed:
+            # Auto-repeat dari key yang dimakan sequence.
+            return False
+        binding = self._armed.get(arm_key)
+        if binding is not None:
+            # Auto-repeat dari key yang sudah armed: tidak pernah memicu ulang.
+            self._count(COUNTER_REPEATS, binding.hotkey)
+            return not binding.suppress
+
+        is_keypad = getattr(event, "is_keypad", False)
+        if self._sequence_nodes:
+            return self._sequence_step(event, arm_key, is_keypad)
+        binding = self.lookup(self._modifier_mask, name, scan_code, is_keypad)
+        if binding is None:
+            if self.paused:
+                return True
+            passed = self._sequence_step(event, arm_key, is_keypad)
+            if passed and self.key_listener is not None:
+                passed = self.key_listener(event, self._modifier_mask)
+                if not passed:
+                    self._swallowed.add(arm_key)
+            return passed
+        if self.paused and not binding.while_paused:
+            return True
+        self._armed[arm_key] = binding
+        if binding.fire_on == FIRE_ON_PRESS:
+            self._fire(binding)
+        return not binding.suppress
+
+    # ----------------------
+    # Modifier state (untuk typing worker)
+    # ----------------------
+    @property
+    def modifier_mask(self):
+        """Bitmask of modifiers physically held right now."""
+        return self._modifier_mask
+
+    def held_modifier_names(self):
+        mask = self._modifier_mask
+        return [name for bit, name in MODIFIER_NAMES if mask & bit]
+
+    def wait_modifiers_released(self, timeout, should_stop=None, poll=0.02):
+        """
+        Block until no modifier is held (True) or `timeout` passes (False).
+        `should_stop` dicek tiap `poll` detik supaya abort tidak menunggu timeout.
+        """
+        if not self._modifier_mask:
+            return True
+        deadline = time.monotonic() + timeout
+        with self._modifier_cond:
+            while self._modifier_mask:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (should_stop is not None and should_stop()):
+                    return False
+                self._modifier_cond.wait(min(remaining, poll))
+        return True
+
+    def _count(self, counter, hotkey):
+        if self.metrics is not None:
+            self.metrics.increment(counter, hotkey)
+
+    def _fire(self, binding):
+        """Run a binding unless it already fired within the debounce window."""
+        now = time.monotonic()
+        last = self._last_fired.get(binding.hotkey)
+        if last is not None and now - last < self.debounce:
+            self._count(COUNTER_BOUNCES, binding.hotkey)
+            return
+        self._last_fired[binding.hotkey] = now
+        self._count(COUNTER_FIRED, binding.hotkey)
+        self._run(binding)
+
+    def _run(self, binding):
+        self.defer(binding.action, binding.hotkey)
+
+    def defer(self, action, label=""):
+        """
+        Run `action()` on the action thread (hook langsung return).
+        Dipakai juga untuk callback lain dari hook, misal trigger abbreviation.
+        """
+        if self._action_thread is None:
+            with self._action_lock:
+                if self._action_thread is None:
+                    self._action_thread = threading.Thread(
+                        target=self._action_loop, name="HotkeyActions", daemon=True)
+                    self._action_thread.start()
+        self._actions.put((action, label, time.perf_counter()))
+
+    def _action_loop(self):
+        while True:
+            action, label, queued = self._actions.get()
+            self.action_time = queued
+            try:
+                action()
+            except Exception as e:
+                try:
+                    print(f"[Keybind] Hotkey '{label}' error: {e}")
+                except Exception:
+                    pass
+
+    def flush_actions(self, timeout=None):
+        """Wait until every action queued so far has run. Returns False kalau timeout."""
+        if self._action_thread is None:
+            return True
+        done = threading.Event()
+        self._actions.put((done.set, "", time.perf_counter()))
+        return done.wait(timeout)
+
+    # ----------------------
+    # Sequences
+    # ----------------------
+    def _sequence_step(self, event, arm_key, is_keypad):
+        """Advance the sequence trie with a key down. Returns pass-through like on_event."""
+        mask = self._modifier_mask
+        key = canonical_key_name(event.name, is_keypad)
+        stroke = (event.scan_code, mask)
+        fire = None
+        replay = None
+        with self._sequence_cond:
+            nodes = self._sequence_nodes
+            if nodes:
+                candidates = [] if self.paused else [n for n in (node.step(mask, key) for node in nodes) if n]
+            else:
+                candidates = [n for n in (t.sequences.step(mask, key) for t in self._tables) if n]
+                if not candidates:
+                    return True
+
+            if candidates:
+                self._swallowed.add(arm_key)
+                self._sequence_buffer.append(stroke)
+                if any(node.children for node in candidates):
+                    # Masih bisa lanjut: tunggu stroke berikutnya (atau timeout).
+                    self._sequence_nodes = candidates
+                    self._sequence_deadline = time.monotonic() + self.sequence_timeout
+                    if not nodes:
+                        self._ensure_timeout_thread()
+                        self._sequence_cond.notify()
+                    return False
+                fire = self._pending_binding(candidates)
+            else:
+                # Stroke tidak melanjutkan sequence manapun.
+                fire = None if self.paused else self._pending_binding(nodes)
+                if fire is None:
+                    self._swallowed.add(arm_key)
+                    self._sequence_buffer.append(stroke)
+                    replay = self._sequence_buffer
+            self._reset_sequence()
+
+        if replay is not None:
+            self._replay(replay)
+            return False
+        self._fire(fire)
+        if not candidates:
+            # Sequence pendek yang jadi prefix sudah dipicu; stroke ini diproses normal.
+            return self.on_event(event)
+        return False
+
+    @staticmethod
+    def _pending_binding(nodes):
+        """Binding of the highest-priority node where a sequence ends."""
+        for node in nodes:
+            if node.binding is not None:
+                return node.binding
+        return None
+
+    def _reset_sequence(self):
+        self._sequence_nodes = []
+        self._sequence_buffer = []
+
+    def _replay(self, strokes):
+        """Send held strokes back to the focused app (di thread terpisah dari hook)."""
+        if self.replay is None or not strokes:
+            return
+        with self._sequence_cond:
+            for scan_code, _ in strokes:
+                self._injected[scan_code] = self._injected.get(scan_code, 0) + 2
+        threading.Thread(target=self.replay, args=(strokes, self._modifier_mask), daemon=True).start()
+
+    def _ensure_timeout_thread(self):
+        if self._timeout_thread is None:
+            self._timeout_thread = threading.Thread(target=self._timeout_loop, daemon=True)
+            self._timeout_thread.start()
+
+    def _timeout_loop(self):
+        """Fire or replay a sequence that stopped halfway for longer than sequence_timeout."""
+        while True:
+            with self._sequence_cond:
+                while True:
+                    if not self._sequence_nodes:
+                        self._sequence_cond.wait()
+                        continue
+                    remaining = self._sequence_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._sequence_cond.wait(remaining)
+                fire = None if self.paused else self._pending_binding(self._sequence_nodes)
+                buffer = self._sequence_buffer
+                self._reset_sequence()
+            if fire is not None:
+                self._fire(fire)
+            else:
+                self._replay(buffer)
+
+    def lookup(self, mask, name, scan_code=None, is_keypad=False):
+        """Find the binding for a key event (dipakai juga oleh benchmark)."""
+        key = canonical_key_name(name, is_keypad)
+        for table in self._tables:
+            binding = table.find(mask, key, scan_code, is_keypad)
+            if binding is not None:
+                return binding
+        return None
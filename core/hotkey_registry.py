@@ -0,0 +1,110 @@
+"""
+Desired-state registry for macro hotkeys.
+The registry remembers what is actually registered in a hotkey table,
+diffs it against the wanted key → bind map and applies only the changes.
+"""
+from collections import namedtuple
+
+from config import FIRE_ON_RELEASE
+from core.hotkey_dispatcher import HotkeyBinding
+
+# Hasil satu sync: list hotkey per kategori + {hotkey: error} yang gagal.
+RegistryDiff = namedtuple("RegistryDiff", ["added", "removed", "updated", "failed"])
+
+
+class HotkeyRegistry:
+    """
+    Keeps hotkey table registrations identical to a key → bind_data map.
+
+    - `make_action(key, bind_data)` membuat callable yang dipicu hotkey
+      (ValueError = macro tidak valid, masuk `failed`).
+    - `fire_on(bind_data)` opsional: "press" / "release" per macro.
+    - Bind dict dianggap immutable: untuk mengubah macro, ganti dict-nya
+      (seperti save_current_macro), jangan diubah in-place.
+    - Hotkey yang gagal (format tidak valid) tidak dianggap terdaftar dan
+      dicatat di `failed`, jadi sync berikutnya mencobanya lagi.
+    """
+
+    def __init__(self, table, make_action, suppress=True, fire_on=None):
+        # HotkeyTable (satu per profile) atau HotkeyDispatcher (table dasar)
+        self.table = table
+        self.make_action = make_action
+        self.suppress = suppress
+        self.fire_on = fire_on or (lambda bind_data: FIRE_ON_RELEASE)
+        self._registered = {}
+        self.failed = {}
+
+    def diff(self, desired):
+        """Return (added, removed, updated) keys needed to reach `desired`."""
+        registered = self._registered
+        removed = [key for key in registered if key not in desired]
+        added = []
+        updated = []
+        for key, data in desired.items():
+            current = registered.get(key)
+            if current is None:
+                added.append(key)
+            elif current is not data and current != data:
+                updated.append(key)
+        return added, removed, updated
+
+    def sync(self, desired):
+        """Apply the minimal diff so the table matches `desired`."""
+        added, removed, updated = self.diff(desired)
+        return self._apply(desired, added, removed, updated)
+
+    def set(self, key, data):
+        """Register or update a single key without diffing the whole map."""
+        current = self._registered.get(key)
+        if current is None:
+            return self._apply({key: data}, [key], [], [])
+        if current is data or current == data:
+            return RegistryDiff([], [], [], {})
+        return self._apply({key: data}, [], [], [key])
+
+    def discard(self, key):
+        """Unregister a single key (no-op kalau tidak terdaftar)."""
+        self.failed.pop(key, None)
+        if key not in self._registered:
+            return RegistryDiff([], [], [], {})
+        return self._apply({}, [], [key], [])
+
+    def _apply(self, desired, added, removed, updated):
+        bindings = []
+        rejected = {}
+        for key in added + updated:
+            try:
+                action = self.make_action(key, desired[key])
+            except ValueError as e:
+                # Macro tidak valid (misal steps rusak): dicatat sama seperti hotkey invalid.
+                rejected[key] = e
+                continue
+            bindings.append(HotkeyBinding(key, action, self.suppress, False, self.fire_on(desired[key])))
+        failed = self.table.apply(remove=removed + updated, add=bindings)
+        failed.update(rejected)
+        for key in removed:
+            del self._registered[key]
+            self.failed.pop(key, None)
+        for key in added + updated:
+            if key in failed:
+                self._registered.pop(key, None)
+                self.failed[key] = failed[key]
+            else:
+                self._registered[key] = desired[key]
+                self.failed.pop(key, None)
+        return RegistryDiff(added, removed, updated, failed)
+
+    def clear(self):
+        """Unregister every key this registry owns (hotkey lain di table tidak disentuh)."""
+        return self.sync({})
+
+    @property
+    def registered(self):
+        """Keys currently registered in the table."""
+        return list(self._registered)
+
+    def __contains__(self, key):
+        return key in self._registered
+
+    def __len__(self):
+        return len(self._registered)
@@ -2,9 +2,10 @@
 Main Keybind Manager class that coordinates all components.
 """
 import tkinter as tk
-from tkinter import messagebox
-import keyboard
+from tkinter import messagebox, simpledialog
+import json
 import threading
+import time
 
 from config import (
     APP_TITLE,
@@ -14,9 +15,37 @@ from config import (
     AVAILABLE_HOTKEYS,
     COLORS,
     TYPING_DELAY_PER_CHAR,
+    TYPING_CHUNK_SIZE,
+    TYPING_DELAY_PER_CHUNK,
+    OUTPUT_BACKEND,
+    DELIVERY_MODES,
+    DELIVERY_TYPE,
+    BUSY_POLICIES,
+    TYPING_BUSY_POLICY,
+    ABORT_HOTKEY,
+    DEFAULT_PROFILE,
+    PROFILE_SWITCH_HOTKEY,
+    FIRE_MODES,
+    FIRE_ON_RELEASE,
+    COUNTER_FLUSH_INTERVAL,
 )
 from core.typing_manager import TypingManager
-from utils.file_manager import save_binds, load_binds
+from core.typing_profile import TypingProfile, PROFILE_FIELDS
+from core.latency import LatencyRecorder, METRIC_HOOK_CALLBACK, METRIC_SAVE_WRITE
+from core.keystroke_plan import KeystrokePlanCache
+from core.macro_steps import MacroProgramCache, ACTION_TEXT, compile_steps
+from core.templates import TemplateCache, TemplateError, TemplateRenderer, CounterStore
+from core.hotkey_dispatcher import HotkeyDispatcher
+from core.hotkey_registry import HotkeyRegistry
+from core.abbreviations import AbbreviationExpander
+from core.output_backend import create_backend
+from core.clipboard import create_clipboard
+from utils.file_manager import build_document
+from utils.binds_writer import BindsWriter
+from utils.journal import put_record, delete_record, counters_record, usage_record
+from utils.store import create_store
+from utils.macro_index import MacroBodyCache, MacroStub
+from utils.macro_pack import mount_packs, pack_dir
 from config import get_config_path, get_legacy_config_path
 
 # Try to import ttkbootstrap for modern UI
@@ -53,9 +82,26 @@ class ModernKeybindManager:
         self.is_paused = False
         self.selected_macro = None
         self.auto_enter = tk.BooleanVar()
+        # Editor: template variable ({date}, {counter}, ...) aktif untuk macro ini
+        self.template_var = tk.BooleanVar()
+
+        # Profile macro: self.binds selalu menunjuk ke dict milik profile aktif
+        self.profiles = {DEFAULT_PROFILE: self.binds}
+        self.active_profile = DEFAULT_PROFILE
+        self.layers = []
+        self.profile_var = tk.StringVar(value=DEFAULT_PROFILE)
+        # Macro pack read-only (folder "packs"), di-mount sebagai layer: {nama: MacroPack}
+        self.packs = {}
 
         # Typing speed (detik per karakter) - bisa diatur user
         self.per_char_delay = tk.DoubleVar(value=TYPING_DELAY_PER_CHAR)
+
+        # Burst mode global (karakter per chunk & delay antar chunk)
+        self.chunk_size = tk.IntVar(value=TYPING_CHUNK_SIZE)
+        self.chunk_delay = tk.DoubleVar(value=TYPING_DELAY_PER_CHUNK)
+
+        # Kebijakan saat hotkey ditekan ketika macro lain masih diketik
+        self.busy_policy = tk.StringVar(value=TYPING_BUSY_POLICY)
         
         # Config paths
         self.legacy_config_file = get_legacy_config_path()
@@ -66,17 +112,83 @@ class ModernKeybindManager:
         except Exception:
             pass
         
+        # Store sesuai STORAGE_MODE (json / journal / sqlite), ditulis di background
+        # (atomic, perubahan beruntun digabung; journal / sqlite: per macro).
+        self.store = create_store(self.config_file)
+        self.writer = BindsWriter(self.store, callback=self._on_binds_saved)
+        # Jumlah pemakaian per (profile, hotkey) sejak flush terakhir (store sqlite)
+        self.usage = {} if self.store.tracks_usage else None
+
         # Keyboard shortcut
         self.root.bind("<Control-s>", lambda e: self.save_current_macro())
+        self.root.protocol("WM_DELETE_WINDOW", self.shutdown)
+
+        # Snapshot setting global (immutable). Dibangun ulang di Tk thread setiap
+        # kali variable berubah, jadi hotkey callback tidak perlu membaca Tk.
+        self.global_profile = TypingProfile()
+        self._refresh_global_profile()
+
+        # Histogram latency hotkey → keystroke (lihat panel Diagnostics)
+        self.metrics = LatencyRecorder()
 
-        # Typing manager (pakai callback ke variable delay)
+        # Text macro di-compile ke keystroke plan sekali (saat load / save)
+        self.plan_cache = KeystrokePlanCache()
+        # Macro multi-step di-compile ke action list sekali (saat load / save)
+        self.macro_programs = MacroProgramCache()
+        # Store sqlite (lazy): isi macro diambil saat pertama dipakai, LRU terbatas.
+        self.bodies = MacroBodyCache(self.store, on_evict=self.macro_programs.discard)
+
+        # Text dengan template variable di-parse sekali; counter disimpan per batch.
+        self.templates = TemplateCache()
+        self.counters = CounterStore()
+        clipboard = create_clipboard()
+
+        # Typing manager (worker menerima profile per job)
         self.typing_manager = TypingManager(
-            lambda: self.auto_enter.get(),
-            per_char_delay_callback=lambda: self.per_char_delay.get(),
+            backend=create_backend(OUTPUT_BACKEND),
+            clipboard=clipboard,
+            profile=self.global_profile,
+            busy_policy=self.busy_policy.get(),
+            abort_callback=self._on_typing_aborted,
+            metrics=self.metrics,
+            plan_cache=self.plan_cache,
+            renderer=TemplateRenderer(clipboard=clipboard, counters=self.counters),
         )
+        self.busy_policy.trace_add("write", lambda *_: self._on_busy_policy_changed())
+        for var in (self.auto_enter, self.per_char_delay, self.chunk_size, self.chunk_delay):
+            var.trace_add("write", lambda *_: self._refresh_global_profile())
         
-        # Available hotkeys
+        # Available hotkeys & delivery modes
         self.available_hotkeys = AVAILABLE_HOTKEYS
+        self.delivery_modes = DELIVERY_MODES
+        self.fire_modes = FIRE_MODES
+        self.busy_policies = BUSY_POLICIES
+        
+        # Satu keyboard hook global untuk semua hotkey macro
+        self.dispatcher = HotkeyDispatcher(metrics=self.metrics)
+        if self.dispatcher.start():
+            # Hook tahu modifier mana yang masih ditekan: worker mulai mengetik
+            # begitu modifier hotkey dilepas, bukan setelah delay tetap.
+            self.typing_manager.modifier_gate = self.dispatcher
+        else:
+            try:
+                print(f"[Keybind] Keyboard hook gagal dipasang: {self.dispatcher.hook_error}")
+            except Exception:
+                pass
+        # Satu HotkeyTable + registry per profile (disamakan dengan binds-nya lewat diff);
+        # profile aktif + layers ditumpuk di dispatcher.
+        self.profile_hotkeys = {}
+        self.hotkeys = self._profile_registry(DEFAULT_PROFILE)
+        self._apply_layer_stack()
+
+        # Trigger abbreviation (misal ";gg") dicocokkan dari key event di hook yang sama.
+        # Diabaikan selama macro diketik supaya text hasil macro tidak memicu trigger.
+        self.abbreviations = AbbreviationExpander(
+            lambda target, trigger: self.dispatcher.defer(
+                lambda: self._expand_trigger(target, trigger), trigger),
+            should_ignore=lambda: self.typing_manager.is_busy,
+        )
+        self.dispatcher.key_listener = self.abbreviations.on_key
         
         # Setup UI (will be imported from ui.gui)
         from ui.gui import setup_gui
@@ -88,27 +200,373 @@ class ModernKeybindManager:
         # Load saved binds
         self.load_binds()
 
+        # Hotkey global untuk membatalkan macro yang sedang diketik
+        self._register_abort_hotkey()
+        self._register_profile_hotkey()
+
+        # Counter template ditulis ke file per batch
+        self.root.after(int(COUNTER_FLUSH_INTERVAL * 1000), self._flush_counters)
+
     # ----------------------
-    # Helper: hotkey mapping
+    # Helper: hotkey dispatch
     # ----------------------
-    @staticmethod
-    def _normalize_hotkey(key: str) -> str:
+    def _make_macro_action(self, key, bind_data, profile_name=None):
+        """Callable dispatched when the macro's hotkey fires (ValueError kalau steps / template rusak)."""
+        if not isinstance(bind_data, MacroStub):
+            # Isi macro yang belum dimuat baru divalidasi saat pertama di-fire.
+            self._compile_macro(bind_data)
+        return lambda: self._fire_macro(key, bind_data, profile_name=profile_name)
+
+    def _compile_macro(self, bind_data):
+        """
+        Return (actions, template) for a macro, dari cache kalau sudah di-compile.
+        Raises MacroStepError / TemplateError kalau tidak valid.
         """
-        Normalize user-friendly hotkey strings to the format expected by
-        the `keyboard` library.
+        actions = self.macro_programs.get(bind_data)
+        if actions is not None:
+            return actions, None
+        if not bind_data.get("template"):
+            # Macro tanpa "template": true diketik apa adanya (kurung kurawal literal).
+            return None, None
+        return None, self.templates.get(bind_data.get("text", ""))
+
+    def _sync_hotkeys(self, name=None):
+        """Apply the registration diff for a profile (default: aktif) and report invalid keys."""
+        name = name or self.active_profile
+        result = self._profile_registry(name).sync(self._profile_binds(name))
+        for key, error in result.failed.items():
+            try:
+                print(f"[Keybind] Hotkey '{key}' ({name}) gagal diregister: {error}")
+            except Exception:
+                pass
+        return result
+
+    # ----------------------
+    # Profiles & layers
+    # ----------------------
+    def _profile_registry(self, name):
+        """HotkeyRegistry (dengan HotkeyTable sendiri) untuk profile `name`."""
+        registry = self.profile_hotkeys.get(name)
+        if registry is None:
+            registry = HotkeyRegistry(
+                self.dispatcher.new_table(),
+                lambda key, bind_data: self._make_macro_action(key, bind_data, name),
+                fire_on=lambda bind_data: bind_data.get("fire_on", FIRE_ON_RELEASE),
+            )
+            self.profile_hotkeys[name] = registry
+        return registry
+
+    def _profile_binds(self, name):
+        """Binds of a profile atau macro pack (read-only); {} kalau tidak ada."""
+        if name in self.profiles:
+            return self.profiles[name]
+        pack = self.packs.get(name)
+        return pack.binds if pack is not None else {}
+
+    def _layer_stack(self):
+        """Profile names in priority order: profile aktif dulu, lalu layers (profile / macro pack)."""
+        stack = [self.active_profile]
+        for name in self.layers:
+            if (name in self.profiles or name in self.packs) and name not in stack:
+                stack.append(name)
+        return stack
+
+    def _mount_packs(self):
+        """(Re)mount every macro pack next to the config file; pack baru ditambahkan ke layers."""
+        for name, pack in self.packs.items():
+            # Stub yang terdaftar menunjuk ke pack lama: register ulang dari awal.
+            registry = self.profile_hotkeys.pop(name, None)
+            if registry is not None:
+                registry.clear()
+            pack.close()
+        self.packs = {}
+        for pack in mount_packs(pack_dir(self.config_file)):
+            if pack.name in self.profiles or pack.name in self.packs:
+                try:
+                    print(f"[Keybind] Macro pack '{pack.path}' dilewati: nama '{pack.name}' sudah dipakai")
+                except Exception:
+                    pass
+                pack.close()
+                continue
+            self.packs[pack.name] = pack
+            if pack.name not in self.layers:
+                self.layers.append(pack.name)
+
+    def _apply_layer_stack(self):
+        """Swap the dispatcher's layer tables in one step (tanpa register ulang)."""
+        self.dispatcher.set_layers([self._profile_registry(name).table for name in self._layer_stack()])
+
+    def _register_profile_hotkey(self):
+        """Register the hotkey that cycles through profiles."""
+        try:
+            self.dispatcher.add(PROFILE_SWITCH_HOTKEY, self.cycle_profile)
+        except ValueError as e:
+            try:
+                print(f"[Keybind] Profile hotkey '{PROFILE_SWITCH_HOTKEY}' gagal diregister: {e}")
+            except Exception:
+                pass
+
+    def switch_profile(self, name):
+        """Make `name` the active profile (dari combobox atau hotkey)."""
+        if name not in self.profiles or name == self.active_profile:
+            self.profile_var.set(self.active_profile)
+            return
+        self.active_profile = name
+        self.binds = self.profiles[name]
+        self.hotkeys = self._profile_registry(name)
+        self._apply_layer_stack()
+        self._sync_triggers()
 
-        Example:
-        - "numpad 1" -> "num 1"
-        - "numpad +" -> "num +"
+        self.profile_var.set(name)
+        self.add_new_macro()
+        self.refresh_macro_list()
+        self.update_status()
+        self.save_binds()
+
+    def cycle_profile(self):
+        """Hotkey callback (thread action dispatcher): pindah ke profile berikutnya di Tk thread."""
+        self.root.after(0, self._switch_to_next_profile)
+
+    def _switch_to_next_profile(self):
+        names = list(self.profiles)
+        index = names.index(self.active_profile)
+        self.switch_profile(names[(index + 1) % len(names)])
+
+    def create_profile(self):
+        """Ask for a name, create an empty profile and switch to it."""
+        name = simpledialog.askstring("New Profile", "Nama profile baru:", parent=self.root)
+        name = (name or "").strip()
+        if not name:
+            return
+        if name in self.profiles or name in self.packs:
+            messagebox.showwarning("Warning", f"Profile '{name}' sudah ada!")
+            return
+        self.profiles[name] = {}
+        self._refresh_profile_choices()
+        self.switch_profile(name)
+
+    def delete_profile(self):
+        """Delete the active profile (kecuali Default) beserta macronya."""
+        name = self.active_profile
+        if name == DEFAULT_PROFILE:
+            messagebox.showwarning("Warning", f"Profile '{DEFAULT_PROFILE}' tidak bisa dihapus!")
+            return
+        count = len(self.profiles[name])
+        if not messagebox.askyesno("Confirm Delete", f"Yakin ingin hapus profile '{name}'\n({count} macro)?"):
+            return
+        self.switch_profile(DEFAULT_PROFILE)
+        for bind_data in self.profiles.pop(name).values():
+            bind_data = self.bodies.peek(bind_data) or {}
+            self.plan_cache.invalidate(bind_data.get("text", ""))
+        self.profile_hotkeys.pop(name).clear()
+        if name in self.layers:
+            self.layers.remove(name)
+            self._apply_layer_stack()
+            self._sync_triggers()
+        self._refresh_profile_choices()
+        self.save_binds()
+
+    def _refresh_profile_choices(self):
+        try:
+            self.profile_combo.config(values=list(self.profiles))
+        except Exception:
+            pass
+
+    def _fire_macro(self, key, bind_data, erase=0, profile_name=None):
+        """Hotkey callback: send a macro's text with the global profile + its overrides."""
+        # Waktu hook menyerahkan hotkey ke thread action (bukan waktu action mulai jalan)
+        hook_time = self.dispatcher.action_time or time.perf_counter()
+        # Override profile ada di index, jadi stub cukup untuk merge.
+        profile = self.global_profile.merged(bind_data)
+        if isinstance(bind_data, MacroStub):
+            # Isi macro dibaca dari store / pack + di-compile di typing worker,
+            # bukan di thread hotkey (store bisa sedang dikunci BindsWriter).
+            self.typing_manager.send_macro(lambda: self._load_macro(key, bind_data), profile, macro=key,
+                                           hook_time=hook_time, erase=erase)
+        else:
+            try:
+                actions, template = self._compile_macro(bind_data)
+            except ValueError as e:
+                try:
+                    print(f"[Keybind] Macro '{key}' tidak valid: {e}")
+                except Exception:
+                    pass
+                return
+            if actions is not None:
+                self.typing_manager.send_actions(actions, profile, macro=key, hook_time=hook_time, erase=erase)
+            else:
+                self.typing_manager.send_text(bind_data.get("text", ""), profile, macro=key, hook_time=hook_time,
+                                              erase=erase, template=template)
+        if self.usage is not None and profile_name is not None:
+            fired, _ = self.usage.get((profile_name, key), (0, None))
+            self.usage[(profile_name, key)] = (fired + 1, time.time())
+        self.metrics.record(METRIC_HOOK_CALLBACK, time.perf_counter() - hook_time, key)
+
+    def _load_macro(self, key, stub):
         """
-        if not key:
-            return key
+        Typing worker: load + compile the body of a MacroStub.
+        Returns (text, actions, template), atau None kalau tidak ada / tidak valid.
+        """
+        bind_data = self.bodies.resolve(stub)
+        try:
+            actions, template = self._compile_macro(bind_data)
+        except ValueError as e:
+            try:
+                print(f"[Keybind] Macro '{key}' tidak valid: {e}")
+            except Exception:
+                pass
+            return None
+        text = bind_data.get("text", "")
+        if actions is None and not text:
+            return None
+        return text, actions, template
+
+    def _expand_trigger(self, target, trigger):
+        """Abbreviation callback (thread action dispatcher): hapus trigger lalu ketik macro-nya."""
+        profile_name, key = target
+        bind_data = self._profile_binds(profile_name).get(key)
+        if bind_data is not None:
+            # Karakter terakhir trigger sudah di-suppress, sisanya dihapus dengan backspace.
+            self._fire_macro(key, bind_data, erase=len(trigger) - 1, profile_name=profile_name)
+
+    def _precompile(self, bind_data):
+        """Compile a macro's action list and keystroke plans ahead of time."""
+        if isinstance(bind_data, MacroStub):
+            # Isi belum dimuat: di-compile saat pertama di-fire.
+            return
+        backend = self.typing_manager.backend
+        try:
+            actions, template = self._compile_macro(bind_data)
+        except ValueError:
+            # Dilaporkan saat hotkey-nya diregister.
+            return
+        if actions is None:
+            # Text dengan template baru diketahui isinya saat di-render.
+            if template is None:
+                self.plan_cache.precompile(bind_data.get("text", ""), backend)
+            return
+        for action in actions:
+            if action.op == ACTION_TEXT and isinstance(action.arg, str):
+                self.plan_cache.precompile(action.arg, backend)
+
+    def _read_steps(self):
+        """
+        Parse the Steps editor (JSON list). Returns None kalau kosong.
+        Raises ValueError (termasuk MacroStepError) kalau tidak valid.
+        """
+        raw = self.steps_editor.get("1.0", tk.END).strip()
+        if not raw:
+            return None
+        try:
+            steps = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON tidak valid (baris {e.lineno}, kolom {e.colno}): {e.msg}") from None
+        compile_steps(steps, templates=self.template_var.get())
+        return steps
+
+    def _sync_triggers(self):
+        """Feed the triggers of the active profile stack to the abbreviation matcher."""
+        triggers = {}
+        for name in self._layer_stack():
+            for key, bind_data in self._profile_binds(name).items():
+                trigger = bind_data.get("trigger")
+                if trigger and trigger.lower() not in triggers:
+                    triggers[trigger.lower()] = (name, key)
+        self.abbreviations.sync(triggers)
 
-        lower = key.lower()
-        if lower.startswith("numpad "):
-            suffix = key[7:].strip()  # everything after "numpad "
-            return f"num {suffix}"
-        return key
+    def _refresh_global_profile(self):
+        """
+        Rebuild the global TypingProfile from the Tk variables (Tk thread only).
+        Field yang isinya sedang tidak valid (misal user masih mengetik)
+        tetap pakai nilai sebelumnya.
+        """
+        values = {}
+        for name, var in (
+            ("auto_enter", self.auto_enter),
+            ("per_char_delay", self.per_char_delay),
+            ("chunk_size", self.chunk_size),
+            ("chunk_delay", self.chunk_delay),
+        ):
+            try:
+                values[name] = var.get()
+            except (tk.TclError, ValueError):
+                pass
+        self.global_profile = self.global_profile.merged(values)
+        typing_manager = getattr(self, "typing_manager", None)
+        if typing_manager is not None:
+            typing_manager.profile = self.global_profile
+
+    def _register_abort_hotkey(self):
+        """Register the global abort hotkey (tidak di-suppress)."""
+        try:
+            self.dispatcher.add(ABORT_HOTKEY, self.abort_typing, suppress=False, while_paused=True)
+        except ValueError as e:
+            try:
+                print(f"[Keybind] Abort hotkey '{ABORT_HOTKEY}' gagal diregister: {e}")
+            except Exception:
+                pass
+
+    def abort_typing(self):
+        """Stop the macro being typed and clear the queue (dari hotkey atau tombol)."""
+        self.typing_manager.abort()
+
+    def _on_typing_aborted(self, report):
+        """Called from the typing worker; hand the report to the Tk thread."""
+        self.root.after(0, lambda: self._show_abort_report(report))
+
+    def _show_abort_report(self, report):
+        """Show how far the aborted macro got in the status bar."""
+        self.status_bar.config(
+            text=f"⏹ Typing dibatalkan • {report.chars_emitted}/{report.chars_total} karakter terkirim"
+                 f" • {report.jobs_cleared} antrean dihapus",
+            fg=COLORS["accent_red"],
+        )
+
+    def show_diagnostics(self):
+        """Open the latency diagnostics panel."""
+        from ui.gui import open_diagnostics_window
+        open_diagnostics_window(self)
+
+    def export_diagnostics(self):
+        """Dump the latency histograms to a JSON file chosen by the user."""
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            title="Export Diagnostics",
+            defaultextension=".json",
+            initialfile="keybind_latency.json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            self.metrics.dump_json(path)
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Gagal menyimpan diagnostics\n\nPath: {path}\nError: {e}")
+            return
+        messagebox.showinfo("Exported", f"✓ Diagnostics disimpan ke:\n{path}")
+
+    def _on_busy_policy_changed(self):
+        """Push the busy policy chosen in the GUI to the typing worker."""
+        policy = self.busy_policy.get()
+        if policy in self.busy_policies:
+            self.typing_manager.busy_policy = policy
+
+    def _read_burst_overrides(self):
+        """
+        Read the per-macro burst fields from the editor.
+        Returns (chunk_size, chunk_delay); None berarti pakai setting global.
+        Raises ValueError kalau isinya tidak valid.
+        """
+        size_raw = self.macro_chunk_size_entry.get().strip()
+        delay_raw = self.macro_chunk_delay_entry.get().strip()
+
+        chunk_size = int(size_raw) if size_raw else None
+        chunk_delay = float(delay_raw) if delay_raw else None
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Burst size minimal 1")
+        if chunk_delay is not None and chunk_delay < 0:
+            raise ValueError("Burst delay tidak boleh negatif")
+        return chunk_size, chunk_delay
     
     def save_current_macro(self):
         """Save the current macro being edited."""
@@ -126,55 +584,106 @@ class ModernKeybindManager:
             self.key_entry.focus()
             return
         
-        if not text:
-            messagebox.showwarning("Warning", "Text content harus diisi!")
+        try:
+            steps = self._read_steps()
+        except ValueError as e:
+            messagebox.showwarning("Warning", f"Steps tidak valid!\n({e})")
+            self.steps_editor.focus()
+            return
+
+        if not text and steps is None:
+            messagebox.showwarning("Warning", "Text content (atau Steps) harus diisi!")
+            self.text_editor.focus()
+            return
+
+        try:
+            if self.template_var.get():
+                self.templates.get(text)
+        except TemplateError as e:
+            messagebox.showwarning("Warning", f"Template di Text Content tidak valid!\n({e})")
             self.text_editor.focus()
             return
 
+        try:
+            chunk_size, chunk_delay = self._read_burst_overrides()
+        except ValueError as e:
+            messagebox.showwarning("Warning", f"Burst setting tidak valid!\n({e})")
+            self.macro_chunk_size_entry.focus()
+            return
+
         old_key = self.selected_macro
         key_changed = bool(old_key) and old_key != key
 
+        trigger = self.trigger_entry.get().strip()
+        if trigger:
+            for other_key, other in self.binds.items():
+                if other_key not in (key, old_key) and (other.get("trigger") or "").lower() == trigger.lower():
+                    messagebox.showwarning("Warning", f"Trigger '{trigger}' sudah dipakai macro '{other_key}'!")
+                    self.trigger_entry.focus()
+                    return
+
+        # Override profile lain yang diisi manual di keybinds.json ikut dipertahankan.
+        previous = self.binds.get(old_key, {}) if old_key else {}
+
+        # Plan lama sudah tidak berlaku setelah text diedit (isi yang belum dimuat belum punya plan).
+        for stale in (previous, self.binds.get(key, {})):
+            stale = self.bodies.peek(stale) or {}
+            if stale.get("text") and stale.get("text") != text:
+                self.plan_cache.invalidate(stale["text"])
+                self.templates.invalidate(stale["text"])
+
         # Update in-memory first (gunakan key seperti yang user lihat)
         self.binds[key] = {
             "label": label,
-            "text": text
+            "text": text,
+            "delivery": self.delivery_entry.get() or DELIVERY_TYPE,
         }
+        if chunk_size is not None:
+            self.binds[key]["chunk_size"] = chunk_size
+        if chunk_delay is not None:
+            self.binds[key]["chunk_delay"] = chunk_delay
+        if trigger:
+            self.binds[key]["trigger"] = trigger
+        if self.template_var.get():
+            self.binds[key]["template"] = True
+        if steps is not None:
+            self.binds[key]["steps"] = steps
+        fire_on = self.fire_on_entry.get() or FIRE_ON_RELEASE
+        if fire_on != FIRE_ON_RELEASE:
+            self.binds[key]["fire_on"] = fire_on
+        for name in PROFILE_FIELDS:
+            if name in previous and name not in ("delivery", "chunk_size", "chunk_delay"):
+                self.binds[key][name] = previous[name]
+
+        self.macro_programs.discard(self.bodies.peek(previous) or previous)
+        self._precompile(self.binds[key])
 
         hotkey_registered = False
         hotkey_error = None
 
         # Register hotkey
-        try:
-            norm_key = self._normalize_hotkey(key)
-            try:
-                keyboard.remove_hotkey(norm_key)
-            except Exception:
-                pass
-
-            keyboard.add_hotkey(
-                norm_key,
-                lambda t=text: self.typing_manager.send_text(t),
-                suppress=True,
-                trigger_on_release=True,
-            )
+        result = self.hotkeys.set(key, self.binds[key])
+        if key in result.failed:
+            hotkey_error = result.failed[key]
+        elif not self.dispatcher.active:
+            hotkey_error = RuntimeError(f"Keyboard hook tidak aktif ({self.dispatcher.hook_error})")
+        else:
             hotkey_registered = True
-        except Exception as e:
-            hotkey_error = e
+
+        changes = [put_record(self.active_profile, key, self.binds[key])]
 
         # Remove old key if new one registered successfully
         if key_changed and hotkey_registered:
-            norm_old = self._normalize_hotkey(old_key)
-            try:
-                keyboard.remove_hotkey(norm_old)
-            except Exception:
-                pass
             if old_key in self.binds:
                 del self.binds[old_key]
+                changes.append(delete_record(self.active_profile, old_key))
+            self.hotkeys.discard(old_key)
+        self._sync_triggers()
 
         # Persist
         self.selected_macro = key
         self.refresh_macro_list()
-        self.save_binds()
+        self.save_binds(changes)
         self.update_status()
 
         if hotkey_registered:
@@ -204,14 +713,16 @@ class ModernKeybindManager:
         label = self.binds[key].get("label", key)
         
         if messagebox.askyesno("Confirm Delete", f"Yakin ingin hapus macro:\n\n'{label}' (Hotkey: {key})?"):
-            try:
-                keyboard.remove_hotkey(self._normalize_hotkey(key))
-            except:
-                pass
-            
+            self.hotkeys.discard(key)
+            loaded = self.bodies.peek(self.binds[key])
+            if loaded is not None:
+                self.plan_cache.invalidate(loaded.get("text", ""))
+                self.macro_programs.discard(loaded)
+                self.templates.invalidate(loaded.get("text", ""))
             del self.binds[key]
+            self._sync_triggers()
             self.refresh_macro_list()
-            self.save_binds()
+            self.save_binds([delete_record(self.active_profile, key)])
             self.add_new_macro()
             self.update_status()
             messagebox.showinfo("Deleted", f"✓ Macro '{label}' berhasil dihapus!")
@@ -222,7 +733,8 @@ class ModernKeybindManager:
         self.typing_manager.is_paused = self.is_paused
         
         if self.is_paused:
-            keyboard.unhook_all()
+            # Hook & registrasi tetap terpasang; abort (while_paused) tetap aktif.
+            self.dispatcher.pause()
             self.update_status()
             try:
                 if self.use_ttkbootstrap:
@@ -234,17 +746,7 @@ class ModernKeybindManager:
                 pass
             messagebox.showinfo("Paused", "⏸ Semua hotkey dinonaktifkan sementara.")
         else:
-            for key, data in self.binds.items():
-                norm_key = self._normalize_hotkey(key)
-                try:
-                    keyboard.add_hotkey(
-                        norm_key,
-                        lambda t=data["text"]: self.typing_manager.send_text(t),
-                        suppress=True,
-                        trigger_on_release=True,
-                    )
-                except Exception:
-                    pass
+            self.dispatcher.resume()
             self.update_status()
             try:
                 if self.use_ttkbootstrap:
@@ -256,33 +758,108 @@ class ModernKeybindManager:
                 pass
             messagebox.showinfo("Resumed", "▶ Hotkey aktif kembali!")
     
-    def save_binds(self):
-        """Save binds to file."""
-        save_binds(self.config_file, self.binds, self.auto_enter.get())
+    def save_binds(self, changes=None):
+        """
+        Queue a snapshot of every profile for the background writer.
+        `changes` = record journal untuk edit ini (None = butuh snapshot penuh,
+        misal profile / layer berubah).
+        """
+        counters_changed = self.counters.dirty
+        counters = self.counters.snapshot()
+        if changes is not None and counters_changed:
+            changes = list(changes) + [counters_record(counters)]
+        profiles = {name: binds for name, binds in self.profiles.items() if name != DEFAULT_PROFILE}
+        self.writer.submit(build_document(
+            self.profiles[DEFAULT_PROFILE],
+            self.auto_enter.get(),
+            profiles=profiles,
+            active_profile=self.active_profile,
+            layers=self.layers,
+            counters=counters,
+        ), changes)
+
+    def _on_binds_saved(self, result):
+        """Writer thread callback: catat durasi tulis, error ditampilkan di status bar."""
+        self.metrics.record(METRIC_SAVE_WRITE, result.seconds)
+        if not result.ok:
+            self.root.after(0, lambda: self._show_save_error(result.error))
+
+    def _show_save_error(self, error):
+        self.status_bar.config(
+            text=f"⚠ Gagal menyimpan {self.store.path}: {error}",
+            fg=COLORS["accent_red"],
+        )
+
+    def _flush_counters(self):
+        """Periodic batch save: tulis hanya kalau counter template / statistik pemakaian berubah."""
+        changes = self._usage_changes()
+        if changes or self.counters.dirty:
+            self.save_binds(changes)
+        self.root.after(int(COUNTER_FLUSH_INTERVAL * 1000), self._flush_counters)
+
+    def _usage_changes(self):
+        """Take the usage counted since the last flush as store records."""
+        if not self.usage:
+            return []
+        usage, self.usage = self.usage, {}
+        return [usage_record(profile, key, fired, last) for (profile, key), (fired, last) in usage.items()]
+
+    def shutdown(self):
+        """Window closed: tulis semua perubahan yang tertunda lalu tutup."""
+        try:
+            changes = self._usage_changes()
+            if changes or self.counters.dirty:
+                self.save_binds(changes)
+            self.typing_manager.abort()
+            self.dispatcher.stop()
+            flushed = self.writer.close(timeout=5)
+            result = self.writer.last_result
+            if not flushed or (result is not None and not result.ok):
+                messagebox.showerror(
+                    "Save Error",
+                    "Gagal menyimpan keybinds.json\n\n"
+                    f"Path: {self.store.path}\n"
+                    f"Error: {result.error if result is not None else 'timeout'}"
+                )
+        finally:
+            self.root.destroy()
     
     def load_binds(self):
         """Load binds from file."""
-        binds, auto_enter, migrated = load_binds(self.config_file, self.legacy_config_file)
-        
-        if not binds and not migrated:
-            return
+        binds, auto_enter, migrated, profile_state = self.store.load(self.legacy_config_file)
         
-        self.binds = binds
+        self.profiles = {DEFAULT_PROFILE: binds}
+        for name, profile_binds in profile_state["profiles"].items():
+            self.profiles.setdefault(name, profile_binds)
+        self.layers = profile_state["layers"]
+        self._mount_packs()
+        active = profile_state["active_profile"]
+        self.active_profile = active if active in self.profiles else DEFAULT_PROFILE
+        self.binds = self.profiles[self.active_profile]
         self.auto_enter.set(auto_enter)
+        self.counters.load(profile_state["counters"])
 
-        # Register hotkeys
-        for key, bind_data in self.binds.items():
-            text = bind_data.get("text", "")
-            norm_key = self._normalize_hotkey(key)
-            try:
-                keyboard.add_hotkey(
-                    norm_key,
-                    lambda t=text: self.typing_manager.send_text(t),
-                    suppress=True,
-                    trigger_on_release=True,
-                )
-            except Exception:
-                pass
+        # Compile macro yang aktif (steps + keystroke plan) sekarang, bukan saat hotkey ditekan.
+        self.plan_cache.clear()
+        self.bodies.clear()
+        self.macro_programs.clear()
+        self.templates.clear()
+        for name in self._layer_stack():
+            for bind_data in self._profile_binds(name).values():
+                self._precompile(bind_data)
+
+        # Register hotkeys per profile (hanya selisih terhadap yang sudah terdaftar)
+        for name in list(self.profile_hotkeys):
+            if name not in self.profiles and name not in self.packs:
+                self.profile_hotkeys.pop(name).clear()
+        for name in list(self.profiles) + list(self.packs):
+            self._sync_hotkeys(name)
+        self.hotkeys = self._profile_registry(self.active_profile)
+        self._apply_layer_stack()
+        self._sync_triggers()
+
+        self.profile_var.set(self.active_profile)
+        self._refresh_profile_choices()
 
         self.refresh_macro_list()
         self.update_status()
@@ -291,7 +868,7 @@ class ModernKeybindManager:
         if migrated:
             self.save_binds()
             self.status_bar.config(
-                text=f"✨ Migrated macros to {self.config_file}",
+                text=f"✨ Migrated macros to {self.store.path}",
                 fg=COLORS["accent_teal"]
             )
     
@@ -307,7 +884,7 @@ class ModernKeybindManager:
     def select_macro(self, key):
         """Select a macro from the list and load it into the editor."""
         self.selected_macro = key
-        data = self.binds[key]
+        data = self.bodies.resolve(self.binds[key])
         
         self.label_entry.delete(0, tk.END)
         self.label_entry.insert(0, data.get("label", ""))
@@ -315,28 +892,54 @@ class ModernKeybindManager:
         # Combobox pakai set() untuk set value
         self.key_entry.set(key)
         
+        self.trigger_entry.delete(0, tk.END)
+        self.trigger_entry.insert(0, data.get("trigger", ""))
+
         self.text_editor.delete("1.0", tk.END)
         self.text_editor.insert("1.0", data.get("text", ""))
+
+        self.template_var.set(bool(data.get("template")))
+
+        self.steps_editor.delete("1.0", tk.END)
+        if data.get("steps") is not None:
+            self.steps_editor.insert("1.0", json.dumps(data["steps"], indent=2, ensure_ascii=False))
+
+        self.macro_chunk_size_entry.delete(0, tk.END)
+        self.macro_chunk_size_entry.insert(0, str(data.get("chunk_size", "")))
+        self.macro_chunk_delay_entry.delete(0, tk.END)
+        self.macro_chunk_delay_entry.insert(0, str(data.get("chunk_delay", "")))
+        self.delivery_entry.set(data.get("delivery", DELIVERY_TYPE))
+        self.fire_on_entry.set(data.get("fire_on", FIRE_ON_RELEASE))
     
     def add_new_macro(self):
         """Clear the editor to add a new macro."""
         self.selected_macro = None
         self.label_entry.delete(0, tk.END)
         self.key_entry.set('F1')  # Set default to F1
+        self.trigger_entry.delete(0, tk.END)
         self.text_editor.delete("1.0", tk.END)
+        self.template_var.set(False)
+        self.steps_editor.delete("1.0", tk.END)
+        self.macro_chunk_size_entry.delete(0, tk.END)
+        self.macro_chunk_delay_entry.delete(0, tk.END)
+        self.delivery_entry.set(DELIVERY_TYPE)
+        self.fire_on_entry.set(FIRE_ON_RELEASE)
         self.label_entry.focus()
     
     def update_status(self):
         """Update status bar text."""
         count = len(self.binds)
+        profile = f"Profile: {self.active_profile}"
+        if self.layers:
+            profile += f" (+{len(self._layer_stack()) - 1} layer)"
         if self.is_paused:
             self.status_bar.config(
-                text=f"⏸ Paused • Status: Stopped • {count} macro{'s' if count != 1 else ''} loaded",
+                text=f"⏸ Paused • Status: Stopped • {profile} • {count} macro{'s' if count != 1 else ''} loaded",
                 fg=COLORS["accent_orange"],
             )
         else:
             self.status_bar.config(
-                text=f"▶ Playing • Status: Playing • {count} macro{'s' if count != 1 else ''} loaded",
+                text=f"▶ Playing • Status: Playing • {profile} • {count} macro{'s' if count != 1 else ''} loaded",
                 fg=COLORS["accent_teal"],
             )
     
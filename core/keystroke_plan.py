@@ -0,0 +1,89 @@
+"""
+Precompiled keystroke plans.
+A macro's text is resolved to (scan code, modifiers) once per keyboard
+layout, so the typing loop can replay it without per-character lookups.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+from config import KEYSTROKE_PLAN_CACHE_SIZE
+
+# scan_code None = tidak ada di layout, kirim `char` lewat unicode fallback.
+PlanEntry = namedtuple("PlanEntry", ["scan_code", "modifiers", "char"])
+
+
+def compile_plan(text, backend):
+    """Resolve every character of `text` through `backend.resolve_char`."""
+    cache = {}
+    plan = []
+    for char in text:
+        entry = cache.get(char)
+        if entry is None:
+            resolved = None
+            try:
+                resolved = backend.resolve_char(char)
+            except Exception:
+                pass
+            if resolved is None:
+                entry = PlanEntry(None, (), char)
+            else:
+                scan_code, modifiers = resolved
+                entry = PlanEntry(scan_code, tuple(modifiers), char)
+            cache[char] = entry
+        plan.append(entry)
+    return tuple(plan)
+
+
+class KeystrokePlanCache:
+    """
+    LRU cache of compiled plans keyed by (text, layout).
+
+    Key memakai string text itu sendiri: hash str sudah di-cache Python,
+    jadi lookup tidak perlu meng-hash ulang seluruh text tiap hotkey.
+    """
+
+    def __init__(self, max_entries=KEYSTROKE_PLAN_CACHE_SIZE):
+        self.max_entries = max(int(max_entries), 1)
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, backend):
+        """Return the plan for `text` on the backend's current layout (compile on miss)."""
+        key = (text, backend.layout_id())
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        plan = compile_plan(text, backend)
+        self._store(key, plan)
+        return plan
+
+    def precompile(self, text, backend):
+        """Compile ahead of time (saat load / save macro)."""
+        if text:
+            self.get(text, backend)
+
+    def invalidate(self, text):
+        """Drop every cached plan for `text` (semua layout), misal setelah macro diedit."""
+        with self._lock:
+            for key in [k for k in self._plans if k[0] == text]:
+                del self._plans[key]
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def _store(self, key, plan):
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+
+    def __len__(self):
+        return len(self._plans)
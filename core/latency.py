@@ -0,0 +1,169 @@
+"""
+Latency and jitter instrumentation for hotkeys and the typing worker.
+Samples go into fixed-size log-linear histograms, so recording is O(1)
+and memory does not grow with the number of keystrokes.
+"""
+import json
+import threading
+
+# Histogram: microsecond resolution, 16 sub-bucket per pangkat dua
+# (error relatif maksimal ~6%), sampai ~2^31 us (± 35 menit).
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 26
+BUCKET_COUNT = 2 * SUB_BUCKETS + MAX_EXPONENT * SUB_BUCKETS
+
+# Nama metric yang direkam (semua dalam detik, relatif ke hook callback).
+METRIC_HOOK_CALLBACK = "hook_callback"
+METRIC_HOOK_TO_START = "hook_to_job_start"
+METRIC_HOOK_TO_FIRST = "hook_to_first_emission"
+METRIC_EMISSION_INTERVAL = "emission_interval"
+METRIC_EMISSION_LATENESS = "emission_lateness"
+METRIC_HOOK_TO_ENTER = "hook_to_enter"
+METRIC_HOOK_TO_DONE = "hook_to_completion"
+# Durasi tulis keybinds.json (background writer), bukan bagian dari hotkey.
+METRIC_SAVE_WRITE = "save_write"
+# Counter (jumlah event) dari dispatcher hotkey.
+COUNTER_FIRED = "hotkeys_fired"
+COUNTER_REPEATS = "repeats_filtered"
+COUNTER_BOUNCES = "bounces_filtered"
+
+METRICS = [
+    METRIC_HOOK_CALLBACK,
+    METRIC_HOOK_TO_START,
+    METRIC_HOOK_TO_FIRST,
+    METRIC_EMISSION_INTERVAL,
+    METRIC_EMISSION_LATENESS,
+    METRIC_HOOK_TO_ENTER,
+    METRIC_HOOK_TO_DONE,
+    METRIC_SAVE_WRITE,
+]
+
+
+def _bucket_index(us):
+    if us < 2 * SUB_BUCKETS:
+        return us
+    exponent = us.bit_length() - (SUB_BUCKET_BITS + 1)
+    mantissa = us >> exponent
+    index = 2 * SUB_BUCKETS + (exponent - 1) * SUB_BUCKETS + (mantissa - SUB_BUCKETS)
+    return min(index, BUCKET_COUNT - 1)
+
+
+def _bucket_upper_bound(index):
+    """Largest microsecond value that falls into bucket `index`."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    exponent = (index - 2 * SUB_BUCKETS) // SUB_BUCKETS + 1
+    mantissa = (index - 2 * SUB_BUCKETS) % SUB_BUCKETS + SUB_BUCKETS
+    return ((mantissa + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size histogram of durations (detik) with percentile queries."""
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds < 0:
+            seconds = 0.0
+        self.counts[_bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        """Approximate value (detik) at percentile `pct` (0-100)."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * pct / 100.0)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                # Jangan melebihi max yang benar-benar terlihat.
+                return min(_bucket_upper_bound(index) / 1_000_000, self.max)
+        return self.max
+
+    def summary(self):
+        """Dict with count, mean, p50/p95/p99 and max, in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LatencyRecorder:
+    """
+    Thread-safe collection of histograms, globally and per macro.
+
+    Action hotkey (thread action dispatcher) dan typing worker menulis ke sini;
+    GUI hanya membaca summary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = {}
+        self._per_macro = {}
+        self._counters = {}
+        self._macro_counters = {}
+
+    def record(self, metric, seconds, macro=None):
+        with self._lock:
+            self._histogram(self._global, metric).record(seconds)
+            if macro is not None:
+                per_macro = self._per_macro.setdefault(macro, {})
+                self._histogram(per_macro, metric).record(seconds)
+
+    def increment(self, counter, macro=None, n=1):
+        """Add `n` to a plain event counter (global dan per macro)."""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + n
+            if macro is not None:
+                per_macro = self._macro_counters.setdefault(macro, {})
+                per_macro[counter] = per_macro.get(counter, 0) + n
+
+    @staticmethod
+    def _histogram(table, metric):
+        histogram = table.get(metric)
+        if histogram is None:
+            histogram = table[metric] = LatencyHistogram()
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            self._global = {}
+            self._per_macro = {}
+            self._counters = {}
+            self._macro_counters = {}
+
+    def summary(self):
+        """
+        {"global": {metric: {...}}, "macros": {macro: {metric: {...}}},
+         "counters": {"global": {counter: n}, "macros": {macro: {counter: n}}}}
+        """
+        with self._lock:
+            return {
+                "global": {m: h.summary() for m, h in self._global.items()},
+                "macros": {
+                    macro: {m: h.summary() for m, h in table.items()}
+                    for macro, table in self._per_macro.items()
+                },
+                "counters": {
+                    "global": dict(self._counters),
+                    "macros": {macro: dict(table) for macro, table in self._macro_counters.items()},
+                },
+            }
+
+    def dump_json(self, path):
+        """Write the current summary to `path` as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,198 @@
+"""
+Multi-step macros: a bind's "steps" list in keybinds.json compiled to a flat action list.
+
+Bentuk step yang didukung:
+    "teks"                          ketik text (sama dengan {"text": "teks"})
+    {"text": "teks"}                ketik text (ikut delivery / burst macro)
+    {"key": "ctrl+a"}               tekan key / chord
+    {"wait": 250}                   tunggu N milidetik
+    {"paste": "teks"}               kirim text lewat clipboard
+    {"enter": true}                 tekan Enter (angka = berapa kali)
+    {"repeat": 3, "steps": [...]}   ulangi blok
+
+Repeat di-unroll dan text yang berurutan digabung saat compile, jadi worker
+hanya menjalankan list (op, arg) tanpa peduli bentuk aslinya. Kalau macro
+mengaktifkan "template": true, text / paste boleh berisi template variable
+(lihat core.templates); tanpa flag itu kurung kurawal diketik apa adanya.
+"""
+import threading
+from collections import namedtuple
+
+from config import MACRO_MAX_ACTIONS, MACRO_MAX_REPEAT, MACRO_MAX_WAIT
+from core.hotkey_dispatcher import parse_hotkey, is_sequence
+from core.templates import TemplateError, compile_template
+
+ACTION_TEXT = "text"
+ACTION_KEY = "key"
+ACTION_WAIT = "wait"
+ACTION_PASTE = "paste"
+
+# `arg`: str untuk text / key / paste, detik (float) untuk wait.
+# Text / paste dengan placeholder berisi Template (di-render saat diketik).
+MacroAction = namedtuple("MacroAction", ["op", "arg"])
+
+STEP_KINDS = ("text", "key", "wait", "paste", "enter", "repeat")
+
+
+class MacroStepError(ValueError):
+    """Invalid step list; pesan berisi posisi step (misal "step 2.1")."""
+
+
+def compile_steps(steps, templates=False):
+    """
+    Validate `steps` and return a tuple of MacroAction.
+    `templates` = placeholder di text / paste di-compile jadi Template.
+    Raises MacroStepError kalau ada step yang tidak valid.
+    """
+    if not isinstance(steps, list):
+        raise MacroStepError("steps harus berupa list")
+    actions = []
+    _compile_block(steps, actions, "", templates)
+    if not actions:
+        raise MacroStepError("steps tidak menghasilkan aksi apa pun")
+    if not templates:
+        return tuple(actions)
+    for index, (op, arg) in enumerate(actions):
+        if op in (ACTION_TEXT, ACTION_PASTE):
+            try:
+                template = compile_template(arg)
+            except TemplateError as e:
+                # Placeholder yang terbelah di antara dua step text.
+                raise MacroStepError(f"text gabungan: {e}") from None
+            if template is not None:
+                actions[index] = MacroAction(op, template)
+    return tuple(actions)
+
+
+def _compile_block(steps, actions, prefix, templates):
+    for index, step in enumerate(steps, 1):
+        where = f"step {prefix}{index}"
+        if isinstance(step, str):
+            step = {"text": step}
+        if not isinstance(step, dict):
+            raise MacroStepError(f"{where}: harus text atau object, bukan {type(step).__name__}")
+        kinds = [name for name in STEP_KINDS if name in step]
+        unknown = [name for name in step if name not in STEP_KINDS and name != "steps"]
+        if unknown:
+            raise MacroStepError(f"{where}: field tidak dikenal {', '.join(map(repr, unknown))}")
+        if len(kinds) != 1:
+            raise MacroStepError(f"{where}: harus berisi tepat satu dari {', '.join(STEP_KINDS)}")
+        kind = kinds[0]
+        if "steps" in step and kind != "repeat":
+            raise MacroStepError(f"{where}: 'steps' hanya boleh di dalam repeat")
+
+        value = step[kind]
+        if kind == "repeat":
+            _compile_repeat(value, step.get("steps"), actions, where, f"{prefix}{index}.", templates)
+        elif kind in ("text", "paste"):
+            if not isinstance(value, str) or not value:
+                raise MacroStepError(f"{where}: {kind} harus text yang tidak kosong")
+            if templates:
+                try:
+                    compile_template(value)
+                except TemplateError as e:
+                    raise MacroStepError(f"{where}: {e}") from None
+            if kind == "text" and actions and actions[-1].op == ACTION_TEXT:
+                # Text berurutan jadi satu aksi (satu plan, satu loop ketik).
+                actions[-1] = MacroAction(ACTION_TEXT, actions[-1].arg + value)
+            else:
+                _append(actions, MacroAction(kind, value), where)
+        elif kind == "key":
+            _append(actions, MacroAction(ACTION_KEY, _check_key(value, where)), where)
+        elif kind == "wait":
+            _append(actions, MacroAction(ACTION_WAIT, _check_wait(value, where)), where)
+        else:
+            count = 1 if value is True else value
+            if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+                raise MacroStepError(f"{where}: enter harus true atau angka >= 1")
+            for _ in range(count):
+                _append(actions, MacroAction(ACTION_KEY, "enter"), where)
+
+
+def _compile_repeat(count, body, actions, where, prefix, templates):
+    if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= MACRO_MAX_REPEAT:
+        raise MacroStepError(f"{where}: repeat harus angka 1-{MACRO_MAX_REPEAT}")
+    if not isinstance(body, list) or not body:
+        raise MacroStepError(f"{where}: repeat butuh list 'steps' yang tidak kosong")
+    block = []
+    _compile_block(body, block, prefix, templates)
+    if len(actions) + len(block) * count > MACRO_MAX_ACTIONS:
+        raise MacroStepError(f"{where}: macro terlalu panjang (maks {MACRO_MAX_ACTIONS} aksi)")
+    for _ in range(count):
+        for action in block:
+            if action.op == ACTION_TEXT and actions and actions[-1].op == ACTION_TEXT:
+                actions[-1] = MacroAction(ACTION_TEXT, actions[-1].arg + action.arg)
+            else:
+                actions.append(action)
+
+
+def _append(actions, action, where):
+    if len(actions) >= MACRO_MAX_ACTIONS:
+        raise MacroStepError(f"{where}: macro terlalu panjang (maks {MACRO_MAX_ACTIONS} aksi)")
+    actions.append(action)
+
+
+def _check_key(value, where):
+    if not isinstance(value, str) or not value.strip():
+        raise MacroStepError(f"{where}: key harus nama key, misal \"tab\" atau \"ctrl+a\"")
+    value = value.strip()
+    if is_sequence(value):
+        raise MacroStepError(f"{where}: key hanya satu chord, pakai beberapa step untuk urutan key")
+    try:
+        parse_hotkey(value)
+    except ValueError as e:
+        raise MacroStepError(f"{where}: {e}") from None
+    return value
+
+
+def _check_wait(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= MACRO_MAX_WAIT:
+        raise MacroStepError(f"{where}: wait harus milidetik 0-{MACRO_MAX_WAIT}")
+    return value / 1000.0
+
+
+def action_text(actions):
+    """All text an action list emits (untuk hitungan karakter di abort report)."""
+    return "".join(
+        action.arg if isinstance(action.arg, str) else action.arg.source
+        for action in actions if action.op in (ACTION_TEXT, ACTION_PASTE)
+    )
+
+
+class MacroProgramCache:
+    """
+    Compiled action lists keyed by bind dict.
+
+    Bind dict dianggap immutable (lihat HotkeyRegistry), jadi cukup dicocokkan
+    dengan identity; dict yang diganti saat edit otomatis compile ulang.
+    """
+
+    def __init__(self):
+        self._programs = {}
+        self._lock = threading.Lock()
+
+    def get(self, bind_data):
+        """Return the action tuple for `bind_data`, atau None kalau macro tanpa steps."""
+        steps = bind_data.get("steps")
+        if steps is None:
+            return None
+        entry = self._programs.get(id(bind_data))
+        if entry is not None and entry[0] is bind_data:
+            return entry[1]
+        program = compile_steps(steps, templates=bool(bind_data.get("template")))
+        with self._lock:
+            self._programs[id(bind_data)] = (bind_data, program)
+        return program
+
+    def discard(self, bind_data):
+        with self._lock:
+            entry = self._programs.get(id(bind_data))
+            if entry is not None and entry[0] is bind_data:
+                del self._programs[id(bind_data)]
+
+    def clear(self):
+        with self._lock:
+            self._programs.clear()
+
+    def __len__(self):
+        return len(self._programs)
@@ -0,0 +1,194 @@
+"""
+Keystroke output backends for the TypingManager.
+A backend is the only place that actually emits keystrokes, so the typing
+engine can run against the real keyboard, an in-memory recorder or nothing.
+"""
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# Try to import keyboard (butuh device input asli + root di Linux)
+try:
+    import keyboard
+    KEYBOARD_AVAILABLE = True
+except ImportError:
+    KEYBOARD_AVAILABLE = False
+    keyboard = None
+
+
+# Satu event yang dikirim ke backend: kind = "write", "key" atau "release".
+OutputEvent = namedtuple("OutputEvent", ["timestamp", "kind", "payload"])
+
+
+class OutputBackend:
+    """Interface for everything the typing engine can emit."""
+
+    name = "base"
+
+    def write(self, text):
+        """Type `text` as-is into the focused application."""
+        raise NotImplementedError
+
+    def press_and_release(self, hotkey):
+        """Press and release a key or chord such as 'enter' or 'ctrl+v'."""
+        raise NotImplementedError
+
+    def release_keys(self, names):
+        """Send key-up for keys that are (still) held, e.g. stuck modifiers."""
+        for name in names:
+            self.release(name)
+
+    def release(self, key):
+        """Send a single key-up."""
+        raise NotImplementedError
+
+    def layout_id(self):
+        """Identifier of the active keyboard layout (key cache keystroke plan)."""
+        return "default"
+
+    def resolve_char(self, char):
+        """Return (scan_code, modifiers) for `char`, or None for unicode fallback."""
+        return None
+
+    def send_plan(self, entries):
+        """Replay compiled PlanEntry items. Default: tulis karakternya saja."""
+        self.write("".join(entry.char for entry in entries))
+
+
+class KeyboardBackend(OutputBackend):
+    """Backend that injects real keystrokes through the `keyboard` module."""
+
+    name = "keyboard"
+
+    def __init__(self):
+        if not KEYBOARD_AVAILABLE:
+            raise RuntimeError("The 'keyboard' module is not installed.")
+        # Sama seperti keyboard.write: di Windows pakai unicode injection
+        # ("exact"), kecuali newline / backspace yang dikirim sebagai key.
+        self.exact = sys.platform == "win32"
+
+    def write(self, text):
+        keyboard.write(text)
+
+    def press_and_release(self, hotkey):
+        keyboard.press_and_release(hotkey)
+
+    def release(self, key):
+        keyboard.release(key)
+
+    def layout_id(self):
+        if sys.platform == "win32":
+            try:
+                import ctypes
+                user32 = ctypes.windll.user32
+                thread_id = user32.GetWindowThreadProcessId(user32.GetForegroundWindow(), None)
+                return hex(user32.GetKeyboardLayout(thread_id) & 0xFFFFFFFF)
+            except Exception:
+                pass
+        return "default"
+
+    def resolve_char(self, char):
+        if self.exact and char not in "\n\b":
+            return None
+        try:
+            entries = keyboard._os_keyboard.map_name(keyboard._canonical_names.normalize_name(char))
+            scan_code, modifiers = next(iter(entries))
+        except (KeyError, ValueError, StopIteration):
+            return None
+        return scan_code, modifiers
+
+    def send_plan(self, entries):
+        os_keyboard = keyboard._os_keyboard
+        # Stash modifier yang sedang ditekan user sekali per batch, bukan per karakter.
+        state = keyboard.stash_state()
+        try:
+            for entry in entries:
+                if entry.scan_code is None:
+                    os_keyboard.type_unicode(entry.char)
+                    continue
+                for modifier in entry.modifiers:
+                    keyboard.press(modifier)
+                os_keyboard.press(entry.scan_code)
+                os_keyboard.release(entry.scan_code)
+                for modifier in entry.modifiers:
+                    keyboard.release(modifier)
+        finally:
+            keyboard.restore_modifiers(state)
+
+
+class RecordingBackend(OutputBackend):
+    """
+    Backend that records every emitted event in memory with a timestamp.
+
+    Dipakai untuk benchmark (throughput / jitter) di mesin headless.
+    """
+
+    name = "recording"
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = []
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        self._record("write", text)
+
+    def press_and_release(self, hotkey):
+        self._record("key", hotkey)
+
+    def release(self, key):
+        self._record("release", key)
+
+    def _record(self, kind, payload):
+        event = OutputEvent(self.clock(), kind, payload)
+        with self._lock:
+            self.events.append(event)
+
+    @property
+    def text(self):
+        """All text written so far, concatenated."""
+        with self._lock:
+            return "".join(e.payload for e in self.events if e.kind == "write")
+
+    def clear(self):
+        """Forget all recorded events."""
+        with self._lock:
+            self.events = []
+
+
+class NullBackend(OutputBackend):
+    """Backend that silently discards everything."""
+
+    name = "null"
+
+    def write(self, text):
+        pass
+
+    def press_and_release(self, hotkey):
+        pass
+
+    def release(self, key):
+        pass
+
+
+BACKENDS = {
+    KeyboardBackend.name: KeyboardBackend,
+    RecordingBackend.name: RecordingBackend,
+    NullBackend.name: NullBackend,
+}
+
+
+def create_backend(name=None):
+    """
+    Create an output backend by name.
+
+    Kalau `name` kosong, pakai keyboard kalau tersedia, selain itu null.
+    """
+    if not name:
+        name = KeyboardBackend.name if KEYBOARD_AVAILABLE else NullBackend.name
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output backend: {name!r}")
+    return backend_cls()
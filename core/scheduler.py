@@ -0,0 +1,103 @@
+"""
+Deadline-based scheduler for the typing loop.
+Every emission gets an absolute deadline (anchor + sum of delays), so write
+cost and sleep overshoot do not add up over a long macro.
+"""
+import time
+
+from config import SCHEDULER_SPIN_THRESHOLD
+
+
+class DeadlineScheduler:
+    """
+    Sleeps until absolute `clock()` deadlines instead of sleeping `delay`
+    after every emission.
+
+    - `clock` / `sleep` bisa diganti (misal VirtualClock) untuk test & benchmark.
+    - `spin_threshold`: sisa waktu terakhir (detik) yang di-busy-wait supaya
+      tidak kena overshoot dari sleep OS. 0 = tanpa spin.
+    - `should_stop`: callable opsional; kalau True, wait berhenti lebih awal.
+    """
+
+    def __init__(self, clock=time.perf_counter, sleep=time.sleep,
+                 spin_threshold=SCHEDULER_SPIN_THRESHOLD, should_stop=None):
+        self.clock = clock
+        self.sleep = sleep
+        self.spin_threshold = max(spin_threshold, 0)
+        self.should_stop = should_stop or (lambda: False)
+        self.deadline = None
+        # Total keterlambatan (detik) terhadap deadline, untuk statistik.
+        self.total_overshoot = 0.0
+        self.max_overshoot = 0.0
+
+    def start(self):
+        """Anchor the schedule at the current time."""
+        self.deadline = self.clock()
+        self.total_overshoot = 0.0
+        self.max_overshoot = 0.0
+
+    def wait(self, delay):
+        """
+        Advance the deadline by `delay` and sleep until it.
+        Returns the overshoot in seconds (0 kalau tepat waktu); kalau schedule
+        di-anchor ulang, telat aslinya tetap dikembalikan.
+        """
+        if self.deadline is None:
+            self.start()
+        delay = max(delay, 0)
+        self.deadline += delay
+
+        now = self.clock()
+        if now - self.deadline > delay:
+            # Sudah telat lebih dari satu periode (misal write yang macet):
+            # catat telatnya, lalu pasang ulang anchor, jangan kirim burst untuk mengejar.
+            overshoot = now - self.deadline
+            self.deadline = now
+        else:
+            self._sleep_until(self.deadline)
+            overshoot = max(self.clock() - self.deadline, 0.0)
+        self.total_overshoot += overshoot
+        if overshoot > self.max_overshoot:
+            self.max_overshoot = overshoot
+        return overshoot
+
+    def _sleep_until(self, deadline):
+        spin = self.spin_threshold
+        while not self.should_stop():
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return
+            if remaining > spin:
+                self.sleep(remaining - spin)
+            else:
+                # Spin-wait untuk sub-milidetik terakhir.
+                self.sleep(0)
+
+
+class VirtualClock:
+    """
+    Fake clock whose `sleep` just advances time.
+
+    Dipakai sebagai `clock=vc.now, sleep=vc.sleep` supaya scheduler bisa
+    dijalankan tanpa menunggu sungguhan.
+    """
+
+    def __init__(self, start=0.0, sleep_overshoot=0.0, spin_tick=0.0001):
+        self.time = start
+        # Overshoot buatan per sleep, untuk mensimulasikan OS scheduler.
+        self.sleep_overshoot = sleep_overshoot
+        # sleep(0) (spin-wait) tetap memajukan waktu sedikit supaya tidak loop selamanya.
+        self.spin_tick = spin_tick
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.time += seconds + self.sleep_overshoot
+        else:
+            self.time += self.spin_tick
+
+    def advance(self, seconds):
+        """Move time forward without sleeping (misal untuk biaya write)."""
+        self.time += seconds
@@ -0,0 +1,230 @@
+"""
+Template variables in macro text, misal "Halo, jam {time}" atau "Ticket #{counter:ticket}".
+
+Text di-parse sekali menjadi Template (segmen literal + placeholder) dan
+disimpan di TemplateCache, jadi saat hotkey ditekan yang dikerjakan hanya
+resolver dinamisnya (jam, clipboard, counter, random).
+
+Placeholder yang dikenal:
+    {date} / {date:%A}      tanggal (format strftime opsional)
+    {time} / {time:%H.%M}   jam
+    {clipboard}             isi clipboard saat macro diketik
+    {counter}               counter milik macro ini (1, 2, 3, ...)
+    {counter:nama}          counter bernama, dipakai bersama antar macro
+    {random:a|b|c}          salah satu pilihan secara acak
+
+`{{` menghasilkan "{". Kurung kurawal lain ({FF0000}, {abc}) tetap literal,
+supaya kode warna chat tidak berubah.
+
+Template hanya aktif untuk macro dengan "template": true (checkbox di editor).
+Macro yang sudah ada tidak punya flag itu, jadi text lama yang kebetulan
+berisi {date} atau {{ tetap diketik persis seperti sebelumnya.
+"""
+import random
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+
+from config import TEMPLATE_DATE_FORMAT, TEMPLATE_TIME_FORMAT, TEMPLATE_CACHE_SIZE
+
+VAR_DATE = "date"
+VAR_TIME = "time"
+VAR_CLIPBOARD = "clipboard"
+VAR_COUNTER = "counter"
+VAR_RANDOM = "random"
+TEMPLATE_VARIABLES = (VAR_DATE, VAR_TIME, VAR_CLIPBOARD, VAR_COUNTER, VAR_RANDOM)
+
+# "{{" atau "{nama" diikuti ":arg}" / "}" (arg boleh kosong untuk pesan error yang jelas).
+_TOKEN = re.compile(r"\{\{|\{(" + "|".join(TEMPLATE_VARIABLES) + r")(?=[:}]|$)(?::([^{}]*))?(\})?")
+
+# Placeholder hasil compile. `arg` sudah dalam bentuk siap pakai
+# (format string, nama counter, atau tuple pilihan random).
+Placeholder = namedtuple("Placeholder", ["name", "arg"])
+
+
+class TemplateError(ValueError):
+    """Placeholder tidak valid (posisi karakter ada di pesan)."""
+
+
+class Template:
+    """Compiled macro text: tuple of literal strings and Placeholder."""
+
+    __slots__ = ("source", "segments")
+
+    def __init__(self, source, segments):
+        self.source = source
+        self.segments = segments
+
+    @property
+    def variables(self):
+        return [segment.name for segment in self.segments if segment.__class__ is Placeholder]
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+def compile_template(text):
+    """
+    Parse `text` into a Template. Returns None kalau text tidak punya placeholder
+    atau "{{" (text statis diketik apa adanya). Raises TemplateError kalau placeholder rusak.
+    """
+    if not text or "{" not in text:
+        return None
+    segments = []
+    literal = []
+    position = 0
+    dynamic = False
+    for match in _TOKEN.finditer(text):
+        literal.append(text[position:match.start()])
+        position = match.end()
+        if match.group(0) == "{{":
+            literal.append("{")
+            dynamic = True
+            continue
+        name, arg, closed = match.group(1), match.group(2), match.group(3)
+        if not closed:
+            raise TemplateError(f"Placeholder {{{name} di karakter {match.start() + 1} belum ditutup '}}'")
+        if literal:
+            segments.append("".join(literal))
+            literal = []
+        segments.append(_placeholder(name, arg, match.start() + 1))
+        dynamic = True
+    literal.append(text[position:])
+    if not dynamic:
+        return None
+    tail = "".join(literal)
+    if tail:
+        segments.append(tail)
+    return Template(text, tuple(segment for segment in segments if segment != ""))
+
+
+def _placeholder(name, arg, column):
+    where = f"{{{name}}} di karakter {column}"
+    if name in (VAR_DATE, VAR_TIME):
+        if arg is None:
+            arg = TEMPLATE_DATE_FORMAT if name == VAR_DATE else TEMPLATE_TIME_FORMAT
+        if not arg:
+            raise TemplateError(f"{where}: format kosong")
+        return Placeholder(name, arg)
+    if name == VAR_CLIPBOARD:
+        if arg is not None:
+            raise TemplateError(f"{where}: clipboard tidak memakai argumen")
+        return Placeholder(name, None)
+    if name == VAR_COUNTER:
+        if arg is not None and not arg.strip():
+            raise TemplateError(f"{where}: nama counter kosong")
+        return Placeholder(name, arg.strip() if arg is not None else None)
+    options = tuple(arg.split("|")) if arg else ()
+    if len(options) < 1 or not any(options):
+        raise TemplateError(f"{where}: pakai {{random:a|b|c}}")
+    return Placeholder(name, options)
+
+
+class CounterStore:
+    """
+    Persistent counters for {counter}. Thread-safe; `dirty` menandai ada nilai
+    yang belum ditulis, jadi file cukup disimpan per batch, bukan tiap hotkey.
+    """
+
+    def __init__(self, values=None):
+        self._values = dict(values or {})
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    def next(self, name):
+        with self._lock:
+            value = self._values.get(name, 0) + 1
+            self._values[name] = value
+            self.dirty = True
+            return value
+
+    def load(self, values):
+        with self._lock:
+            self._values = {str(k): int(v) for k, v in (values or {}).items()}
+            self.dirty = False
+
+    def snapshot(self):
+        """Return a copy for saving and mark the store clean."""
+        with self._lock:
+            self.dirty = False
+            return dict(self._values)
+
+    def __getitem__(self, name):
+        return self._values.get(name, 0)
+
+
+class TemplateRenderer:
+    """Resolves a Template's placeholders at fire time (di worker thread)."""
+
+    def __init__(self, clipboard=None, counters=None, now=datetime.now, rng=None):
+        self.clipboard = clipboard
+        self.counters = counters if counters is not None else CounterStore()
+        self.now = now
+        self.rng = rng or random.Random()
+
+    def render(self, template, macro=None):
+        """Return the text for one firing of `template`; `macro` = pemilik {counter}."""
+        parts = []
+        now = None
+        for segment in template.segments:
+            if segment.__class__ is str:
+                parts.append(segment)
+                continue
+            name, arg = segment
+            if name == VAR_DATE or name == VAR_TIME:
+                # Satu timestamp per render supaya {date} dan {time} konsisten.
+                if now is None:
+                    now = self.now()
+                parts.append(now.strftime(arg))
+            elif name == VAR_COUNTER:
+                parts.append(str(self.counters.next(arg if arg is not None else f"macro:{macro}")))
+            elif name == VAR_RANDOM:
+                parts.append(self.rng.choice(arg))
+            else:
+                parts.append(self._clipboard_text())
+        return "".join(parts)
+
+    def _clipboard_text(self):
+        if self.clipboard is None:
+            return ""
+        try:
+            return self.clipboard.get_text() or ""
+        except Exception:
+            return ""
+
+
+class TemplateCache:
+    """
+    LRU of compiled templates keyed by macro text (seperti KeystrokePlanCache).
+    Text statis juga di-cache (sebagai None) supaya tidak di-scan ulang.
+    """
+
+    def __init__(self, max_entries=TEMPLATE_CACHE_SIZE):
+        self.max_entries = max(int(max_entries), 1)
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        """Return the Template for `text` (None = statis). Raises TemplateError."""
+        with self._lock:
+            if text in self._templates:
+                self._templates.move_to_end(text)
+                return self._templates[text]
+        template = compile_template(text)
+        with self._lock:
+            self._templates[text] = template
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        return template
+
+    def invalidate(self, text):
+        with self._lock:
+            self._templates.pop(text, None)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self):
+        return len(self._templates)
@@ -1,73 +1,498 @@
 """
-Text typing manager with lock to prevent double-typing bugs.
+Text typing manager: one persistent worker thread fed by a bounded job queue.
 """
-import keyboard
 import threading
 import time
-from config import TYPING_DELAY_INITIAL, TYPING_DELAY_PER_CHAR, TYPING_DELAY_BEFORE_ENTER
+from collections import deque, namedtuple
+from config import (
+    DELIVERY_PASTE,
+    DELIVERY_AUTO,
+    PASTE_MIN_LENGTH,
+    PASTE_HOTKEY,
+    CLIPBOARD_RESTORE_DELAY,
+    BUSY_POLICY_DROP,
+    BUSY_POLICY_LATEST,
+    BUSY_POLICY_PREEMPT,
+    TYPING_BUSY_POLICY,
+    TYPING_QUEUE_SIZE,
+    MODIFIER_RELEASE_TIMEOUT,
+    RELEASE_STUCK_MODIFIERS,
+)
+from core.output_backend import create_backend
+from core.scheduler import DeadlineScheduler
+from core.typing_profile import TypingProfile
+from core.macro_steps import ACTION_TEXT, ACTION_KEY, ACTION_WAIT, ACTION_PASTE, action_text
+from core.templates import TemplateRenderer
+from core.latency import (
+    METRIC_HOOK_TO_START,
+    METRIC_HOOK_TO_FIRST,
+    METRIC_EMISSION_INTERVAL,
+    METRIC_EMISSION_LATENESS,
+    METRIC_HOOK_TO_ENTER,
+    METRIC_HOOK_TO_DONE,
+)
+
+
+# Satu permintaan mengetik yang menunggu di queue worker.
+# `hook_time` = clock() saat hotkey callback masuk, untuk metric latency.
+# `erase` = jumlah backspace sebelum mengetik (menghapus trigger abbreviation).
+# `actions` = action list macro multi-step (None = ketik `text` saja).
+# `template` = compiled Template dari `text` (None = text statis).
+# `loader` = callable yang dipanggil di worker dan mengembalikan (text, actions, template)
+#   untuk macro yang isinya belum dimuat (None = job sudah lengkap).
+TypingJob = namedtuple("TypingJob", ["text", "profile", "macro", "hook_time", "erase", "actions", "template",
+                                     "loader"],
+                       defaults=(0, None, None, None))
+
+# Hasil abort: berapa karakter sudah terkirim dari job yang dihentikan,
+# total karakter job itu, dan berapa job antrean yang dibuang.
+AbortReport = namedtuple("AbortReport", ["chars_emitted", "chars_total", "jobs_cleared"])
 
 
 class TypingManager:
-    """Manages text typing with thread safety."""
+    """Manages text typing on a single worker thread."""
     
-    def __init__(self, auto_enter_callback, per_char_delay_callback=None):
-        self.auto_enter_callback = auto_enter_callback
-        # Callback untuk mengambil delay per karakter secara dinamis (dari UI)
-        # Jika tidak diberikan, pakai default dari config.
-        self.per_char_delay_callback = per_char_delay_callback or (lambda: TYPING_DELAY_PER_CHAR)
-        self.typing_lock = threading.Lock()
+    def __init__(self, backend=None, clipboard=None, profile=None,
+                 busy_policy=TYPING_BUSY_POLICY, queue_size=TYPING_QUEUE_SIZE,
+                 abort_callback=None, clock=time.perf_counter, sleep=None, metrics=None,
+                 plan_cache=None, modifier_gate=None, renderer=None):
+        # Profile default kalau send_text dipanggil tanpa profile.
+        # Worker tidak pernah membaca variable Tk; semua setting ada di profile.
+        self.profile = profile or TypingProfile()
+        # Backend output keystroke (keyboard asli, recording, atau null).
+        self.backend = backend if backend is not None else create_backend()
+        # Clipboard provider untuk mode paste (None = selalu ketik).
+        self.clipboard = clipboard
         self.is_paused = False
+
+        # Apa yang terjadi kalau hotkey ditekan saat macro lain masih diketik:
+        # drop / queue (FIFO) / latest (satu slot, diganti yang terbaru) / preempt.
+        self.busy_policy = busy_policy
+        self.queue_size = max(int(queue_size), 1)
+        self._jobs = deque()
+        # Jumlah job preempt di depan antrean (urutan FIFO di antara mereka)
+        self._preempt_pending = 0
+        self._jobs_cond = threading.Condition()
+        self._busy = False
+        self._cancel_event = threading.Event()
+        self._running = True
+
+        # Abort: callback(AbortReport) dipanggil dari worker thread.
+        self.abort_callback = abort_callback
+        self.last_abort = None
+        self._abort_cleared = None
+        self._chars_emitted = 0
+        # Panjang text yang dikirim job ini (template dihitung dari hasil render)
+        self._chars_total = 0
+
+        # Clock & sleep untuk DeadlineScheduler (bisa diganti VirtualClock).
+        # sleep default = tunggu cancel event, jadi abort membangunkan worker.
+        self.clock = clock
+        self.sleep = sleep or self._cancel_event.wait
+        # Sleep yang tidak bisa dipotong abort (misal menunggu restore clipboard).
+        self._plain_sleep = sleep or time.sleep
+        self._scheduler = None
+
+        # Cache keystroke plan per macro (None = kirim karakter langsung).
+        self.plan_cache = plan_cache
+
+        # Template variable ({date}, {counter}, ...) di-render di worker, tepat sebelum diketik.
+        self.renderer = renderer or TemplateRenderer(clipboard=clipboard)
+
+        # Status modifier fisik dari keyboard hook (HotkeyDispatcher). Kalau ada,
+        # mengetik dimulai begitu modifier hotkey dilepas, bukan setelah initial_delay.
+        self.modifier_gate = modifier_gate
+        self.modifier_timeout = MODIFIER_RELEASE_TIMEOUT
+        self.release_stuck_modifiers = RELEASE_STUCK_MODIFIERS
+
+        # LatencyRecorder opsional (None = tanpa instrumentasi).
+        self.metrics = metrics
+        self._job = None
+        self._last_emission = None
+
+        # Satu worker thread yang hidup terus (bukan thread baru per hotkey).
+        self._worker = threading.Thread(target=self._worker_loop, name="TypingWorker", daemon=True)
+        self._worker.start()
+
+    @property
+    def is_busy(self):
+        """True while a job is being typed or waiting in the queue."""
+        with self._jobs_cond:
+            return self._busy or bool(self._jobs)
     
-    def send_text(self, text):
-        """Send text with thread safety."""
+    def send_text(self, text, profile=None, macro=None, hook_time=None, erase=0, template=None):
+        """
+        Queue text for the worker thread. Returns True if the job was accepted.
+
+        `profile` is the TypingProfile snapshot for this job
+        (None = pakai self.profile). `macro` / `hook_time` hanya dipakai
+        untuk metric latency per macro. `erase` backspace dikirim dulu
+        sebelum text (untuk trigger yang sudah terketik). `template` =
+        Template hasil compile `text`, di-render di worker.
+        """
         if self.is_paused:
-            return
+            return False
         if not text:
+            return False
+
+        if hook_time is None:
+            hook_time = self.clock()
+        return self._enqueue(TypingJob(text, profile or self.profile, macro, hook_time, erase, None, template))
+
+    def send_actions(self, actions, profile=None, macro=None, hook_time=None, erase=0):
+        """
+        Queue a compiled multi-step macro (lihat core.macro_steps).
+        Same busy policy / abort handling as send_text; auto_enter tidak
+        dipakai karena Enter sudah menjadi step sendiri.
+        """
+        if self.is_paused:
+            return False
+        if not actions:
+            return False
+
+        if hook_time is None:
+            hook_time = self.clock()
+        job = TypingJob(action_text(actions), profile or self.profile, macro, hook_time, erase, actions)
+        return self._enqueue(job)
+
+    def send_macro(self, loader, profile=None, macro=None, hook_time=None, erase=0):
+        """
+        Queue a macro whose body is loaded on the worker thread.
+        `loader()` mengembalikan (text, actions, template), atau None kalau
+        macro tidak bisa dimuat; jadi baca store / compile tidak terjadi di
+        thread hotkey.
+        """
+        if self.is_paused:
+            return False
+
+        if hook_time is None:
+            hook_time = self.clock()
+        return self._enqueue(TypingJob("", profile or self.profile, macro, hook_time, erase, loader=loader))
+
+    def _enqueue(self, job):
+        """Apply the busy policy and put `job` on the queue."""
+        policy = self.busy_policy
+        with self._jobs_cond:
+            busy = self._busy or bool(self._jobs)
+            if busy:
+                if policy == BUSY_POLICY_DROP:
+                    return False
+                if policy == BUSY_POLICY_LATEST and self._jobs:
+                    # Satu slot antrean: job yang belum jalan diganti yang terbaru.
+                    self._jobs[-1] = job
+                    return True
+                if policy == BUSY_POLICY_PREEMPT:
+                    # Selalu diterima (tidak kena batas queue): diketik setelah
+                    # job preempt sebelumnya, sebelum job biasa yang sudah antre.
+                    self._jobs.insert(self._preempt_pending, job)
+                    self._preempt_pending += 1
+                    if self._busy:
+                        # Hentikan macro yang sedang diketik di batas karakter/chunk berikutnya.
+                        self._cancel_event.set()
+                    self._jobs_cond.notify()
+                    return True
+            if len(self._jobs) >= self.queue_size:
+                # Queue penuh: tolak job baru, jangan buang yang sudah antre.
+                return False
+            self._jobs.append(job)
+            self._jobs_cond.notify()
+        return True
+
+    def abort(self):
+        """
+        Stop the job being typed (at the next character / chunk boundary)
+        and clear every queued job.
+
+        Report dikirim lewat `abort_callback` dan disimpan di `last_abort`
+        setelah worker benar-benar berhenti.
+        """
+        with self._jobs_cond:
+            cleared = len(self._jobs)
+            self._jobs.clear()
+            self._preempt_pending = 0
+            if self._busy:
+                self._abort_cleared = cleared
+                self._cancel_event.set()
+                return
+        # Tidak ada yang sedang diketik: langsung laporkan.
+        self._report_abort(AbortReport(0, 0, cleared))
+
+    def _report_abort(self, report):
+        self.last_abort = report
+        if self.abort_callback:
+            try:
+                self.abort_callback(report)
+            except Exception:
+                pass
+
+    def stop(self, timeout=None):
+        """Stop the worker thread after the current job (dipakai saat shutdown / benchmark)."""
+        with self._jobs_cond:
+            self._running = False
+            self._jobs.clear()
+            self._preempt_pending = 0
+            self._cancel_event.set()
+            self._jobs_cond.notify_all()
+        self._worker.join(timeout)
+
+    def _worker_loop(self):
+        """Take jobs off the queue one by one and type them."""
+        while True:
+            with self._jobs_cond:
+                while self._running and not self._jobs:
+                    self._jobs_cond.wait()
+                if not self._running:
+                    return
+                job = self._jobs.popleft()
+                if self._preempt_pending:
+                    self._preempt_pending -= 1
+                self._busy = True
+                self._cancel_event.clear()
+                self._abort_cleared = None
+                self._chars_emitted = 0
+                self._chars_total = len(job.text)
+                self._job = job
+                self._last_emission = None
+            self._record(METRIC_HOOK_TO_START, self.clock() - job.hook_time)
+            try:
+                if job.loader is not None:
+                    loaded = job.loader()
+                    if loaded is None:
+                        continue
+                    text, actions, template = loaded
+                    job = job._replace(text=action_text(actions) if actions is not None else text,
+                                       actions=actions, template=template, loader=None)
+                    self._job = job
+                    self._chars_total = len(job.text)
+                if job.actions is not None:
+                    self._run_actions(job.actions, job.profile, job.erase)
+                elif job.template is not None:
+                    text = self.renderer.render(job.template, job.macro)
+                    self._chars_total = len(text)
+                    self._type_text(text, job.profile, job.erase)
+                else:
+                    self._type_text(job.text, job.profile, job.erase)
+            except Exception as e:
+                # Worker tidak boleh mati gara-gara satu macro error.
+                try:
+                    print(f"[Keybind] Typing error: {e}")
+                except Exception:
+                    pass
+            finally:
+                self._record(METRIC_HOOK_TO_DONE, self.clock() - job.hook_time)
+                with self._jobs_cond:
+                    self._busy = False
+                    aborted = self._abort_cleared
+                    self._abort_cleared = None
+                if aborted is not None:
+                    self._report_abort(AbortReport(self._chars_emitted, self._chars_total, aborted))
+
+    def _cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _wait(self, delay):
+        """Sleep until the next deadline `delay` seconds after the previous one."""
+        overshoot = self._scheduler.wait(delay)
+        self._record(METRIC_EMISSION_LATENESS, overshoot)
+
+    def _record(self, metric, seconds):
+        if self.metrics is not None:
+            self.metrics.record(metric, seconds, self._job.macro if self._job else None)
+
+    def _emitted(self, count):
+        """Bookkeeping after every write: counters + first-emission / interval metrics."""
+        self._chars_emitted += count
+        if self.metrics is None:
             return
-        # Prevent multiple simultaneous calls (mencegah double-typing bug).
-        if not self.typing_lock.acquire(blocking=False):
+        now = self.clock()
+        if self._last_emission is None:
+            self._record(METRIC_HOOK_TO_FIRST, now - self._job.hook_time)
+        else:
+            self._record(METRIC_EMISSION_INTERVAL, now - self._last_emission)
+        self._last_emission = now
+
+    def _should_paste(self, text, delivery):
+        """Decide whether this text goes through the clipboard."""
+        if self.clipboard is None:
+            return False
+        if delivery == DELIVERY_PASTE:
+            return True
+        if delivery == DELIVERY_AUTO:
+            return len(text) >= PASTE_MIN_LENGTH
+        return False
+
+    def _type_text(self, text, profile, erase=0):
+        """Type text per character, in bursts of `chunk_size` characters, or paste it."""
+        if not self._begin(profile, erase):
             return
-        # Jalankan di thread terpisah supaya tidak nge-freeze GUI.
-        threading.Thread(target=self._type_text_with_lock, args=(text,), daemon=True).start()
-    
-    def _type_text_with_lock(self, text):
-        """Wrapper untuk _type_text yang handle lock release."""
-        try:
-            self._type_text(text)
-        finally:
-            # Pastikan lock selalu di-release meskipun ada error.
-            self.typing_lock.release()
-    
-    def _type_text(self, text):
-        """Type text character by character with delays."""
-        # Delay sebelum mengetik supaya aplikasi tujuan siap menangkap input.
-        time.sleep(TYPING_DELAY_INITIAL)
-        
-        # Pakai metode per karakter dengan delay yang bisa diatur user (manual)
-        # supaya bisa disesuaikan antara kecepatan dan keakuratan.
+        self._deliver(text, profile)
+        self._press_enter_if_needed(profile)
+
+    def _run_actions(self, actions, profile, erase=0):
+        """Interpreter loop for a compiled multi-step macro."""
+        if not self._begin(profile, erase):
+            return
+        backend = self.backend
+        for op, arg in actions:
+            if self._cancelled():
+                return
+            if arg.__class__ is not str and op != ACTION_WAIT:
+                source = arg.source
+                arg = self.renderer.render(arg, self._job.macro)
+                # Step yang belum jalan masih dihitung dari source template-nya.
+                self._chars_total += len(arg) - len(source)
+            if op == ACTION_TEXT:
+                self._deliver(arg, profile)
+            elif op == ACTION_KEY:
+                backend.press_and_release(arg)
+            elif op == ACTION_WAIT:
+                self._wait(arg)
+            elif op == ACTION_PASTE:
+                if self.clipboard is None or not self._paste_text(arg):
+                    self._type_plain(arg, profile)
+
+    def _begin(self, profile, erase):
+        """
+        Start the job's deadline clock, wait for the hotkey modifiers (atau
+        initial_delay) and send the `erase` backspaces. False kalau di-abort.
+        """
+        # Semua delay dihitung sebagai deadline absolut dari titik ini.
+        self._scheduler = DeadlineScheduler(
+            clock=self.clock,
+            sleep=self.sleep,
+            should_stop=self._cancelled,
+        )
+        self._scheduler.start()
+
+        # Jangan mengetik selama modifier hotkey masih ditekan (ctrl+F1 → ctrl+text).
+        # Tanpa info modifier: delay tetap seperti dulu.
+        if self.modifier_gate is not None:
+            self._wait_for_modifiers()
+        else:
+            self._wait(profile.initial_delay)
+        if self._cancelled():
+            return False
+
+        for _ in range(erase):
+            if self._cancelled():
+                return False
+            try:
+                self.backend.press_and_release('backspace')
+            except Exception:
+                break
+        return not self._cancelled()
+
+    def _deliver(self, text, profile):
+        """Paste or type `text` according to the profile's delivery mode."""
+        if self._should_paste(text, profile.delivery) and self._paste_text(text):
+            return
+        self._type_plain(text, profile)
+
+    def _type_plain(self, text, profile):
+        """Type `text` through the keystroke plan (per karakter atau burst)."""
+        plan = None
+        if self.plan_cache is not None:
+            try:
+                plan = self.plan_cache.get(text, self.backend)
+            except Exception:
+                plan = None
+
         try:
-            for char in text:
-                keyboard.write(char)
-                # Delay per karakter: diambil dari callback (bisa diubah dari UI)
-                try:
-                    delay = float(self.per_char_delay_callback() or 0)
-                except Exception:
-                    delay = TYPING_DELAY_PER_CHAR
-                if delay < 0:
-                    delay = 0
-                time.sleep(delay)
+            if profile.chunk_size > 1:
+                self._type_chunks(text, profile.chunk_size, profile.chunk_delay, plan)
+            else:
+                self._type_chars(text, profile.per_char_delay, plan)
         except Exception as e:
-            # Fallback: kalau ada error, coba pakai keyboard.write() langsung
+            # Fallback: kalau ada error, coba kirim semua text sekaligus
+            try:
+                self.backend.write(text)
+            except Exception:
+                pass
+
+    def _wait_for_modifiers(self):
+        """Wait until the hotkey's modifiers are physically up (maks modifier_timeout)."""
+        released = self.modifier_gate.wait_modifiers_released(self.modifier_timeout, self._cancelled)
+        if not released and self.release_stuck_modifiers and not self._cancelled():
             try:
-                keyboard.write(text)
+                self.backend.release_keys(self.modifier_gate.held_modifier_names())
             except Exception:
                 pass
-        
+        # Deadline berikutnya dihitung dari saat mulai mengetik.
+        self._scheduler.start()
+
+    def _press_enter_if_needed(self, profile):
+        """Press Enter after the text when Auto Enter is on."""
+        if self._cancelled():
+            return
         # Tambah delay kecil setelah selesai mengetik sebelum tekan Enter (kalau perlu).
-        if self.auto_enter_callback():
-            time.sleep(TYPING_DELAY_BEFORE_ENTER)
+        if profile.auto_enter:
+            self._wait(profile.pre_enter_delay)
+            if self._cancelled():
+                return
+            try:
+                self.backend.press_and_release('enter')
+                self._record(METRIC_HOOK_TO_ENTER, self.clock() - self._job.hook_time)
+            except Exception:
+                pass
+
+    def _paste_text(self, text):
+        """
+        Deliver text with a single paste chord, then restore the old clipboard
+        (clipboard yang tadinya kosong dikosongkan lagi).
+        Returns False (tanpa mengirim apa pun) kalau clipboard tidak bisa dipakai
+        atau berisi non-text yang tidak bisa dikembalikan.
+        """
+        try:
+            previous = self.clipboard.get_text()
+            if previous is None and not self.clipboard.is_empty():
+                return False
+            self.clipboard.set_text(text)
+        except Exception:
+            return False
+
+        pasted = False
+        try:
+            self.backend.press_and_release(PASTE_HOTKEY)
+            pasted = True
+            self._emitted(len(text))
+            # Tunggu aplikasi tujuan selesai membaca clipboard sebelum di-restore.
+            self._plain_sleep(CLIPBOARD_RESTORE_DELAY)
+        except Exception:
+            pass
+        finally:
             try:
-                keyboard.press_and_release('enter')
+                if previous is None:
+                    self.clipboard.clear()
+                else:
+                    self.clipboard.set_text(previous)
             except Exception:
                 pass
+        return pasted
+
+    def _type_chunks(self, text, chunk_size, chunk_delay, plan=None):
+        """Burst mode: satu backend call per `chunk_size` karakter."""
+        for start in range(0, len(text), chunk_size):
+            if self._cancelled():
+                return
+            end = start + chunk_size
+            if plan is not None:
+                self.backend.send_plan(plan[start:end])
+            else:
+                self.backend.write(text[start:end])
+            self._emitted(min(end, len(text)) - start)
+            self._wait(chunk_delay)
+
+    def _type_chars(self, text, delay, plan=None):
+        """Type text character by character with delays."""
+        # Pakai metode per karakter dengan delay yang bisa diatur user (manual)
+        # supaya bisa disesuaikan antara kecepatan dan keakuratan.
+        for index, char in enumerate(text):
+            if self._cancelled():
+                return
+            if plan is not None:
+                self.backend.send_plan(plan[index:index + 1])
+            else:
+                self.backend.write(char)
+            self._emitted(1)
+            self._wait(delay)
 
@@ -0,0 +1,85 @@
+"""
+Immutable typing settings handed to the typing worker with each job.
+"""
+from dataclasses import dataclass, fields, replace, asdict
+
+from config import (
+    TYPING_DELAY_INITIAL,
+    TYPING_DELAY_PER_CHAR,
+    TYPING_DELAY_BEFORE_ENTER,
+    TYPING_CHUNK_SIZE,
+    TYPING_DELAY_PER_CHUNK,
+    DELIVERY_TYPE,
+    DELIVERY_MODES,
+)
+
+
+@dataclass(frozen=True)
+class TypingProfile:
+    """
+    Snapshot of every setting the typing engine needs for one job.
+
+    Profile global dibuat di Tk thread; macro boleh meng-override field
+    mana pun lewat key dengan nama yang sama di bind dict keybinds.json,
+    misal {"label": ..., "text": ..., "chunk_size": 20, "auto_enter": true}.
+    """
+
+    per_char_delay: float = TYPING_DELAY_PER_CHAR
+    initial_delay: float = TYPING_DELAY_INITIAL
+    pre_enter_delay: float = TYPING_DELAY_BEFORE_ENTER
+    auto_enter: bool = False
+    chunk_size: int = TYPING_CHUNK_SIZE
+    chunk_delay: float = TYPING_DELAY_PER_CHUNK
+    delivery: str = DELIVERY_TYPE
+
+    def merged(self, overrides, strict=False):
+        """
+        Return a copy with the profile fields found in `overrides` applied.
+
+        Key lain (label, text, ...) diabaikan. Value yang tidak valid
+        di-skip, kecuali `strict=True` → ValueError.
+        """
+        changes = {}
+        for name in PROFILE_FIELDS:
+            if name not in overrides or overrides[name] is None:
+                continue
+            try:
+                changes[name] = _coerce(name, overrides[name])
+            except (TypeError, ValueError) as e:
+                if strict:
+                    raise ValueError(f"{name}: {e}")
+        if not changes:
+            return self
+        return replace(self, **changes)
+
+    @classmethod
+    def from_dict(cls, data, strict=False):
+        """Build a profile from a (partial) dict, filling the rest with defaults."""
+        return cls().merged(data, strict=strict)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+PROFILE_FIELDS = tuple(f.name for f in fields(TypingProfile))
+
+
+def _coerce(name, value):
+    """Convert and validate one profile field."""
+    if name == "auto_enter":
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if name == "delivery":
+        if value not in DELIVERY_MODES:
+            raise ValueError(f"harus salah satu dari {', '.join(DELIVERY_MODES)}")
+        return value
+    if name == "chunk_size":
+        value = int(value)
+        if value < 1:
+            raise ValueError("minimal 1")
+        return value
+    value = float(value)
+    if value < 0:
+        raise ValueError("tidak boleh negatif")
+    return value
@@ -5,6 +5,7 @@ Handles all GUI creation and styling with glassmorphism theme.
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 from config import COLORS
+from utils.macro_index import MacroStub, macro_preview
 
 # Try to import ttkbootstrap
 try:
@@ -31,7 +32,38 @@ def setup_gui(app):
     header.pack(fill=tk.X, padx=0, pady=0)
     tk.Label(header, text="✨ TEXT MACROS", font=("Segoe UI", 13, "bold"), 
             bg=COLORS["bg_header"], fg=COLORS["text_primary"]).pack(pady=15)
-    
+
+    # Profile selector (set macro per game / server)
+    profile_frame = tk.Frame(left_frame, bg=COLORS["bg_sidebar"])
+    profile_frame.pack(fill=tk.X, padx=8, pady=(8, 0))
+
+    tk.Label(profile_frame, text="Profile", font=("Segoe UI", 9, "bold"),
+             bg=COLORS["bg_sidebar"], fg=COLORS["text_secondary"]).pack(anchor="w")
+
+    profile_row = tk.Frame(profile_frame, bg=COLORS["bg_sidebar"])
+    profile_row.pack(fill=tk.X, pady=(2, 0))
+
+    if app.use_ttkbootstrap:
+        app.profile_combo = ttkb.Combobox(profile_row, values=list(app.profiles), textvariable=app.profile_var,
+                                          font=("Segoe UI", 10), bootstyle="dark", state="readonly", width=14)
+        new_profile_btn = ttkb.Button(profile_row, text="+", command=app.create_profile,
+                                      bootstyle="success-outline", width=3)
+        delete_profile_btn = ttkb.Button(profile_row, text="🗑", command=app.delete_profile,
+                                         bootstyle="danger-outline", width=3)
+    else:
+        app.profile_combo = ttk.Combobox(profile_row, values=list(app.profiles), textvariable=app.profile_var,
+                                         font=("Segoe UI", 10), style="Glass.TCombobox", state="readonly", width=14)
+        new_profile_btn = tk.Button(profile_row, text="+", command=app.create_profile,
+                                    bg=COLORS["accent_teal"], fg="white", relief=tk.FLAT, cursor="hand2",
+                                    activebackground=COLORS["accent_teal_dark"], bd=0, width=3)
+        delete_profile_btn = tk.Button(profile_row, text="🗑", command=app.delete_profile,
+                                       bg=COLORS["accent_red"], fg="white", relief=tk.FLAT, cursor="hand2",
+                                       activebackground=COLORS["accent_red_dark"], bd=0, width=3)
+    app.profile_combo.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=3)
+    app.profile_combo.bind("<<ComboboxSelected>>", lambda e: app.switch_profile(app.profile_var.get()))
+    delete_profile_btn.pack(side=tk.RIGHT, padx=(4, 0))
+    new_profile_btn.pack(side=tk.RIGHT, padx=(4, 0))
+
     # Macro List Container with Scrollbar (glass effect)
     list_container = tk.Frame(left_frame, bg=COLORS["bg_sidebar"])
     list_container.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
@@ -125,7 +157,7 @@ def setup_gui(app):
                                       values=app.available_hotkeys,
                                       font=("Segoe UI", 11),
                                       bootstyle="dark",
-                                      state="readonly",
+                                      state="normal",
                                       height=15)
         app.key_entry.pack(fill=tk.X, pady=(0, 4), ipady=10, ipadx=12)
     else:
@@ -154,13 +186,29 @@ def setup_gui(app):
                                       values=app.available_hotkeys,
                                       font=("Segoe UI", 11),
                                       style="Glass.TCombobox",
-                                      state="readonly",
+                                      state="normal",
                                       height=15)
         app.key_entry.pack(fill=tk.X, pady=(0, 4), ipady=10, ipadx=12)
     
-    tk.Label(key_frame, text="💡 Klik dropdown untuk pilih hotkey (scrollable)", 
+    tk.Label(key_frame, text="💡 Pilih dari dropdown, atau ketik sequence seperti \"leader, m, 1\" / \"ctrl+;, m, 1\"", 
             font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w")
-    
+
+    # Trigger (abbreviation) - opsional, diketik di mana saja lalu diganti text macro
+    trigger_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
+    trigger_frame.pack(fill=tk.X, padx=16, pady=8)
+
+    tk.Label(trigger_frame, text="Trigger (optional)", font=("Segoe UI", 10, "bold"),
+            bg=COLORS["bg_card"], fg=COLORS["text_secondary"]).pack(anchor="w", pady=(0, 6))
+
+    app.trigger_entry = tk.Entry(trigger_frame, font=("Segoe UI", 11), bg=COLORS["bg_input"],
+                                 fg=COLORS["text_primary"], insertbackground=COLORS["accent_teal"], relief=tk.FLAT,
+                                 highlightthickness=2, highlightbackground=COLORS["accent_teal"],
+                                 highlightcolor=COLORS["accent_teal"], bd=0)
+    app.trigger_entry.pack(fill=tk.X, pady=(0, 4), ipady=10, ipadx=12)
+
+    tk.Label(trigger_frame, text="💡 Contoh: ;gg → ketik ;gg di mana saja, trigger dihapus lalu text macro diketik",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w")
+
     # Text Content - glassmorphism card
     text_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
     text_frame.pack(fill=tk.BOTH, expand=False, padx=16, pady=8)
@@ -176,6 +224,97 @@ def setup_gui(app):
         selectbackground=COLORS["accent_teal"], selectforeground=COLORS["bg_main"]
     )
     app.text_editor.pack(fill=tk.BOTH, expand=False, pady=(0, 4), ipadx=12, ipady=8)
+
+    # Template variable opt-in per macro: macro lama dengan {..} tetap diketik apa adanya
+    tk.Checkbutton(
+        text_frame, text="Pakai template variable", variable=app.template_var,
+        font=("Segoe UI", 10), bg=COLORS["bg_card"], fg=COLORS["text_secondary"],
+        selectcolor=COLORS["accent_teal"], activebackground=COLORS["bg_card"],
+        activeforeground=COLORS["accent_teal"], highlightbackground=COLORS["bg_card"]
+    ).pack(anchor="w")
+
+    tk.Label(text_frame, text="💡 Variable: {date} {time} {clipboard} {counter} {counter:nama} {random:a|b|c} • {{ = kurung kurawal",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w")
+
+    # Steps (multi-step macro, JSON) - opsional, menggantikan Text Content
+    steps_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
+    steps_frame.pack(fill=tk.BOTH, expand=False, padx=16, pady=8)
+
+    tk.Label(steps_frame, text="Steps (optional, JSON)", font=("Segoe UI", 10, "bold"),
+            bg=COLORS["bg_card"], fg=COLORS["text_secondary"]).pack(anchor="w", pady=(0, 6))
+
+    app.steps_editor = scrolledtext.ScrolledText(
+        steps_frame, font=("Consolas", 10), bg=COLORS["bg_input"], fg=COLORS["text_primary"],
+        insertbackground=COLORS["accent_teal"], relief=tk.FLAT, wrap=tk.WORD,
+        highlightthickness=2, highlightbackground=COLORS["accent_teal"],
+        highlightcolor=COLORS["accent_teal"], height=5, bd=0,
+        selectbackground=COLORS["accent_teal"], selectforeground=COLORS["bg_main"]
+    )
+    app.steps_editor.pack(fill=tk.BOTH, expand=False, pady=(0, 4), ipadx=12, ipady=8)
+
+    tk.Label(steps_frame, text='💡 Contoh: [{"key": "t"}, {"wait": 100}, "halo", {"repeat": 2, "steps": [{"key": "tab"}]}, {"enter": true}]',
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w")
+    tk.Label(steps_frame, text="💡 Kalau Steps diisi, Text Content tidak diketik (Auto Enter juga tidak dipakai)",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w")
+
+    # Per-macro burst override - glassmorphism card
+    macro_burst_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
+    macro_burst_frame.pack(fill=tk.X, padx=16, pady=8)
+
+    tk.Label(macro_burst_frame, text="Macro Burst Size • Macro Burst Delay", font=("Segoe UI", 10, "bold"),
+            bg=COLORS["bg_card"], fg=COLORS["text_secondary"]).pack(anchor="w", pady=(0, 6))
+
+    macro_burst_inputs = tk.Frame(macro_burst_frame, bg=COLORS["bg_card"])
+    macro_burst_inputs.pack(anchor="w")
+    app.macro_chunk_size_entry = create_small_entry(macro_burst_inputs)
+    app.macro_chunk_size_entry.pack(side=tk.LEFT, padx=(0, 10), ipadx=6, ipady=4)
+    app.macro_chunk_delay_entry = create_small_entry(macro_burst_inputs)
+    app.macro_chunk_delay_entry.pack(side=tk.LEFT, ipadx=6, ipady=4)
+
+    tk.Label(macro_burst_frame, text="💡 Kosongkan = pakai setting global di bawah",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w", pady=(4, 0))
+
+    # Delivery mode per macro (ketik / paste lewat clipboard / auto)
+    delivery_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
+    delivery_frame.pack(fill=tk.X, padx=16, pady=8)
+
+    tk.Label(delivery_frame, text="Delivery Mode", font=("Segoe UI", 10, "bold"),
+            bg=COLORS["bg_card"], fg=COLORS["text_secondary"]).pack(anchor="w", pady=(0, 6))
+
+    if app.use_ttkbootstrap:
+        app.delivery_entry = ttkb.Combobox(delivery_frame, values=app.delivery_modes,
+                                           font=("Segoe UI", 10), bootstyle="dark",
+                                           state="readonly", width=12)
+    else:
+        app.delivery_entry = ttk.Combobox(delivery_frame, values=app.delivery_modes,
+                                          font=("Segoe UI", 10), style="Glass.TCombobox",
+                                          state="readonly", width=12)
+    app.delivery_entry.pack(anchor="w", ipady=4, ipadx=6)
+    app.delivery_entry.set(app.delivery_modes[0])
+
+    tk.Label(delivery_frame, text="💡 type = ketik • paste = lewat clipboard (instan) • auto = paste kalau text panjang",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w", pady=(4, 0))
+
+    # Fire mode per macro: saat hotkey ditekan atau dilepas
+    fire_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
+    fire_frame.pack(fill=tk.X, padx=16, pady=8)
+
+    tk.Label(fire_frame, text="Fire On", font=("Segoe UI", 10, "bold"),
+            bg=COLORS["bg_card"], fg=COLORS["text_secondary"]).pack(anchor="w", pady=(0, 6))
+
+    if app.use_ttkbootstrap:
+        app.fire_on_entry = ttkb.Combobox(fire_frame, values=app.fire_modes,
+                                          font=("Segoe UI", 10), bootstyle="dark",
+                                          state="readonly", width=12)
+    else:
+        app.fire_on_entry = ttk.Combobox(fire_frame, values=app.fire_modes,
+                                         font=("Segoe UI", 10), style="Glass.TCombobox",
+                                         state="readonly", width=12)
+    app.fire_on_entry.pack(anchor="w", ipady=4, ipadx=6)
+    app.fire_on_entry.set(app.fire_modes[0])
+
+    tk.Label(fire_frame, text="💡 release = saat hotkey dilepas • press = langsung saat ditekan (tahan key tetap 1x)",
+            font=("Segoe UI", 8), bg=COLORS["bg_card"], fg=COLORS["text_hint"]).pack(anchor="w", pady=(4, 0))
     
     # Options - glassmorphism style
     options_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
@@ -223,6 +362,59 @@ def setup_gui(app):
         bg=COLORS["bg_card"],
         fg=COLORS["text_hint"],
     ).pack(anchor="w", pady=(2, 0))
+
+    # Burst mode global (beberapa karakter per keyboard.write)
+    burst_frame = tk.Frame(options_frame, bg=COLORS["bg_card"])
+    burst_frame.pack(fill=tk.X, pady=(6, 0))
+
+    tk.Label(
+        burst_frame,
+        text="Burst Size (characters per chunk) • Burst Delay (seconds per chunk)",
+        font=("Segoe UI", 9, "bold"),
+        bg=COLORS["bg_card"],
+        fg=COLORS["text_secondary"],
+    ).pack(anchor="w")
+
+    burst_inputs = tk.Frame(burst_frame, bg=COLORS["bg_card"])
+    burst_inputs.pack(anchor="w", pady=(2, 0))
+    create_small_entry(burst_inputs, textvariable=app.chunk_size).pack(side=tk.LEFT, padx=(0, 10), ipadx=6, ipady=4)
+    create_small_entry(burst_inputs, textvariable=app.chunk_delay).pack(side=tk.LEFT, ipadx=6, ipady=4)
+
+    tk.Label(
+        burst_frame,
+        text="Default: 1 (per karakter) • Misal 20 = kirim 20 karakter sekaligus, lalu tunggu Burst Delay.",
+        font=("Segoe UI", 8),
+        bg=COLORS["bg_card"],
+        fg=COLORS["text_hint"],
+    ).pack(anchor="w", pady=(2, 0))
+
+    # Kebijakan kalau hotkey ditekan saat macro lain masih diketik
+    busy_frame = tk.Frame(options_frame, bg=COLORS["bg_card"])
+    busy_frame.pack(fill=tk.X, pady=(6, 0))
+
+    tk.Label(
+        busy_frame,
+        text="When Busy (hotkey pressed while typing)",
+        font=("Segoe UI", 9, "bold"),
+        bg=COLORS["bg_card"],
+        fg=COLORS["text_secondary"],
+    ).pack(anchor="w")
+
+    if app.use_ttkbootstrap:
+        busy_combo = ttkb.Combobox(busy_frame, values=app.busy_policies, textvariable=app.busy_policy,
+                                   font=("Segoe UI", 10), bootstyle="dark", state="readonly", width=12)
+    else:
+        busy_combo = ttk.Combobox(busy_frame, values=app.busy_policies, textvariable=app.busy_policy,
+                                  font=("Segoe UI", 10), style="Glass.TCombobox", state="readonly", width=12)
+    busy_combo.pack(anchor="w", pady=(2, 0), ipadx=6, ipady=4)
+
+    tk.Label(
+        busy_frame,
+        text="queue = antre • drop = abaikan • latest = simpan yang terakhir • preempt = hentikan & ketik duluan",
+        font=("Segoe UI", 8),
+        bg=COLORS["bg_card"],
+        fg=COLORS["text_hint"],
+    ).pack(anchor="w", pady=(2, 0))
     
     # Action Buttons - modern glassmorphism buttons
     action_frame = tk.Frame(right_inner, bg=COLORS["bg_card"])
@@ -244,7 +436,15 @@ def setup_gui(app):
             bootstyle="warning",
             width=20
         )
-        app.pause_button.pack(side=tk.LEFT)
+        app.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        stop_btn = ttkb.Button(action_frame, text="⏹ Stop Typing", command=app.abort_typing,
+                     bootstyle="danger-outline", width=16)
+        stop_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        diag_btn = ttkb.Button(action_frame, text="📊 Diagnostics", command=app.show_diagnostics,
+                     bootstyle="info-outline", width=16)
+        diag_btn.pack(side=tk.LEFT)
     else:
         save_btn = tk.Button(action_frame, text="💾 Save Macro", command=app.save_current_macro,
                  bg=COLORS["accent_teal"], fg="white", font=("Segoe UI", 11, "bold"),
@@ -281,7 +481,7 @@ def setup_gui(app):
             activebackground=COLORS["accent_orange_dark"],
             activeforeground="white"
         )
-        app.pause_button.pack(side=tk.LEFT)
+        app.pause_button.pack(side=tk.LEFT, padx=(0, 10))
         def pause_btn_enter(e): 
             if not app.is_paused:
                 app.pause_button.config(bg=COLORS["accent_orange_dark"])
@@ -290,6 +490,18 @@ def setup_gui(app):
                 app.pause_button.config(bg=COLORS["accent_orange"])
         app.pause_button.bind("<Enter>", pause_btn_enter)
         app.pause_button.bind("<Leave>", pause_btn_leave)
+
+        stop_btn = tk.Button(action_frame, text="⏹ Stop Typing", command=app.abort_typing,
+                 bg=COLORS["bg_input"], fg=COLORS["accent_red"], font=("Segoe UI", 11, "bold"),
+                 relief=tk.FLAT, cursor="hand2", width=14, pady=12, bd=0,
+                 activebackground=COLORS["accent_red_dark"], activeforeground="white")
+        stop_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        diag_btn = tk.Button(action_frame, text="📊 Diagnostics", command=app.show_diagnostics,
+                 bg=COLORS["bg_input"], fg=COLORS["accent_teal"], font=("Segoe UI", 11, "bold"),
+                 relief=tk.FLAT, cursor="hand2", width=14, pady=12, bd=0,
+                 activebackground=COLORS["accent_teal_dark"], activeforeground="white")
+        diag_btn.pack(side=tk.LEFT)
     
     # Status Bar - modern glassmorphism style
     app.status_bar = tk.Label(app.root, text="✨ Ready • Status: Playing • 0 macros loaded",
@@ -298,6 +510,94 @@ def setup_gui(app):
     app.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
 
+def open_diagnostics_window(app):
+    """Show hotkey → keystroke latency histograms (global dan per macro)."""
+    window = tk.Toplevel(app.root)
+    window.title("📊 Diagnostics")
+    window.geometry("760x520")
+    window.configure(bg=COLORS["bg_main"])
+
+    header = tk.Frame(window, bg=COLORS["bg_header"])
+    header.pack(fill=tk.X)
+    tk.Label(header, text="📊 LATENCY DIAGNOSTICS (ms)", font=("Segoe UI", 13, "bold"),
+            bg=COLORS["bg_header"], fg=COLORS["text_primary"]).pack(anchor="w", padx=16, pady=12)
+
+    report = scrolledtext.ScrolledText(
+        window, font=("Consolas", 9), bg=COLORS["bg_input"], fg=COLORS["text_primary"],
+        relief=tk.FLAT, wrap=tk.NONE, bd=0,
+    )
+    report.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+
+    def refresh():
+        report.config(state=tk.NORMAL)
+        report.delete("1.0", tk.END)
+        report.insert("1.0", format_latency_summary(app.metrics.summary()))
+        report.config(state=tk.DISABLED)
+
+    buttons = tk.Frame(window, bg=COLORS["bg_main"])
+    buttons.pack(fill=tk.X, padx=12, pady=(0, 12))
+    for text, command in (
+        ("🔄 Refresh", refresh),
+        ("💾 Export JSON", app.export_diagnostics),
+        ("🧹 Reset", lambda: (app.metrics.reset(), refresh())),
+    ):
+        tk.Button(buttons, text=text, command=command, bg=COLORS["bg_input"], fg=COLORS["accent_teal"],
+                  font=("Segoe UI", 10, "bold"), relief=tk.FLAT, cursor="hand2", bd=0, padx=12, pady=6,
+                  activebackground=COLORS["accent_teal_dark"], activeforeground="white").pack(side=tk.LEFT, padx=(0, 8))
+
+    refresh()
+    return window
+
+
+def format_latency_summary(summary):
+    """Render LatencyRecorder.summary() as a plain-text table."""
+    columns = ("count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    lines = []
+
+    def add_table(title, metrics):
+        lines.append(title)
+        lines.append(f"  {'metric':<24}" + "".join(f"{c:>10}" for c in columns))
+        for name, values in metrics.items():
+            lines.append(f"  {name:<24}" + "".join(f"{values[c]:>10}" for c in columns))
+        lines.append("")
+
+    counters = summary.get("counters", {"global": {}, "macros": {}})
+    if not summary["global"] and not counters["global"]:
+        return "Belum ada data. Tekan salah satu hotkey macro dulu, lalu Refresh."
+    if summary["global"]:
+        add_table("GLOBAL", summary["global"])
+    for macro, metrics in summary["macros"].items():
+        add_table(f"MACRO {macro}", metrics)
+
+    if counters["global"]:
+        # Hotkey yang dipicu vs auto-repeat / bounce yang dibuang (untuk tuning debounce)
+        names = sorted(counters["global"])
+        lines.append("HOTKEY COUNTERS")
+        lines.append(f"  {'hotkey':<24}" + "".join(f"{n:>18}" for n in names))
+        lines.append(f"  {'(all)':<24}" + "".join(f"{counters['global'].get(n, 0):>18}" for n in names))
+        for macro, values in counters["macros"].items():
+            lines.append(f"  {macro:<24}" + "".join(f"{values.get(n, 0):>18}" for n in names))
+    return "\n".join(lines)
+
+
+def create_small_entry(parent, textvariable=None):
+    """Create a compact numeric entry styled like the Typing Speed field."""
+    return tk.Entry(
+        parent,
+        textvariable=textvariable,
+        font=("Segoe UI", 10),
+        bg=COLORS["bg_input"],
+        fg=COLORS["text_primary"],
+        insertbackground=COLORS["accent_teal"],
+        relief=tk.FLAT,
+        highlightthickness=1,
+        highlightbackground=COLORS["accent_teal"],
+        highlightcolor=COLORS["accent_teal"],
+        bd=0,
+        width=10,
+    )
+
+
 def create_macro_item(app, key, data):
     """Create a macro item card in the sidebar list."""
     # Glassmorphism card style
@@ -336,9 +636,8 @@ def create_macro_item(app, key, data):
     )
     hotkey_label.pack(fill=tk.X, pady=(0, 2))
     
-    # Preview isi Text Content
-    text = data.get("text", "")
-    preview = text[:45] + "..." if len(text) > 45 else text
+    # Preview isi Text Content (macro yang belum dimuat: preview dari index)
+    preview = data.preview if isinstance(data, MacroStub) else macro_preview(data)
     subtitle = tk.Label(
         content_frame,
         text=f"Text: {preview}",
@@ -0,0 +1,152 @@
+"""
+Background writer for the macro store (keybinds.json / journal / sqlite).
+Tk thread hanya menyerahkan snapshot; serialize + tulis file terjadi di
+thread sendiri, dan perubahan beruntun digabung jadi satu kali tulis.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from config import SAVE_DEBOUNCE, SAVE_MAX_DELAY
+
+# Hasil satu kali tulis: ok, durasi (detik), error (None kalau ok),
+# berapa submit yang digabung, dan apakah snapshot penuh ikut ditulis.
+SaveResult = namedtuple("SaveResult", ["ok", "seconds", "error", "coalesced", "compacted"])
+
+
+class BindsWriter:
+    """
+    Debounced, atomic persistence on a single daemon thread.
+
+    - `submit(document, changes=None)` mengganti snapshot yang menunggu.
+      `changes` = list record journal (lihat utils.journal); None berarti
+      perubahan yang hanya bisa disimpan sebagai snapshot penuh.
+    - Store biasa: snapshot ditulis `debounce` detik setelah submit terakhir
+      (maks `max_delay` sejak submit pertama).
+    - Store incremental (journal, sqlite): record langsung disimpan; snapshot
+      penuh hanya ditulis saat compaction atau kalau ada submit tanpa `changes`.
+    - `flush()` menulis sekarang juga dan menunggu selesai (dipakai saat shutdown).
+    - `callback(SaveResult)` dipanggil dari thread writer setelah setiap tulis.
+    """
+
+    def __init__(self, store, callback=None, debounce=SAVE_DEBOUNCE, max_delay=SAVE_MAX_DELAY,
+                 clock=time.monotonic):
+        # Store dari utils.store.create_store (JsonStore / SqliteStore)
+        self.store = store
+        self.callback = callback
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.clock = clock
+        self.last_result = None
+
+        self._cond = threading.Condition()
+        self._pending = None
+        self._changes = []
+        self._coalesced = 0
+        self._first_submit = None
+        self._last_submit = None
+        self._flush_requested = False
+        self._writing = False
+        self._running = True
+
+        self._thread = threading.Thread(target=self._loop, name="BindsWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, document, changes=None):
+        """Queue a document snapshot (lihat file_manager.build_document) plus its journal records."""
+        with self._cond:
+            now = self.clock()
+            if self._pending is None:
+                self._first_submit = now
+                self._changes = []
+            self._pending = document
+            if changes is None or self._changes is None:
+                self._changes = None
+            else:
+                self._changes.extend(changes)
+            self._coalesced += 1
+            self._last_submit = now
+            self._cond.notify()
+
+    @property
+    def pending(self):
+        """True while a snapshot is waiting or being written."""
+        with self._cond:
+            return self._pending is not None or self._writing
+
+    def flush(self, timeout=None):
+        """Write the pending snapshot now. Returns True kalau tidak ada lagi yang tertunda."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """
+        Flush then stop the writer thread (dipanggil saat aplikasi ditutup).
+        Store hanya ditutup kalau thread sudah berhenti; kalau masih menulis
+        setelah `timeout`, store dibiarkan terbuka dan return False.
+        """
+        done = self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        self.store.close()
+        return done
+
+    def _due(self):
+        if self.store.incremental and self._changes is not None:
+            # Simpan satu record murah: tulis segera, tidak perlu debounce.
+            return self._last_submit
+        return min(self._last_submit + self.debounce, self._first_submit + self.max_delay)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending is not None:
+                        if self._flush_requested or not self._running:
+                            break
+                        now = self.clock()
+                        due = self._due()
+                        if now >= due:
+                            break
+                        self._cond.wait(due - now)
+                        continue
+                    self._flush_requested = False
+                    if not self._running:
+                        return
+                    self._cond.wait()
+                document, changes, coalesced = self._pending, self._changes, self._coalesced
+                self._pending = None
+                self._changes = []
+                self._coalesced = 0
+                self._writing = True
+
+            result = self._write(document, changes, coalesced)
+
+            with self._cond:
+                self._writing = False
+                self.last_result = result
+                self._cond.notify_all()
+            if self.callback is not None:
+                try:
+                    self.callback(result)
+                except Exception:
+                    pass
+
+    def _write(self, document, changes, coalesced):
+        start = time.perf_counter()
+        compacted = False
+        try:
+            compacted = self.store.write(document, changes)
+        except Exception as e:
+            try:
+                print(f"[Keybind] Save error: {e}")
+            except Exception:
+                pass
+            return SaveResult(False, time.perf_counter() - start, e, coalesced, compacted)
+        return SaveResult(True, time.perf_counter() - start, None, coalesced, compacted)
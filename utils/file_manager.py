@@ -3,48 +3,114 @@ File management utilities for saving and loading keybinds.
 """
 import json
 import os
+import tempfile
+import time
 from tkinter import messagebox
 
-
-def save_binds(config_file, binds, auto_enter):
-    """Save keybinds to JSON file."""
+from utils.journal import journal_path, replay_journal
+
+# Retry os.replace kalau file tujuan sedang dibuka program lain (Windows: antivirus / editor).
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.05
+
+
+def build_document(binds, auto_enter, profiles=None, active_profile=None, layers=None, counters=None):
+    """
+    Snapshot of everything keybinds.json holds.
+
+    Dict profile di-copy dangkal: bind dict sendiri tidak pernah diubah
+    in-place, jadi snapshot aman di-serialize di thread lain sementara
+    Tk thread lanjut mengedit.
+    """
+    data = {
+        'binds': dict(binds),
+        'auto_enter': auto_enter
+    }
+    if profiles:
+        data['profiles'] = {name: {'binds': dict(profile_binds)} for name, profile_binds in profiles.items()}
+    if active_profile:
+        data['active_profile'] = active_profile
+    if layers:
+        data['layers'] = list(layers)
+    if counters:
+        data['counters'] = dict(counters)
+    return data
+
+
+def write_document(config_file, data):
+    """
+    Write `data` as JSON atomically: temp file di folder yang sama, fsync, lalu
+    rename ke `config_file`. Crash di tengah jalan tidak pernah memotong file lama.
+    Raises OSError / TypeError kalau gagal (temp file dibersihkan).
+    """
+    cfg_dir = os.path.dirname(config_file)
+    if cfg_dir:
+        os.makedirs(cfg_dir, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".keybinds-", suffix=".tmp", dir=cfg_dir or None)
     try:
-        # Ensure parent directory exists
-        cfg_dir = os.path.dirname(config_file)
-        if cfg_dir:
-            os.makedirs(cfg_dir, exist_ok=True)
-
-        # Debug: log what we're about to save
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(tmp_path, config_file)
+    except BaseException:
         try:
-            print(f"[Keybind] Saving to {config_file} -> {len(binds)} macro(s), auto_enter={auto_enter}")
-        except Exception:
+            os.unlink(tmp_path)
+        except OSError:
             pass
+        raise
+    _fsync_dir(cfg_dir)
 
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'binds': binds,
-                'auto_enter': auto_enter
-            }, f, indent=2, ensure_ascii=False)
 
-        return True
-    except Exception as e:
-        # Also print the error to the terminal to help debugging.
+def _replace(src, dst):
+    for attempt in range(REPLACE_RETRIES):
         try:
-            print(f"[Keybind] Save error: {e}")
-        except Exception:
-            pass
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY)
+
+
+def _fsync_dir(path):
+    """Persist the rename itself (POSIX only; Windows tidak bisa open folder)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(path or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
-        messagebox.showerror(
-            "Save Error",
-            "Gagal menyimpan keybinds.json\n\n"
-            f"Path: {config_file}\n"
-            f"Error: {e}"
-        )
-        return False
+
+def _normalize_binds(binds):
+    """Support old format (string) and new format (dict)."""
+    for key, bind_data in binds.items():
+        if isinstance(bind_data, str):
+            text = bind_data
+            binds[key] = {"label": f"Macro {key}", "text": text}
+    return binds
+
+
+def empty_profile_state():
+    return {"profiles": {}, "active_profile": None, "layers": [], "counters": {}}
 
 
 def load_binds(config_file, legacy_config_file=None):
-    """Load keybinds from JSON file. Returns (binds, auto_enter, migrated)."""
+    """
+    Load keybinds from JSON file, plus keybinds.json.journal kalau ada
+    (mode journal; di-replay di atas snapshot, jadi kedua format terbaca).
+    Returns (binds, auto_enter, migrated, profile_state), dengan profile_state =
+    {"profiles": {nama: binds}, "active_profile": nama/None, "layers": [nama],
+    "counters": {nama: angka}}.
+    """
     load_path = config_file
     migrated = False
 
@@ -52,13 +118,15 @@ def load_binds(config_file, legacy_config_file=None):
         if legacy_config_file and os.path.exists(legacy_config_file):
             load_path = legacy_config_file
             migrated = True
-        else:
-            return {}, False, False
+        elif not os.path.exists(journal_path(config_file)):
+            return {}, False, False, empty_profile_state()
 
     try:
         # Read raw content first so we can gracefully handle empty / invalid JSON.
-        with open(load_path, 'r', encoding='utf-8') as f:
-            raw = f.read().strip()
+        raw = ""
+        if os.path.exists(load_path):
+            with open(load_path, 'r', encoding='utf-8') as f:
+                raw = f.read().strip()
 
         if not raw:
             # Empty file → treat as fresh install.
@@ -66,16 +134,22 @@ def load_binds(config_file, legacy_config_file=None):
         else:
             data = json.loads(raw)
 
-        binds = data.get('binds', {})
+        binds = _normalize_binds(data.get('binds', {}))
         auto_enter = data.get('auto_enter', False)
 
-        # Support old format (string) and new format (dict)
-        for key, bind_data in binds.items():
-            if isinstance(bind_data, str):
-                text = bind_data
-                binds[key] = {"label": f"Macro {key}", "text": text}
+        profile_state = empty_profile_state()
+        for name, profile in data.get('profiles', {}).items():
+            profile_state["profiles"][name] = _normalize_binds(profile.get('binds', {}))
+        profile_state["active_profile"] = data.get('active_profile')
+        profile_state["layers"] = [name for name in data.get('layers', []) if isinstance(name, str)]
+        profile_state["counters"] = {
+            name: value for name, value in data.get('counters', {}).items()
+            if isinstance(value, int) and not isinstance(value, bool)
+        }
+        if not migrated:
+            replay_journal(journal_path(config_file), binds, profile_state)
 
-        return binds, auto_enter, migrated
+        return binds, auto_enter, migrated, profile_state
 
     except json.JSONDecodeError:
         # Corrupted JSON → return empty
@@ -84,7 +158,7 @@ def load_binds(config_file, legacy_config_file=None):
             "File keybinds.json rusak / tidak valid.\n\n"
             "File telah di-reset ke kondisi kosong (tanpa macro)."
         )
-        return {}, False, False
+        return {}, False, False, empty_profile_state()
     except Exception as e:
         messagebox.showerror(
             "Load Error",
@@ -92,5 +166,5 @@ def load_binds(config_file, legacy_config_file=None):
             f"Path: {config_file}\n"
             f"Error: {e}"
         )
-        return {}, False, False
+        return {}, False, False, empty_profile_state()
 
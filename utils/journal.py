@@ -0,0 +1,153 @@
+"""
+Append-only change journal for keybinds.json ("keybinds.json.journal").
+
+Setiap upsert / delete macro ditulis sebagai satu baris JSON lalu di-fsync,
+jadi menyimpan satu macro tidak perlu serialize ulang seluruh library.
+load_binds me-replay journal di atas snapshot terakhir; BindsWriter
+meng-compact (tulis snapshot baru + kosongkan journal) kalau journal sudah
+terlalu besar. Record put / del bersifat idempotent, dan record counters
+digabung dengan max per counter (counter hanya naik), jadi crash di tengah
+compaction tetap aman: journal lama yang di-replay di atas snapshot yang
+lebih baru tidak bisa memundurkan {counter}.
+"""
+import json
+import os
+
+from config import DEFAULT_PROFILE, JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_RATIO, JOURNAL_COMPACT_MIN_BYTES
+
+JOURNAL_SUFFIX = ".journal"
+
+OP_PUT = "put"
+OP_DELETE = "del"
+OP_COUNTERS = "counters"
+# Statistik pemakaian macro; hanya disimpan store yang mendukungnya (sqlite).
+OP_USAGE = "usage"
+
+
+def journal_path(config_file):
+    return config_file + JOURNAL_SUFFIX
+
+
+def put_record(profile, key, bind_data):
+    return {"op": OP_PUT, "profile": profile, "key": key, "bind": bind_data}
+
+
+def delete_record(profile, key):
+    return {"op": OP_DELETE, "profile": profile, "key": key}
+
+
+def counters_record(counters):
+    return {"op": OP_COUNTERS, "counters": dict(counters)}
+
+
+def usage_record(profile, key, fired, last_fired):
+    return {"op": OP_USAGE, "profile": profile, "key": key, "fired": fired, "last_fired": last_fired}
+
+
+def replay_journal(path, binds, profile_state):
+    """
+    Apply the journal at `path` on top of a loaded snapshot (in-place).
+    Returns jumlah record yang diterapkan. Baris terakhir yang terpotong
+    (crash saat menulis) dan record yang tidak dikenal dilewati.
+    """
+    if not os.path.exists(path):
+        return 0
+    applied = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                op = record["op"]
+            except (ValueError, KeyError, TypeError):
+                try:
+                    print(f"[Keybind] Journal baris {number} rusak, dilewati")
+                except Exception:
+                    pass
+                continue
+            if op == OP_COUNTERS:
+                counters = profile_state["counters"]
+                for name, value in (record.get("counters") or {}).items():
+                    if isinstance(value, int) and not isinstance(value, bool):
+                        counters[name] = max(counters.get(name, value), value)
+                applied += 1
+                continue
+            if op not in (OP_PUT, OP_DELETE):
+                continue
+            profile = record.get("profile") or DEFAULT_PROFILE
+            if profile == DEFAULT_PROFILE:
+                target = binds
+            else:
+                target = profile_state["profiles"].setdefault(profile, {})
+            if op == OP_PUT and isinstance(record.get("bind"), dict):
+                target[record["key"]] = record["bind"]
+                applied += 1
+            elif op == OP_DELETE:
+                target.pop(record.get("key"), None)
+                applied += 1
+    return applied
+
+
+class BindsJournal:
+    """Writer side of the journal (dipakai hanya dari thread BindsWriter)."""
+
+    def __init__(self, path, compact_bytes=JOURNAL_COMPACT_BYTES, compact_ratio=JOURNAL_COMPACT_RATIO,
+                 compact_min_bytes=JOURNAL_COMPACT_MIN_BYTES):
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self._file = None
+        self.size = 0
+
+    def append(self, records):
+        """Append records as JSON lines and fsync once for the whole batch."""
+        if not records:
+            return
+        if self._file is None:
+            self._open()
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records
+        ).encode("utf-8")
+        self._file.write(payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size += len(payload)
+
+    def should_compact(self, snapshot_size):
+        """Journal lebih besar dari batas absolut, atau terlalu besar relatif ke snapshot."""
+        if self.size >= self.compact_bytes:
+            return True
+        return self.size >= self.compact_min_bytes and self.size >= snapshot_size * self.compact_ratio
+
+    def reset(self):
+        """Drop the journal after a full snapshot has been written."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.size = 0
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+
+    def _open(self):
+        self._file = open(self.path, 'a+b')
+        self._file.seek(0, os.SEEK_END)
+        self.size = self._file.tell()
+        if self.size:
+            # Baris terakhir terpotong (crash saat append): buang sebelum menambah record baru.
+            self._file.seek(-1, os.SEEK_END)
+            if self._file.read(1) != b"\n":
+                self._file.seek(0)
+                data = self._file.read()
+                self.size = data.rfind(b"\n") + 1
+                self._file.truncate(self.size)
+                self._file.seek(0, os.SEEK_END)
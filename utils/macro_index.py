@@ -0,0 +1,129 @@
+"""
+Lazy macro bodies: index entry di memory, isi macro diambil dari store saat dipakai.
+
+Store yang mendukungnya (sqlite) mengembalikan MacroStub untuk setiap macro:
+semua field kecil (label, trigger, delivery, fire_on, override) tanpa
+"text" / "steps". Isi lengkapnya diambil lewat MacroBodyCache saat macro
+pertama kali di-fire atau dipilih di editor.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from config import MACRO_BODY_CACHE_SIZE
+
+# Field yang ukurannya mengikuti isi macro; sisanya ikut di index.
+BODY_FIELDS = ("text", "steps")
+PREVIEW_LENGTH = 45
+
+
+def split_bind(bind_data):
+    """Return (meta, body_json) for a bind dict."""
+    meta = {name: value for name, value in bind_data.items() if name not in BODY_FIELDS}
+    return meta, json.dumps(bind_data, ensure_ascii=False)
+
+
+def body_hash(body):
+    """Short content hash of a serialized bind (kunci cache isi macro)."""
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def macro_preview(bind_data):
+    """One-line preview for the macro list ("N steps" atau potongan text)."""
+    if bind_data.get("steps") is not None:
+        return f"{len(bind_data['steps'])} steps"
+    text = bind_data.get("text", "")
+    return text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+
+
+class MacroStub(dict):
+    """
+    Index entry for a macro whose body has not been loaded.
+
+    Isi dict = field meta saja, jadi HotkeyRegistry / trigger / editor bisa
+    langsung memakainya. Sama seperti bind dict biasa, stub dianggap immutable;
+    menyimpan macro menggantinya dengan bind dict lengkap.
+    """
+
+    __slots__ = ("profile", "hotkey", "size", "hash", "preview", "source")
+
+    def __init__(self, meta, profile, hotkey, size, hash, preview="", source=None):
+        super().__init__(meta)
+        self.profile = profile
+        self.hotkey = hotkey
+        # Ukuran isi macro (byte JSON) dan hash-nya
+        self.size = size
+        self.hash = hash
+        self.preview = preview
+        # Asal isi macro (punya get_macro); None = store utama
+        self.source = source
+
+
+class MacroBodyCache:
+    """
+    Bounded LRU of full bind dicts, keyed by body hash.
+
+    `resolve(bind_data)` mengembalikan bind dict lengkap: dict biasa
+    dikembalikan apa adanya, MacroStub diambil dari cache atau dari
+    `get_macro` milik sumbernya (store, atau macro pack). Dipanggil dari
+    Tk thread dan typing worker, tidak pernah dari thread hotkey.
+    `on_evict(body)` dipanggil untuk isi yang dibuang dari cache (misal
+    supaya compiled steps-nya ikut dilepas).
+    """
+
+    def __init__(self, store, max_entries=MACRO_BODY_CACHE_SIZE, on_evict=None):
+        self.store = store
+        self.max_entries = max(1, max_entries)
+        self.on_evict = on_evict
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, bind_data):
+        if not isinstance(bind_data, MacroStub):
+            return bind_data
+        with self._lock:
+            body = self._bodies.get(bind_data.hash)
+            if body is not None:
+                self._bodies.move_to_end(bind_data.hash)
+                self.hits += 1
+                return body
+            self.misses += 1
+        source = bind_data.source if bind_data.source is not None else self.store
+        body = source.get_macro(bind_data.profile, bind_data.hotkey)
+        if body is None:
+            try:
+                print(f"[Keybind] Isi macro '{bind_data.hotkey}' ({bind_data.profile}) tidak ditemukan")
+            except Exception:
+                pass
+            return bind_data
+        evicted = []
+        with self._lock:
+            body = self._bodies.setdefault(bind_data.hash, body)
+            self._bodies.move_to_end(bind_data.hash)
+            while len(self._bodies) > self.max_entries:
+                evicted.append(self._bodies.popitem(last=False)[1])
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+        return body
+
+    def peek(self, bind_data):
+        """Cached body (atau bind dict biasa) tanpa membaca store; None kalau belum dimuat."""
+        if not isinstance(bind_data, MacroStub):
+            return bind_data
+        with self._lock:
+            return self._bodies.get(bind_data.hash)
+
+    def clear(self):
+        with self._lock:
+            evicted = list(self._bodies.values())
+            self._bodies.clear()
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def __len__(self):
+        return len(self._bodies)
@@ -0,0 +1,294 @@
+"""
+Read-only macro packs (*.kbpack) untuk library yang dibagikan ke banyak PC.
+
+Format (little-endian):
+    header   : magic, versi, jumlah macro, offset index / strings / bodies, nama pack
+    index    : satu entry fixed-size per macro, diurutkan per hotkey (UTF-8)
+               → offset key + meta, offset + panjang body, hash body
+    strings  : hotkey lalu meta JSON (field kecil: label, trigger, ...)
+    bodies   : bind dict lengkap sebagai JSON UTF-8
+
+Pack dibuka dengan mmap (read-only): mount hanya membaca + memeriksa header
+(pack rusak dilewati), index + meta baru di-decode saat pertama dipakai,
+lookup hotkey = binary search langsung di index, dan body di-decode dari
+memoryview atas mmap saat macro di-fire. Dipakai sebagai layer profile
+(lihat ModernKeybindManager).
+
+Build dari keybinds.json (atau map {hotkey: bind}):
+    python -m utils.macro_pack build keybinds.json phrases.kbpack --name Phrases
+    python -m utils.macro_pack info phrases.kbpack
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+from config import DEFAULT_PROFILE, PACK_DIR_NAME, PACK_SUFFIX
+from utils.macro_index import MacroStub, split_bind, body_hash
+
+PACK_MAGIC = b"KBMPACK\x00"
+PACK_VERSION = 1
+
+# magic, version, flags, count, name_len, (pad), index_off, strings_off, bodies_off
+HEADER = struct.Struct("<8sHHII4xQQQ")
+# key_off, key_len, meta_len, body_off, body_len, hash
+ENTRY = struct.Struct("<QIIQI8s4x")
+
+
+class PackError(ValueError):
+    """Pack file rusak / bukan macro pack."""
+
+
+def build_pack(path, binds, name):
+    """Write `binds` ({hotkey: bind_data}) as a pack file at `path` (atomic). Returns jumlah macro."""
+    entries = []
+    for hotkey, bind_data in binds.items():
+        meta, body = split_bind(bind_data)
+        entries.append((
+            hotkey.encode("utf-8"),
+            json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            body.encode("utf-8"),
+            bytes.fromhex(body_hash(body)),
+        ))
+    entries.sort(key=lambda entry: entry[0])
+
+    name_bytes = name.encode("utf-8")
+    index_off = HEADER.size + len(name_bytes)
+    strings_off = index_off + ENTRY.size * len(entries)
+    bodies_off = strings_off + sum(len(key) + len(meta) for key, meta, _, _ in entries)
+
+    index = bytearray()
+    strings = bytearray()
+    bodies = bytearray()
+    for key, meta, body, digest in entries:
+        index += ENTRY.pack(strings_off + len(strings), len(key), len(meta),
+                            bodies_off + len(bodies), len(body), digest)
+        strings += key + meta
+        bodies += body
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(entries), len(name_bytes),
+                            index_off, strings_off, bodies_off))
+        f.write(name_bytes)
+        f.write(index)
+        f.write(strings)
+        f.write(bodies)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+class MacroPack:
+    """
+    A mounted pack: mmap read-only + binary search over the sorted index.
+
+    `binds` = {hotkey: MacroStub} (dibangun sekali saat pertama diminta,
+    hanya dari index + meta); `get_macro` decode satu body langsung dari
+    mmap lewat memoryview, tanpa copy bytes.
+    Thread-safe untuk dibaca (mmap tidak pernah diubah).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER.size:
+                raise PackError(f"{path}: bukan macro pack (terlalu kecil)")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+            magic, version, _, count, name_len, index_off, strings_off, bodies_off = \
+                HEADER.unpack_from(self._map, 0)
+            if magic != PACK_MAGIC:
+                raise PackError(f"{path}: bukan macro pack")
+            if version != PACK_VERSION:
+                raise PackError(f"{path}: versi pack {version} tidak didukung")
+            if (index_off != HEADER.size + name_len or strings_off != index_off + count * ENTRY.size
+                    or not strings_off <= bodies_off <= size):
+                raise PackError(f"{path}: header pack rusak")
+            try:
+                self.name = self._map[HEADER.size:index_off].decode("utf-8")
+            except UnicodeDecodeError:
+                raise PackError(f"{path}: nama pack rusak") from None
+        except Exception:
+            self.close()
+            raise
+        self.count = count
+        self.size = size
+        self._index_off = index_off
+        self._strings_off = strings_off
+        self._bodies_off = bodies_off
+        self._binds = None
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._map, self._index_off + position * ENTRY.size)
+
+    def _find(self, hotkey):
+        """Binary search the index; returns entry tuple atau None."""
+        key = hotkey.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            current = self._map[entry[0]:entry[0] + entry[1]]
+            if current == key:
+                return entry
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get_macro(self, profile, hotkey):
+        """Full bind dict for `hotkey` (profile diabaikan: satu pack = satu profile)."""
+        if self._map is None:
+            return None
+        entry = self._find(hotkey)
+        if entry is None:
+            return None
+        _, _, _, body_off, body_len, _ = entry
+        if not self._bodies_off <= body_off <= body_off + body_len <= self.size:
+            raise PackError(f"{self.path}: body '{hotkey}' di luar file")
+        with self._view[body_off:body_off + body_len] as body:
+            return json.loads(str(body, "utf-8"))
+
+    @property
+    def binds(self):
+        """{hotkey: MacroStub} untuk register hotkey / trigger (urutan = urutan index)."""
+        if self._binds is None:
+            try:
+                self.load_index()
+            except PackError as e:
+                # Index rusak: pack tetap ter-mount tapi tanpa macro.
+                try:
+                    print(f"[Keybind] Macro pack '{self.name}' dilewati: {e}")
+                except Exception:
+                    pass
+                self._binds = {}
+        return self._binds
+
+    def load_index(self):
+        """
+        Decode and validate the whole index + every meta (dipanggil saat
+        `binds` pertama diminta, bukan saat mount).
+        Raises PackError kalau ada entry yang rusak.
+        """
+        binds = {}
+        previous = None
+        for position in range(self.count):
+            key_off, key_len, meta_len, body_off, body_len, digest = self._entry(position)
+            if not (self._strings_off <= key_off and key_off + key_len + meta_len <= self._bodies_off
+                    and self._bodies_off <= body_off and body_off + body_len <= self.size):
+                raise PackError(f"{self.path}: entry {position} di luar file")
+            key = self._map[key_off:key_off + key_len]
+            if previous is not None and key <= previous:
+                raise PackError(f"{self.path}: index tidak terurut di entry {position}")
+            previous = key
+            try:
+                hotkey = key.decode("utf-8")
+                meta = json.loads(self._map[key_off + key_len:key_off + key_len + meta_len])
+            except ValueError as e:
+                # UnicodeDecodeError & JSONDecodeError sama-sama ValueError
+                raise PackError(f"{self.path}: entry {position} rusak ({e})") from None
+            if not isinstance(meta, dict):
+                raise PackError(f"{self.path}: meta entry {position} bukan object")
+            binds[hotkey] = MacroStub(meta, self.name, hotkey, body_len, digest.hex(), source=self)
+        self._binds = binds
+        return binds
+
+    def close(self):
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._view = None
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+        self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def pack_dir(config_file, dir_name=PACK_DIR_NAME):
+    """Folder pack di sebelah keybinds.json."""
+    return os.path.join(os.path.dirname(os.path.abspath(config_file)), dir_name)
+
+
+def mount_packs(folder):
+    """
+    Open every *.kbpack in `folder` (urut nama file). Hanya header yang
+    diperiksa; pack yang header-nya rusak dilewati.
+    """
+    packs = []
+    try:
+        names = sorted(name for name in os.listdir(folder) if name.endswith(PACK_SUFFIX))
+    except OSError:
+        return packs
+    for name in names:
+        try:
+            pack = MacroPack(os.path.join(folder, name))
+        except (OSError, ValueError) as e:
+            try:
+                print(f"[Keybind] Macro pack '{name}' gagal di-mount: {e}")
+            except Exception:
+                pass
+            continue
+        packs.append(pack)
+    return packs
+
+
+def _read_source(path, profile=None):
+    """Binds from keybinds.json (profile tertentu) atau dari file map {hotkey: bind}."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "binds" in data or "profiles" in data:
+        if profile and profile != DEFAULT_PROFILE:
+            binds = data.get("profiles", {}).get(profile, {}).get("binds")
+            if binds is None:
+                raise ValueError(f"profile '{profile}' tidak ada di {path}")
+        else:
+            binds = data.get("binds", {})
+    else:
+        binds = data
+    # Format lama: {hotkey: "text"}
+    return {key: {"label": f"Macro {key}", "text": value} if isinstance(value, str) else value
+            for key, value in binds.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build / inspect read-only macro packs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a pack from keybinds.json or a {hotkey: bind} map")
+    build.add_argument("source")
+    build.add_argument("output")
+    build.add_argument("--profile", help="profile to export from keybinds.json (default: Default)")
+    build.add_argument("--name", help="layer name of the pack (default: profile or output file name)")
+    info = commands.add_parser("info", help="print a pack's header and macros")
+    info.add_argument("pack")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        binds = _read_source(args.source, args.profile)
+        name = args.name or args.profile or os.path.splitext(os.path.basename(args.output))[0]
+        count = build_pack(args.output, binds, name)
+        print(f"{args.output}: {count} macro, {os.path.getsize(args.output)} bytes, layer '{name}'")
+        return 0
+
+    pack = MacroPack(args.pack)
+    try:
+        print(f"{pack.path}: layer '{pack.name}', {len(pack)} macro, {pack.size} bytes")
+        for hotkey, stub in pack.binds.items():
+            print(f"  {hotkey:<20} {stub.get('label', ''):<30} {stub.size} bytes")
+    finally:
+        pack.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""
+SQLite macro store (keybinds.db) untuk library yang sangat besar.
+
+Macro, profile, trigger, counter dan statistik pemakaian disimpan di tabel
+ber-index; setiap edit macro = satu transaksi kecil (mode WAL), bukan
+menulis ulang seluruh file. Saat pertama dibuka, keybinds.json (atau lokasi
+legacy) dimigrasi sekali ke database. Dengan `lazy` hanya index macro
+(field kecil + ukuran + hash) yang dibaca saat load; isi macro diambil per
+macro lewat get_macro (lihat utils.macro_index).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import DEFAULT_PROFILE, STORAGE_SQLITE
+from utils.file_manager import load_binds, build_document, empty_profile_state
+from utils.journal import OP_PUT, OP_DELETE, OP_COUNTERS, OP_USAGE
+from utils.macro_index import MacroStub, split_bind, body_hash, macro_preview
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS macros (
+    profile TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    meta TEXT NOT NULL DEFAULT '{}',
+    size INTEGER NOT NULL DEFAULT 0,
+    hash TEXT NOT NULL DEFAULT '',
+    preview TEXT NOT NULL DEFAULT '',
+    -- body terakhir: load index tidak perlu membaca overflow page isi macro
+    body TEXT NOT NULL,
+    PRIMARY KEY (profile, hotkey)
+);
+CREATE TABLE IF NOT EXISTS triggers (
+    profile TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    PRIMARY KEY (profile, trigger)
+);
+CREATE INDEX IF NOT EXISTS triggers_by_trigger ON triggers (trigger);
+CREATE INDEX IF NOT EXISTS triggers_by_macro ON triggers (profile, hotkey);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage (
+    profile TEXT NOT NULL,
+    hotkey TEXT NOT NULL,
+    fired INTEGER NOT NULL DEFAULT 0,
+    last_fired REAL,
+    PRIMARY KEY (profile, hotkey)
+);
+"""
+
+# Kolom index yang ditambahkan di schema 2 (database versi 1 di-upgrade saat dibuka)
+INDEX_COLUMNS = (
+    ("meta", "TEXT NOT NULL DEFAULT '{}'"),
+    ("size", "INTEGER NOT NULL DEFAULT 0"),
+    ("hash", "TEXT NOT NULL DEFAULT ''"),
+    ("preview", "TEXT NOT NULL DEFAULT ''"),
+)
+
+
+class SqliteStore:
+    """
+    Store interface (lihat utils.store) di atas sqlite3.
+
+    Satu koneksi dipakai bersama Tk thread (load) dan thread BindsWriter
+    (write), dijaga lock. Urutan macro = urutan insert (rowid), sama
+    seperti urutan dict di keybinds.json. Dengan `lazy`, load mengembalikan
+    MacroStub (tanpa text / steps) dan snapshot penuh tidak menulis ulang
+    isi macro yang masih berupa stub.
+    """
+
+    name = STORAGE_SQLITE
+    incremental = True
+    tracks_usage = True
+
+    def __init__(self, path, json_file=None, lazy=False):
+        self.path = path
+        # keybinds.json lama yang dimigrasi kalau database masih kosong
+        self.json_file = json_file
+        self.lazy = lazy
+        self._conn = None
+        self._lock = threading.RLock()
+        # Setelah tulis gagal, record yang hilang hanya bisa dipulihkan lewat snapshot penuh.
+        self._needs_snapshot = False
+
+    def _connect(self):
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._upgrade(conn)
+            self._conn = conn
+        return self._conn
+
+    def _upgrade(self, conn):
+        """Add the schema 2 index columns to a version 1 database (sekali)."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(macros)")}
+        missing = [(name, kind) for name, kind in INDEX_COLUMNS if name not in columns]
+        if not missing:
+            return
+        with _transaction(conn):
+            for name, kind in missing:
+                conn.execute(f"ALTER TABLE macros ADD COLUMN {name} {kind}")
+            rows = conn.execute("SELECT profile, hotkey, body FROM macros").fetchall()
+            for profile, hotkey, body in rows:
+                conn.execute(
+                    "UPDATE macros SET meta = ?, size = ?, hash = ?, preview = ? WHERE profile = ? AND hotkey = ?",
+                    _index_values(json.loads(body), body) + (profile, hotkey),
+                )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ----------------------
+    # Load
+    # ----------------------
+    def load(self, legacy_config_file=None):
+        """Same return value as file_manager.load_binds."""
+        with self._lock:
+            conn = self._connect()
+            if self._setting(conn, "schema_version") is None:
+                return self._migrate(conn, legacy_config_file)
+
+            binds = {}
+            profile_state = empty_profile_state()
+            for (name,) in conn.execute("SELECT name FROM profiles ORDER BY position"):
+                if name != DEFAULT_PROFILE:
+                    profile_state["profiles"][name] = {}
+            if self.lazy:
+                rows = conn.execute("SELECT profile, hotkey, meta, size, hash, preview FROM macros ORDER BY rowid")
+            else:
+                rows = conn.execute("SELECT profile, hotkey, body FROM macros ORDER BY rowid")
+            for profile, hotkey, *row in rows:
+                target = binds if profile == DEFAULT_PROFILE else profile_state["profiles"].setdefault(profile, {})
+                if self.lazy:
+                    meta, size, digest, preview = row
+                    target[hotkey] = MacroStub(json.loads(meta), profile, hotkey, size, digest, preview)
+                else:
+                    target[hotkey] = json.loads(row[0])
+            profile_state["active_profile"] = self._setting(conn, "active_profile")
+            profile_state["layers"] = self._setting(conn, "layers") or []
+            profile_state["counters"] = dict(conn.execute("SELECT name, value FROM counters"))
+            auto_enter = bool(self._setting(conn, "auto_enter"))
+            return binds, auto_enter, False, profile_state
+
+    def _migrate(self, conn, legacy_config_file):
+        """One-shot import of keybinds.json (+ journal / lokasi legacy) ke database kosong."""
+        binds, auto_enter, _, profile_state = {}, False, False, empty_profile_state()
+        migrated = False
+        if self.json_file:
+            binds, auto_enter, _, profile_state = load_binds(self.json_file, legacy_config_file)
+            migrated = bool(binds or profile_state["profiles"])
+        document = build_document(
+            binds, auto_enter,
+            profiles=profile_state["profiles"],
+            active_profile=profile_state["active_profile"],
+            layers=profile_state["layers"],
+            counters=profile_state["counters"],
+        )
+        self._replace_all(conn, document)
+        if migrated:
+            try:
+                print(f"[Keybind] Migrated {self.json_file} -> {self.path}")
+            except Exception:
+                pass
+        return binds, auto_enter, migrated, profile_state
+
+    # ----------------------
+    # Write (thread BindsWriter)
+    # ----------------------
+    def write(self, document, changes=None):
+        """Apply journal records one transaction each, atau ganti semua isi kalau `changes` None."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                if changes is None or self._needs_snapshot:
+                    self._replace_all(conn, document)
+                    self._needs_snapshot = False
+                    return True
+                for record in changes:
+                    with _transaction(conn):
+                        self._apply(conn, record)
+                return False
+            except Exception:
+                self._needs_snapshot = True
+                raise
+
+    def _apply(self, conn, record):
+        op = record["op"]
+        if op == OP_PUT:
+            self._put(conn, record["profile"], record["key"], record["bind"])
+        elif op == OP_DELETE:
+            params = (record["profile"], record["key"])
+            conn.execute("DELETE FROM macros WHERE profile = ? AND hotkey = ?", params)
+            conn.execute("DELETE FROM triggers WHERE profile = ? AND hotkey = ?", params)
+            conn.execute("DELETE FROM usage WHERE profile = ? AND hotkey = ?", params)
+        elif op == OP_COUNTERS:
+            conn.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                record["counters"].items(),
+            )
+        elif op == OP_USAGE:
+            conn.execute(
+                "INSERT INTO usage (profile, hotkey, fired, last_fired) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (profile, hotkey) DO UPDATE SET "
+                "fired = fired + excluded.fired, last_fired = excluded.last_fired",
+                (record["profile"], record["key"], record["fired"], record["last_fired"]),
+            )
+
+    def _put(self, conn, profile, hotkey, bind_data):
+        conn.execute(
+            "INSERT OR IGNORE INTO profiles (name, position) "
+            "VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM profiles))",
+            (profile,),
+        )
+        meta, body = split_bind(bind_data)
+        conn.execute(
+            "INSERT INTO macros (profile, hotkey, label, body, meta, size, hash, preview) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (profile, hotkey) DO UPDATE SET label = excluded.label, body = excluded.body, "
+            "meta = excluded.meta, size = excluded.size, hash = excluded.hash, preview = excluded.preview",
+            (profile, hotkey, bind_data.get("label", ""), body) + _index_values(bind_data, body, meta),
+        )
+        conn.execute("DELETE FROM triggers WHERE profile = ? AND hotkey = ?", (profile, hotkey))
+        trigger = bind_data.get("trigger")
+        if trigger:
+            conn.execute(
+                "INSERT OR REPLACE INTO triggers (profile, trigger, hotkey) VALUES (?, ?, ?)",
+                (profile, trigger.lower(), hotkey),
+            )
+
+    def _replace_all(self, conn, document):
+        """
+        Rewrite every table from a build_document snapshot in one transaction.
+        Macro yang masih MacroStub tidak berubah sejak load, jadi barisnya dibiarkan.
+        """
+        profiles = {DEFAULT_PROFILE: document.get("binds", {})}
+        for name, profile in document.get("profiles", {}).items():
+            profiles.setdefault(name, profile.get("binds", {}))
+        with _transaction(conn):
+            for table in ("profiles", "counters", "settings"):
+                conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                "INSERT INTO profiles (name, position) VALUES (?, ?)",
+                [(name, position) for position, name in enumerate(profiles)],
+            )
+            # Macro (beserta trigger & statistik) yang sudah tidak ada dibuang.
+            gone = [
+                (name, hotkey) for name, hotkey in conn.execute("SELECT profile, hotkey FROM macros")
+                if hotkey not in profiles.get(name, {})
+            ]
+            for table in ("macros", "triggers", "usage"):
+                conn.executemany(f"DELETE FROM {table} WHERE profile = ? AND hotkey = ?", gone)
+            for name, binds in profiles.items():
+                for hotkey, bind_data in binds.items():
+                    if not isinstance(bind_data, MacroStub):
+                        self._put(conn, name, hotkey, bind_data)
+            conn.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?)",
+                document.get("counters", {}).items(),
+            )
+            settings = {
+                "schema_version": SCHEMA_VERSION,
+                "auto_enter": bool(document.get("auto_enter")),
+                "active_profile": document.get("active_profile"),
+                "layers": document.get("layers", []),
+                "saved_at": time.time(),
+            }
+            conn.executemany(
+                "INSERT INTO settings (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in settings.items()],
+            )
+
+    @staticmethod
+    def _setting(conn, key):
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ----------------------
+    # Indexed lookup
+    # ----------------------
+    def get_macro(self, profile, hotkey):
+        """One macro's bind dict (None kalau tidak ada), tanpa load seluruh library."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT body FROM macros WHERE profile = ? AND hotkey = ?", (profile, hotkey)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_trigger(self, trigger):
+        """[(profile, hotkey)] for a trigger string (case-insensitive)."""
+        with self._lock:
+            return self._connect().execute(
+                "SELECT profile, hotkey FROM triggers WHERE trigger = ?", ((trigger or "").lower(),)
+            ).fetchall()
+
+    def usage(self, profile=None):
+        """{(profile, hotkey): (fired, last_fired)}, paling sering dipakai dulu."""
+        query = "SELECT profile, hotkey, fired, last_fired FROM usage"
+        params = ()
+        if profile is not None:
+            query += " WHERE profile = ?"
+            params = (profile,)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY fired DESC", params).fetchall()
+        return {(p, h): (fired, last) for p, h, fired, last in rows}
+
+
+def _index_values(bind_data, body, meta=None):
+    """(meta, size, hash, preview) columns for a macro row."""
+    if meta is None:
+        meta = split_bind(bind_data)[0]
+    return (
+        json.dumps(meta, ensure_ascii=False),
+        len(body.encode("utf-8")),
+        body_hash(body),
+        macro_preview(bind_data),
+    )
+
+
+class _transaction:
+    """BEGIN IMMEDIATE ... COMMIT / ROLLBACK (koneksi autocommit, isolation_level=None)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
@@ -0,0 +1,75 @@
+"""
+Macro stores: where keybinds live on disk.
+
+Semua store punya interface yang sama:
+    load(legacy_config_file)  -> (binds, auto_enter, migrated, profile_state)
+    write(document, changes)  -> True kalau snapshot penuh ditulis
+    close()
+Store yang load-nya bisa mengembalikan MacroStub (utils.macro_index) juga
+punya get_macro(profile, hotkey).
+BindsWriter memanggil `write` dari thread-nya sendiri; `incremental` = store
+bisa menyimpan `changes` (record journal) tanpa menulis ulang semuanya.
+"""
+import os
+
+from config import STORAGE_MODE, STORAGE_JSON, STORAGE_JOURNAL, STORAGE_SQLITE, LAZY_MACRO_BODIES
+from utils.file_manager import load_binds, write_document
+from utils.journal import BindsJournal, journal_path, OP_USAGE
+
+
+class JsonStore:
+    """keybinds.json (+ optional append-only journal)."""
+
+    name = STORAGE_JSON
+    tracks_usage = False
+
+    def __init__(self, config_file, journaled=False):
+        self.path = config_file
+        self.journaled = journaled
+        # Journal tetap dibuat di mode json: snapshot penuh selalu menghapus
+        # journal lama supaya load_binds tidak me-replay record yang basi.
+        self.journal = BindsJournal(journal_path(config_file))
+        # Setelah tulis gagal, record yang hilang hanya bisa dipulihkan lewat snapshot penuh.
+        self._needs_snapshot = False
+        if journaled:
+            self.name = STORAGE_JOURNAL
+
+    @property
+    def incremental(self):
+        return self.journaled
+
+    def load(self, legacy_config_file=None):
+        return load_binds(self.path, legacy_config_file)
+
+    def write(self, document, changes=None):
+        if changes is not None:
+            changes = [record for record in changes if record["op"] != OP_USAGE]
+        try:
+            if (self.journaled and changes is not None and not self._needs_snapshot
+                    and os.path.exists(self.path)):
+                self.journal.append(changes)
+                if not self.journal.should_compact(os.path.getsize(self.path)):
+                    return False
+            write_document(self.path, document)
+            self.journal.reset()
+            self._needs_snapshot = False
+            return True
+        except Exception:
+            self._needs_snapshot = True
+            raise
+
+    def close(self):
+        self.journal.close()
+
+
+def sqlite_path(config_file):
+    """keybinds.json → keybinds.db (di folder yang sama)."""
+    return os.path.splitext(config_file)[0] + ".db"
+
+
+def create_store(config_file, mode=STORAGE_MODE):
+    """Build the store for STORAGE_MODE ("json", "journal" atau "sqlite")."""
+    if mode == STORAGE_SQLITE:
+        from utils.sqlite_store import SqliteStore
+        return SqliteStore(sqlite_path(config_file), config_file, lazy=LAZY_MACRO_BODIES)
+    return JsonStore(config_file, journaled=mode == STORAGE_JOURNAL)